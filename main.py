@@ -10,15 +10,25 @@ import shutil
 from datetime import datetime
 import hashlib
 import argparse
+import threading
 
 from src.utils.logger import init_logger, get_logger
 from src.utils.config import get_config
 from src.core.file_scanner import FileScanner
 from src.core.metadata_reader import MetadataReader
-from src.detection.exact_duplicates import ExactDuplicateDetector
-from src.detection.similar_detector import SimilarDuplicateDetector
+from src.core.metadata_cache import get_metadata_cache
+from src.detection.exact_duplicates import ExactDuplicateDetector, collapse_exact, expand_groups
+from src.detection.similar_detector import build_similar_detector
+from src.core.feature_cache import FeatureCache
+from src.detection.cascade import CascadeSimilarityMatcher
+from src.detection.blocking import CandidateBlocker
+from src.detection.burst_detector import BurstDetector
+from src.detection.incremental import IncrementalSimilarity
+from src.detection.pair_cache import PairDistanceCache
 from src.detection.keep_policy import choose_keeper, choose_keeper_among
-from src.database.db_manager import DBManager
+from src.database.db_manager import DBManager, IMAGE_INSERT_SQL, configure_connection, image_row
+from src.database.batch_writer import BatchWriter
+from src.database.migrations import migrate
 
 
 DB_PATH = Path("data/database/photo_organizer.db")
@@ -41,50 +51,19 @@ def ensure_dirs():
 
 
 def init_db(conn: sqlite3.Connection):
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS images (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            file_path TEXT UNIQUE,
-            file_name TEXT,
-            file_size INTEGER,
-            format TEXT,
-            width INTEGER,
-            height INTEGER,
-            megapixels REAL,
-            datetime TEXT,
-            camera_make TEXT,
-            camera_model TEXT,
-            md5_hash TEXT
-        )
-        """
-    )
-    conn.commit()
-
-
-def store_image(conn: sqlite3.Connection, meta: dict, md5: str):
-    conn.execute(
-        """
-        INSERT OR IGNORE INTO images (
-            file_path, file_name, file_size, format, width, height, megapixels,
-            datetime, camera_make, camera_model, md5_hash
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            meta.get("file_path"),
-            meta.get("file_name"),
-            meta.get("file_size"),
-            meta.get("format"),
-            meta.get("width"),
-            meta.get("height"),
-            meta.get("megapixels"),
-            meta.get("datetime").isoformat() if meta.get("datetime") else None,
-            meta.get("camera_make"),
-            meta.get("camera_model"),
-            md5,
-        ),
-    )
-    conn.commit()
+    """Create/upgrade the schema through the shared migrations."""
+    migrate(conn)
+
+
+def run_backup(db_path: Path):
+    """Backup online do banco (usado em thread separada pelo pipeline)."""
+    dbm = DBManager(str(db_path))
+    try:
+        dbm.backup()
+    except Exception as e:
+        get_logger().warning(f"Falha no backup do DB: {e}")
+    finally:
+        dbm.close()
 
 
 def find_existing_by_md5(conn: sqlite3.Connection, md5: str):
@@ -104,13 +83,73 @@ def move_to_quarantine(path: Path, md5: str, dry_run: bool = False) -> Path:
     return dest
 
 
+def quarantine_groups(groups, policy: str, duplicates: list, reason: str, dry_run: bool = False) -> int:
+    """Keep one file per group (by `policy`) and move the others to quarantine."""
+    log = get_logger()
+    moved = 0
+    for group in groups:
+        keeper = choose_keeper_among([Path(p) for p in group], policy)
+        for dup_path in group:
+            pdup = Path(dup_path)
+            if pdup == keeper:
+                continue
+            if not pdup.exists():
+                continue
+            new_path = move_to_quarantine(pdup, compute_md5(pdup), dry_run=dry_run)
+            log.info(f"Similar detectado ({reason}). Mantendo {keeper}. Movendo {pdup} → {new_path}")
+            duplicates.append({"original": str(keeper), "duplicate": str(new_path), "reason": reason})
+            moved += 1
+    return moved
+
+
+def run_pair_cache_command(args, cfg) -> None:
+    """Serve `regroup`/`histogram` straight from the pair-distance cache."""
+    log = get_logger()
+    ceiling = cfg.duplicates.pair_cache_ceiling
+    if ceiling is None:
+        log.error("Cache de pares desativado (duplicates.pair_cache_ceiling vazio)")
+        return
+    dbm = DBManager(str(DB_PATH))
+    dbm.init_tables()
+    cache = PairDistanceCache(dbm, ceiling)
+    if args.command == "histogram":
+        print(json.dumps(cache.histogram(), indent=2))
+        return
+    if args.rebuild:
+        detector = build_similar_detector(cfg)
+        cache.rebuild(hash_size=detector.hash_size, algorithm=detector.algorithm)
+    try:
+        groups = cache.regroup(args.threshold)
+    except ValueError as e:
+        log.error(str(e))
+        return
+    if args.save:
+        dbm.save_groups("similar", list(groups.values()))
+    print(json.dumps(PairDistanceCache.summary(groups, args.threshold), indent=2))
+    for rep, members in groups.items():
+        print(f"{rep}: {len(members)} imagens")
+
+
 def main():
     parser = argparse.ArgumentParser(prog="photo_organizer", description="MVP photo organizer pipeline")
     parser.add_argument("--dry-run", action="store_true", help="Simulate actions without moving files")
     parser.add_argument("--threshold", type=int, default=None, help="Override visual similarity threshold")
     parser.add_argument("--config", type=str, default="config.yaml", help="Path to config.yaml")
+    subparsers = parser.add_subparsers(dest="command")
+    regroup_parser = subparsers.add_parser(
+        "regroup", help="Regroup similar images from the pair-distance cache (no hashing)"
+    )
+    regroup_parser.add_argument("--threshold", type=int, required=True, help="Distance threshold (<= cache ceiling)")
+    regroup_parser.add_argument("--save", action="store_true", help="Persist the resulting groups")
+    regroup_parser.add_argument("--rebuild", action="store_true", help="Rebuild the cache from stored hashes first")
+    subparsers.add_parser("histogram", help="Print the distance histogram of the pair-distance cache")
     args = parser.parse_args()
 
+    if args.command in ("regroup", "histogram"):
+        init_logger(level="INFO")
+        run_pair_cache_command(args, get_config(args.config))
+        return
+
     logger = init_logger(level="INFO")
     log = get_logger()
 
@@ -120,15 +159,22 @@ def main():
         cfg.duplicates.similarity_threshold = args.threshold
 
     scanner = FileScanner(cfg)
-    reader = MetadataReader()
+    reader = MetadataReader(cache=get_metadata_cache())
 
     ensure_dirs()
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = configure_connection(sqlite3.connect(str(DB_PATH)))
     init_db(conn)
 
     dbm = DBManager(str(DB_PATH))
+    dbm.init_tables()
     detector = ExactDuplicateDetector(conn)
 
+    # backup online em paralelo: a ingestão continua gravando durante a cópia
+    backup_thread = None
+    if cfg.database.auto_backup:
+        backup_thread = threading.Thread(target=run_backup, args=(DB_PATH,), name="db-backup", daemon=True)
+        backup_thread.start()
+
     log.info("Iniciando pipeline MVP: scan -> metadata -> hash -> store -> duplicates")
 
     files = scanner.scan_all_sources()
@@ -136,13 +182,22 @@ def main():
 
     duplicates = []
 
-    for p in files:
+    # inserts agrupados em transações de batch_size linhas
+    writer = BatchWriter(conn, cfg.performance.batch_size)
+
+    # metadados lidos em paralelo; a ordem é mantida para as decisões de duplicata
+    for record in reader.read_records(files, workers=cfg.performance.max_threads, ordered=True):
+        p = record.path
         try:
-            meta = reader.read_metadata(p)
-            md5 = detector.compute_md5(p)
+            if record.error:
+                raise RuntimeError(record.error)
+            md5 = record.md5 = detector.compute_md5(p)
+            meta = record.to_dict()
 
-            existing = detector.find_in_db(md5)
+            # linhas ainda no buffer também contam como existentes
+            existing = writer.pending(md5) or detector.find_in_db(md5)
             if existing and Path(existing) != p:
+                writer.flush()  # dbm (outra conexão) precisa ver as linhas pendentes
                 # duplicate found: decide keep policy
                 existing_row = dbm.get_by_md5(md5)
                 decision = choose_keeper(existing_row or {}, meta, cfg.duplicates.keep_policy)
@@ -168,10 +223,16 @@ def main():
                     continue
 
             # store and continue
-            store_image(conn, meta, md5)
+            writer.add(IMAGE_INSERT_SQL, image_row(meta, md5), key=md5, value=str(p))
 
         except Exception as e:
             log.warning(f"Erro processando {p}: {e}")
+    try:
+        writer.flush()
+    except Exception as e:
+        log.error(f"Erro gravando o último lote de imagens: {e}")
+    if writer.rows_lost:
+        log.warning(f"{writer.rows_lost} imagens não foram gravadas no banco (ver erros acima)")
 
     # write duplicates report
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -179,29 +240,112 @@ def main():
     with report_path.open("w", encoding="utf-8") as f:
         json.dump({"generated": ts, "duplicates": duplicates}, f, ensure_ascii=False, indent=2)
 
+    # um único detector (e uma única conexão do cache de rasters) para as etapas seguintes
+    feature_cache = FeatureCache.from_config(cfg)
+    similar_detector = build_similar_detector(cfg, feature_cache)
+
+    # --- Detectar rajadas (sequências de disparo) pela data de captura ---
+    try:
+        if cfg.duplicates.detect_bursts:
+            columns = ("file_path", "md5_hash", "datetime", "utc_offset", "camera_model")
+            cur = conn.execute(f"SELECT {', '.join(columns)} FROM images")
+            rows = [dict(zip(columns, r)) for r in cur.fetchall()]
+            burst_detector = BurstDetector(max_gap=cfg.duplicates.burst_max_gap)
+            bursts = burst_detector.detect(rows)
+            if cfg.duplicates.burst_confirm_phash:
+                bursts = burst_detector.confirm(
+                    bursts,
+                    similar_detector,
+                    max_distance=cfg.duplicates.similarity_threshold or 5,
+                    keys={r["file_path"]: r["md5_hash"] for r in rows if r["md5_hash"]},
+                )
+            dbm.save_groups("burst", bursts)
+            if cfg.duplicates.burst_confirm_phash:
+                burst_count = quarantine_groups(
+                    bursts, cfg.duplicates.keep_policy, duplicates, "burst", dry_run=args.dry_run
+                )
+                log.info(f"Rajadas confirmadas: {len(bursts)} grupos. Arquivos movidos: {burst_count}")
+            else:
+                log.info(f"Rajadas registradas para revisão: {len(bursts)} grupos")
+    except Exception as e:
+        log.warning(f"Erro na detecção de rajadas: {e}")
+
     # --- Detectar duplicatas visuais (similares) entre imagens armazenadas ---
     try:
         if cfg.duplicates.detect_similar:
             threshold = cfg.duplicates.similarity_threshold or 5
-            detector_sim = SimilarDuplicateDetector()
-            cur = conn.execute("SELECT file_path FROM images")
-            stored = [Path(r[0]) for r in cur.fetchall()]
-            log.info(f"Verificando duplicatas visuais entre {len(stored)} imagens armazenadas com limiar={threshold}...")
-            groups = detector_sim.group_similar(stored, max_distance=threshold)
-            sim_count = 0
-            for rep, group in groups.items():
-                # choose keeper according to policy
-                keeper = choose_keeper_among([Path(p) for p in group], cfg.duplicates.keep_policy)
-                for dup_path in group:
-                    pdup = Path(dup_path)
-                    if pdup == keeper:
-                        continue
-                    if not pdup.exists():
-                        continue
-                    new_path = move_to_quarantine(pdup, compute_md5(pdup), dry_run=args.dry_run)
-                    log.info(f"Similar detectado. Mantendo {keeper}. Movendo {pdup} → {new_path}")
-                    duplicates.append({"original": str(keeper), "duplicate": str(new_path), "reason": "visual"})
-                    sim_count += 1
+            preview_min_size = cfg.duplicates.preview_min_size if cfg.duplicates.use_embedded_previews else None
+            if cfg.duplicates.incremental:
+                # o modo incremental tem prioridade; avisa o que da configuração ele não usa
+                ignored = [name for name in ("blocking", "cascade") if getattr(cfg.duplicates, name)]
+                if cfg.duplicates.clustering != "union_find":
+                    ignored.append(f"clustering={cfg.duplicates.clustering}")
+                if ignored:
+                    log.warning(
+                        f"Modo incremental ativo: {', '.join(ignored)} ignorado(s); "
+                        f"agrupamento union-find com max_group_distance={cfg.duplicates.max_group_distance}"
+                    )
+                incremental = IncrementalSimilarity(
+                    dbm,
+                    similar_detector,
+                    max_distance=threshold,
+                    pair_ceiling=cfg.duplicates.pair_cache_ceiling,
+                    max_group_distance=cfg.duplicates.max_group_distance,
+                )
+                log.info(f"Verificando duplicatas visuais das imagens ainda sem hash com limiar={threshold}...")
+                to_quarantine = incremental.update()
+            else:
+                columns = ("file_path", "md5_hash", "file_size", "width", "height", "datetime", "utc_offset",
+                           "camera_model")
+                cur = conn.execute(f"SELECT {', '.join(columns)} FROM images ORDER BY file_path")
+                rows = [dict(zip(columns, r)) for r in cur.fetchall()]
+                # cópias idênticas (tamanho + md5) são comparadas uma vez só
+                reps, members = collapse_exact(rows)
+                stored = [Path(r["file_path"]) for r in reps]
+                keys = {r["file_path"]: r["md5_hash"] for r in reps if r["md5_hash"]}
+                log.info(
+                    f"Verificando duplicatas visuais entre {len(rows)} imagens armazenadas "
+                    f"({len(reps)} conteúdos distintos) com limiar={threshold}..."
+                )
+                if cfg.duplicates.blocking:
+                    blocker = CandidateBlocker(
+                        time_window=cfg.duplicates.blocking_time_window,
+                        aspect_tolerance=cfg.duplicates.blocking_aspect_tolerance,
+                        use_camera=cfg.duplicates.blocking_use_camera,
+                    )
+                    candidates = blocker.candidate_pairs(reps)
+                    groups = similar_detector.group_candidates(
+                        [r["file_path"] for r in reps],
+                        candidates,
+                        max_distance=threshold,
+                        max_group_distance=cfg.duplicates.max_group_distance,
+                        keys=keys,
+                    )
+                elif cfg.duplicates.cascade:
+                    matcher = CascadeSimilarityMatcher(
+                        prefilter_hash=cfg.duplicates.prefilter_hash,
+                        prefilter_threshold=cfg.duplicates.prefilter_threshold,
+                        confirm_threshold=threshold,
+                        whash_threshold=cfg.duplicates.whash_threshold,
+                        workers=cfg.performance.max_threads,
+                        batch_size=cfg.performance.batch_size,
+                        preview_min_size=preview_min_size,
+                    )
+                    groups = matcher.group_similar(stored)
+                else:
+                    groups = similar_detector.group_similar(
+                        stored,
+                        max_distance=threshold,
+                        method=cfg.duplicates.clustering,
+                        max_group_distance=cfg.duplicates.max_group_distance,
+                        keys=keys,
+                    )
+                groups = expand_groups(groups, members)
+                dbm.save_groups("similar", list(groups.values()))
+                to_quarantine = list(groups.values())
+            sim_count = quarantine_groups(
+                to_quarantine, cfg.duplicates.keep_policy, duplicates, "visual", dry_run=args.dry_run
+            )
 
             log.info(f"Detecção visual concluída. Duplicatas visuais movidas: {sim_count}")
         else:
@@ -209,6 +353,11 @@ def main():
     except Exception as e:
         log.warning(f"Erro na detecção de similares: {e}")
 
+    if feature_cache is not None:
+        feature_cache.close()
+    if backup_thread is not None:
+        backup_thread.join()
+
     log.info(f"Pipeline concluído. Duplicatas: {len(duplicates)}. Relatório: {report_path}")
 
 
@@ -0,0 +1,53 @@
+"""Micro-benchmark do parse de datas EXIF.
+
+Compara `DateTimeParser._parse_exif_datetime` (posições fixas + alternativas
+pré-compiladas) com o `strptime` usado antes, e mostra o custo estimado por
+milhão de datas.
+
+Run: venv/Scripts/python.exe scripts/bench_datetime.py [--n 200000]
+"""
+import sys
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+
+import argparse
+import timeit
+from datetime import datetime
+
+from src.core.parsers import DateTimeParser
+
+SAMPLES = {
+    "exif": "2021:07:04 10:20:30",
+    "iso": "2021-07-04 10:20:30",
+}
+
+
+def strptime_parse(dt_str: str):
+    """Implementação anterior: até duas chamadas de strptime."""
+    try:
+        return datetime.strptime(dt_str, "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        try:
+            return datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parse de datas EXIF")
+    parser.add_argument("--n", type=int, default=200_000, help="Parses por medição")
+    args = parser.parse_args()
+
+    print(f"{'layout':<6} {'strptime':>14} {'rápido':>14} {'ganho':>7}   (segundos por milhão)")
+    for name, sample in SAMPLES.items():
+        assert strptime_parse(sample) == DateTimeParser._parse_exif_datetime(sample)
+        slow = min(timeit.repeat(lambda: strptime_parse(sample), number=args.n, repeat=3))
+        fast = min(timeit.repeat(lambda: DateTimeParser._parse_exif_datetime(sample), number=args.n, repeat=3))
+        scale = 1_000_000 / args.n
+        print(f"{name:<6} {slow * scale:>14.2f} {fast * scale:>14.2f} {slow / fast:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark de gravação de linhas na tabela `images`.
+
+Compara o caminho antigo (journal padrão, um commit por linha) com o
+`BatchWriter` (WAL, synchronous=NORMAL, executemany em transações de
+`--batch` linhas) e mostra linhas/segundo de cada um.
+
+Run: venv/Scripts/python.exe scripts/bench_db_writes.py [--rows 5000] [--batch 100]
+"""
+import sys
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src.database.batch_writer import BatchWriter
+from src.database.db_manager import IMAGE_INSERT_SQL, configure_connection, image_row
+from src.database.migrations import migrate
+
+
+def fake_rows(n: int):
+    start = datetime(2020, 1, 1)
+    for i in range(n):
+        meta = {
+            "file_path": f"/fotos/{i:07d}.jpg",
+            "file_name": f"{i:07d}.jpg",
+            "file_size": 2_000_000 + i,
+            "format": "JPEG",
+            "width": 4000,
+            "height": 3000,
+            "datetime": start + timedelta(seconds=i),
+            "camera_make": "Canon",
+            "camera_model": "EOS 5D",
+        }
+        yield meta, f"{i:032x}"
+
+
+def bench_per_row(db_path: Path, n: int) -> float:
+    conn = sqlite3.connect(str(db_path))
+    migrate(conn)
+    t0 = time.perf_counter()
+    for meta, md5 in fake_rows(n):
+        conn.execute(IMAGE_INSERT_SQL, image_row(meta, md5))
+        conn.commit()
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    return n / elapsed
+
+
+def bench_batched(db_path: Path, n: int, batch: int) -> float:
+    conn = configure_connection(sqlite3.connect(str(db_path)), cache_mb=64, mmap_mb=256)
+    migrate(conn)
+    t0 = time.perf_counter()
+    with BatchWriter(conn, batch) as writer:
+        for meta, md5 in fake_rows(n):
+            writer.add(IMAGE_INSERT_SQL, image_row(meta, md5))
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    return n / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de gravação no SQLite")
+    parser.add_argument("--rows", type=int, default=5000, help="Linhas gravadas por cenário")
+    parser.add_argument("--batch", type=int, default=100, help="Linhas por transação no BatchWriter")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = bench_per_row(Path(tmp) / "per_row.db", args.rows)
+        after = bench_batched(Path(tmp) / "batched.db", args.rows, args.batch)
+    print(f"commit por linha (journal padrão): {before:>10.0f} linhas/s")
+    print(f"BatchWriter + WAL ({args.batch}/transação): {after:>10.0f} linhas/s")
+    print(f"ganho: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
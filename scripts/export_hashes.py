@@ -3,23 +3,99 @@
 Gera CSV e JSON em output/reports/ contendo para cada imagem:
 - caminho, md5, phash (hex), closest_distance, closest_path
 
-Execute: venv/Scripts/python.exe scripts/export_hashes.py
+Os hashes vêm do `HashStore` mapeado em memória (espelho da tabela
+`perceptual_hashes`) ou do cache de rasters; só conteúdos ainda sem hash
+são decodificados, e os novos hashes são gravados. O vizinho mais próximo
+sai de uma consulta ao índice de faixas do store até `--radius`
+(closest_distance = -1 quando não há vizinho nesse raio). As linhas são
+escritas à medida que são calculadas, sem montar a lista inteira em memória.
+
+Execute: venv/Scripts/python.exe scripts/export_hashes.py [--radius 20] [--k 1]
 """
 import sys
 from pathlib import Path as _Path
 _root = _Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(_root))
+import argparse
 import sqlite3
 from pathlib import Path
 import csv
 import json
 from datetime import datetime
-from src.detection.similar_detector import SimilarDuplicateDetector
+import numpy as np
+from src.core.feature_cache import FeatureCache
+from src.database.db_manager import DBManager
+from src.database.hash_store import QUERY_CHUNK, HashStore, pack_digests
+from src.detection.incremental import hash_to_hex
+from src.detection.similar_detector import build_similar_detector
 from src.utils.config import get_config
 from src.utils.logger import init_logger, get_logger
 
+FIELDS = ["path", "md5", "phash", "closest_distance", "closest_path"]
+
+
+def load_hashes(dbm: DBManager, detector, paths_by_md5: dict) -> HashStore:
+    """`HashStore` com os hashes de `paths_by_md5`, calculando e gravando apenas os que faltam."""
+    log = get_logger()
+    bits = detector.hash_size * detector.hash_size
+    store = HashStore.for_db(dbm, detector.algorithm, detector.hash_size)
+    known = np.isin(pack_digests(paths_by_md5), store.digests)
+    missing = {paths_by_md5[md5][0]: md5 for md5, k in zip(paths_by_md5, known) if not k}
+    log.info(f"Hashes reaproveitados: {int(known.sum())}; a calcular: {len(missing)}")
+    if missing:
+        computed = detector.compute_hashes([Path(p) for p in missing], keys=missing)
+        fresh = {missing[p]: value for p, value in computed.items()}
+        for p in missing:
+            if p not in computed:
+                log.warning(f"Falha ao gerar phash para {p}")
+        dbm.save_hashes({md5: hash_to_hex(v, bits) for md5, v in fresh.items()},
+                        detector.algorithm, detector.hash_size)
+        store.refresh(dbm.conn)
+    return store
+
+
+def iter_entries(paths_by_md5: dict, store: HashStore, radius: int, k: int = 1):
+    """Gera uma entrada por caminho com os `k` vizinhos mais próximos."""
+    rows = np.flatnonzero(np.isin(store.digests, pack_digests(paths_by_md5)))
+    rows = rows[np.argsort(store.digests[rows], kind="stable")]
+    exported = np.zeros(len(store), dtype=bool)
+    exported[rows] = True
+    for start in range(0, len(rows), QUERY_CHUNK):
+        chunk = rows[start:start + QUERY_CHUNK]
+        qi, pos, dist = store.query(np.asarray(store.hashes[chunk]), radius)
+        keep = exported[pos] & (pos != chunk[qi])
+        qi, pos, dist = qi[keep], pos[keep], dist[keep]
+        # resultados vêm ordenados por consulta e distância
+        bounds = np.searchsorted(qi, np.arange(len(chunk) + 1))
+        for n, row in enumerate(chunk):
+            md5 = store.md5(row)
+            paths = paths_by_md5[md5]
+            lo = bounds[n]
+            hi = min(bounds[n + 1], lo + k)
+            others = [(store.md5(o), d) for o, d in zip(pos[lo:hi].tolist(), dist[lo:hi].tolist())]
+            for path in paths:
+                # cópias idênticas são vizinhas a distância 0
+                neighbors = [(p, 0) for p in paths if p != path][:k]
+                neighbors += [(paths_by_md5[o][0], d) for o, d in others][:k - len(neighbors)]
+                entry = {
+                    "path": path,
+                    "md5": md5,
+                    "phash": store.hex(row),
+                    "closest_distance": neighbors[0][1] if neighbors else -1,
+                    "closest_path": neighbors[0][0] if neighbors else None,
+                }
+                if k > 1:
+                    entry["neighbors"] = [{"path": p, "distance": d} for p, d in neighbors]
+                yield entry
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Exporta hashes e vizinhos mais próximos")
+    parser.add_argument("--radius", type=int, default=None,
+                        help="Distância máxima da busca (padrão: duplicates.pair_cache_ceiling ou 20)")
+    parser.add_argument("--k", type=int, default=1, help="Vizinhos por imagem (k > 1 só no JSON)")
+    args = parser.parse_args()
+
     init_logger(level="INFO")
     log = get_logger()
 
@@ -31,62 +107,41 @@ def main():
         return
 
     conn = sqlite3.connect(str(db_path))
-    cur = conn.execute("SELECT file_path, md5_hash FROM images")
-    rows = cur.fetchall()
-    paths = []
-    for r in rows:
-        p = Path(r[0])
-        if p.exists():
-            paths.append((p, r[1]))
-        else:
-            log.warning(f"Arquivo listado no DB não existe: {p}")
-
-    detector = SimilarDuplicateDetector()
-
-    # compute phashes
-    entries = []
-    for p, md5 in paths:
-        try:
-            ph = detector.compute_hash(p)
-            entries.append({"path": str(p), "md5": md5, "phash": str(ph)})
-        except Exception as e:
-            log.warning(f"Falha ao gerar phash para {p}: {e}")
-
-    # compute pairwise distances (small N expected)
-    for i, e in enumerate(entries):
-        min_dist = None
-        min_path = None
-        hi = detector.compute_hash(Path(e["path"]))
-        for j, f in enumerate(entries):
-            if i == j:
-                continue
-            hj = detector.compute_hash(Path(f["path"]))
-            try:
-                dist = hi - hj
-            except Exception:
-                continue
-            if min_dist is None or dist < min_dist:
-                min_dist = dist
-                min_path = f["path"]
-        e["closest_distance"] = int(min_dist) if min_dist is not None else -1
-        e["closest_path"] = min_path
+    paths_by_md5 = {}
+    for file_path, md5 in conn.execute("SELECT file_path, md5_hash FROM images ORDER BY file_path"):
+        if md5:
+            paths_by_md5.setdefault(md5, []).append(file_path)
+    conn.close()
+
+    dbm = DBManager(str(db_path))
+    dbm.init_tables()
+    feature_cache = FeatureCache.from_config(cfg)
+    detector = build_similar_detector(cfg, feature_cache)
+    store = load_hashes(dbm, detector, paths_by_md5)
+    dbm.close()
+    if feature_cache is not None:
+        feature_cache.close()
+
+    radius = args.radius if args.radius is not None else (cfg.duplicates.pair_cache_ceiling or 20)
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_csv = Path("output/reports") / f"hashes_{ts}.csv"
     out_json = Path("output/reports") / f"hashes_{ts}.json"
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
 
-    # write csv
-    with out_csv.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["path", "md5", "phash", "closest_distance", "closest_path"])
+    # csv e json escritos em streaming
+    count = 0
+    with out_csv.open("w", encoding="utf-8", newline="") as fc, out_json.open("w", encoding="utf-8") as fj:
+        writer = csv.DictWriter(fc, fieldnames=FIELDS, extrasaction="ignore")
         writer.writeheader()
-        for e in entries:
-            writer.writerow(e)
-
-    # write json
-    with out_json.open("w", encoding="utf-8") as f:
-        json.dump({"generated": ts, "entries": entries}, f, ensure_ascii=False, indent=2)
-
-    log.info(f"Exportados {len(entries)} hashes: {out_csv}, {out_json}")
+        fj.write(f'{{"generated": {json.dumps(ts)}, "entries": [')
+        for entry in iter_entries(paths_by_md5, store, radius, max(1, args.k)):
+            writer.writerow(entry)
+            fj.write(("," if count else "") + "\n  " + json.dumps(entry, ensure_ascii=False))
+            count += 1
+        fj.write("\n]}\n")
+
+    log.info(f"Exportados {count} hashes: {out_csv}, {out_json}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+"""
+Cache em disco dos rasters reduzidos usados pelos hashes perceptuais.
+
+Guarda, para cada conteúdo (md5), o raster normalizado em tons de cinza
+(64x64 uint8, ~4 KB). Qualquer algoritmo de `HASH_FUNCTIONS` com
+hash_size * 4 <= 64 pode ser recalculado a partir dele sem abrir o arquivo
+original, então trocar o algoritmo ou o hash_size não exige decodificar a
+biblioteca de novo. Rasters tirados de previews embutidos têm chave própria
+(`content_key`), separada da decodificação completa. O tamanho total é
+limitado por `performance.cache_size_mb`; ao passar do limite, as entradas
+usadas há mais tempo são descartadas.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+
+from .perceptual_hash import HASH_FUNCTIONS
+from src.utils.logger import get_logger
+
+CACHE_PATH = Path("data/cache/features.db")
+RASTER_SIZE = 64
+
+
+class FeatureCache:
+    """Rasters reduzidos chaveados pelo hash do conteúdo.
+
+    Args:
+        path: Arquivo SQLite do cache (criado se não existir)
+        max_mb: Tamanho máximo dos rasters guardados, em MB
+        size: Lado do raster quadrado
+    """
+
+    def __init__(self, path: Union[str, Path], max_mb: int = 500, size: int = RASTER_SIZE):
+        self.logger = get_logger()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.max_entries = max(1, int(max_mb * 1024 * 1024) // (size * size))
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rasters (
+                content_key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                pixels BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_rasters_last_used ON rasters(last_used)")
+        self.conn.commit()
+        # contagem mantida a cada gravação, sem COUNT(*) por lote
+        self._count = len(self)
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["FeatureCache"]:
+        """Cache em `CACHE_PATH` se `duplicates.feature_cache` estiver ativo, senão None."""
+        if not cfg.duplicates.feature_cache:
+            return None
+        return cls(CACHE_PATH, max_mb=cfg.performance.cache_size_mb)
+
+    @staticmethod
+    def content_key(md5: str, preview_min_size: Optional[int] = None) -> str:
+        """Chave do raster: o md5, com sufixo quando vem de preview embutido."""
+        return md5 if not preview_min_size else f"{md5}:preview{preview_min_size}"
+
+    def supports(self, hash_size: int) -> bool:
+        """True se o raster guardado é grande o bastante para esse hash_size."""
+        return hash_size * 4 <= self.size
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Retorna chave -> raster para as chaves presentes no cache."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        shape = (self.size, self.size)
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset:offset + 500]
+            marks = ",".join("?" * len(chunk))
+            cur = self.conn.execute(
+                f"SELECT content_key, pixels FROM rasters WHERE size = ? AND content_key IN ({marks})",
+                (self.size, *chunk),
+            )
+            for key, blob in cur:
+                found[key] = np.frombuffer(blob, dtype=np.uint8).reshape(shape)
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE rasters SET last_used = ? WHERE content_key = ?",
+                    [(now, key) for key in found],
+                )
+        return found
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, rasters: Dict[str, np.ndarray]) -> None:
+        """Grava rasters (size x size, uint8) e aplica o limite de tamanho."""
+        if not rasters:
+            return
+        now = time.time()
+        rows = []
+        for key, pixels in rasters.items():
+            pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+            if pixels.shape != (self.size, self.size):
+                raise ValueError(f"Raster {pixels.shape} difere do tamanho do cache ({self.size})")
+            rows.append((key, self.size, pixels.tobytes(), now))
+        existing = self._existing([row[0] for row in rows])
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rasters (content_key, size, pixels, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        self._count += len(rows) - existing
+        self._evict()
+
+    def put(self, key: str, pixels: np.ndarray) -> None:
+        self.put_many({key: pixels})
+
+    def hash(self, key: str, algorithm: str = "phash", hash_size: int = 16) -> Optional[int]:
+        """Recalcula um hash a partir do raster guardado (None se ausente)."""
+        pixels = self.get(key)
+        if pixels is None:
+            return None
+        return HASH_FUNCTIONS[algorithm](pixels, hash_size)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM rasters").fetchone()[0]
+
+    def _existing(self, keys) -> int:
+        """Quantas dessas chaves já estão no cache (busca pela chave primária)."""
+        found = 0
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset:offset + 500]
+            marks = ",".join("?" * len(chunk))
+            found += self.conn.execute(
+                f"SELECT COUNT(*) FROM rasters WHERE content_key IN ({marks})", chunk
+            ).fetchone()[0]
+        return found
+
+    def _evict(self) -> None:
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        with self.conn:
+            removed = self.conn.execute(
+                "DELETE FROM rasters WHERE content_key IN "
+                "(SELECT content_key FROM rasters ORDER BY last_used LIMIT ?)",
+                (excess,),
+            ).rowcount
+        self._count -= removed
+        self.logger.debug(f"Cache de rasters: {removed} entradas antigas descartadas")
+
+    def close(self) -> None:
+        self.conn.close()
@@ -45,13 +45,14 @@ class HashCalculator:
             self.logger.error(f"Erro ao calcular MD5 de {file_path}: {e}")
             return ""
 
-    def calculate_phash(self, file_path: Path, hash_size: int = 8) -> Optional[str]:
+    def calculate_phash(self, file_path: Path, hash_size: int = 16) -> Optional[str]:
         """
         Calcula hash perceptual (pHash) de uma imagem.
 
         Args:
             file_path: Caminho da imagem
-            hash_size: Tamanho do hash (default: 8)
+            hash_size: Tamanho do hash (default: 16, o mesmo do
+                `SimilarDuplicateDetector`, para os hashes serem comparáveis)
 
         Returns:
             Hash perceptual em hexadecimal ou None se erro
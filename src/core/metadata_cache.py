@@ -0,0 +1,205 @@
+"""
+Cache persistente de metadados.
+
+Os metadados lidos pelo `MetadataReader` ficam em SQLite (data/cache),
+chaveados pela identidade do arquivo (dispositivo, inode, tamanho e mtime
+em ns), com uma LRU em memória na frente. Qualquer alteração no arquivo
+muda a chave; mover/renomear mantém o inode, então a entrada continua
+válida e apenas os campos de caminho são atualizados na leitura.
+
+Entradas podem ser completas ou parciais (leituras projetadas, ex.: só
+`datetime`); uma entrada parcial só atende projeções contidas nela.
+
+As gravações passam por um `BatchWriter`: ficam em buffer (visíveis para
+`get`) e são gravadas em uma transação a cada `batch_size` entradas, no
+`flush` ao fim de `MetadataReader.read_many` ou no `close`, e não com um
+commit por arquivo.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Union
+
+from src.database.batch_writer import BatchWriter
+from src.utils.config import get_config
+from src.utils.logger import get_logger
+
+CACHE_PATH = Path("data/cache/metadata.db")
+# incrementar quando o conteúdo extraído pelo MetadataReader mudar;
+# entradas de versões anteriores são descartadas
+CACHE_VERSION = 5
+
+Identity = Tuple[int, int, int, int]
+
+_PATH_FIELDS = ("file_path", "file_name", "file_extension")
+
+
+def file_identity(stat: os.stat_result) -> Identity:
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="ignore")
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class MetadataCache:
+    """Cache de metadados em SQLite com LRU em memória (seguro entre threads).
+
+    Args:
+        path: Arquivo SQLite do cache
+        lru_size: Entradas mantidas em memória
+        batch_size: Entradas gravadas por transação
+    """
+
+    def __init__(self, path: Union[str, Path] = CACHE_PATH, lru_size: int = 4096, batch_size: int = 100):
+        self.logger = get_logger()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lru_size = max(0, lru_size)
+        self._lru: "OrderedDict[Identity, Tuple[Optional[FrozenSet[str]], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS metadata_cache")
+            self.conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metadata_cache (
+                dev INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                fields TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (dev, inode, size, mtime_ns)
+            )
+            """
+        )
+        self.conn.commit()
+        self._writer = BatchWriter(self.conn, batch_size)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, stat: os.stat_result, file_path: Path,
+            fields: Optional[FrozenSet[str]] = None) -> Optional[Dict[str, Any]]:
+        """Metadados em cache que cobrem `fields` (None = completos), ou None."""
+        key = file_identity(stat)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                entry = self._writer.pending(key) or self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            else:
+                self._lru.move_to_end(key)
+            if entry is None or not self._covers(entry[0], fields):
+                self.misses += 1
+                return None
+            self.hits += 1
+        metadata = dict(entry[1])
+        metadata.update(file_path=str(file_path), file_name=file_path.name,
+                        file_extension=file_path.suffix.lower())
+        if fields is not None:
+            metadata = {k: v for k, v in metadata.items() if k in fields or k == "file_path"}
+        return metadata
+
+    def put(self, stat: os.stat_result, metadata: Dict[str, Any],
+            fields: Optional[FrozenSet[str]] = None) -> None:
+        """Grava metadados completos (fields=None) ou parciais."""
+        if not metadata:
+            return
+        key = file_identity(stat)
+        data = {k: v for k, v in metadata.items() if k not in _PATH_FIELDS}
+        with self._lock:
+            if fields is not None:
+                current = self._lru.get(key) or self._writer.pending(key) or self._load(key)
+                if current is not None:
+                    if current[0] is None:
+                        return  # já há entrada completa
+                    fields = current[0] | fields
+                    data = {**current[1], **data}
+            entry = (fields, data)
+            self._writer.add(
+                "INSERT OR REPLACE INTO metadata_cache (dev, inode, size, mtime_ns, fields, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, None if fields is None else ",".join(sorted(fields)), json.dumps(data, default=_encode)),
+                key=key,
+                value=entry,
+            )
+            self._remember(key, entry)
+
+    def flush(self) -> None:
+        """Grava as entradas ainda em buffer."""
+        with self._lock:
+            self._writer.flush()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._writer.flush()
+            self.conn.execute("DELETE FROM metadata_cache")
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    @staticmethod
+    def _covers(stored: Optional[FrozenSet[str]], wanted: Optional[FrozenSet[str]]) -> bool:
+        if stored is None:
+            return True
+        return wanted is not None and wanted - set(_PATH_FIELDS) <= stored
+
+    def _load(self, key: Identity):
+        row = self.conn.execute(
+            "SELECT fields, data FROM metadata_cache WHERE dev = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        fields = None if row[0] is None else frozenset(row[0].split(","))
+        return fields, json.loads(row[1], object_hook=_decode)
+
+    def _remember(self, key: Identity, entry) -> None:
+        if not self.lru_size:
+            return
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+_shared_cache: Optional[MetadataCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_metadata_cache() -> Optional[MetadataCache]:
+    """Cache compartilhado do processo, conforme `performance.metadata_cache`."""
+    global _shared_cache
+    perf = get_config().performance
+    if not perf.metadata_cache:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = MetadataCache(
+                CACHE_PATH, lru_size=perf.metadata_cache_lru, batch_size=perf.batch_size
+            )
+            # leituras avulsas (fora de read_many) também chegam ao disco
+            atexit.register(_shared_cache.flush)
+        return _shared_cache
@@ -3,59 +3,252 @@ Leitor de metadados de imagens.
 
 Extrai metadados EXIF de arquivos de imagem, incluindo data/hora,
 informações da câmera, localização GPS e propriedades técnicas.
+
+Para JPEG, PNG e TIFF/RAW o arquivo é aberto uma única vez e só o
+cabeçalho é lido (`HeaderParser`; RAWs em contêiner TIFF pelo
+`TIFFParser`, sem PIL); os demais formatos passam pelo PIL.
+Com uma projeção de campos (ex.: só `datetime`) a leitura para assim que
+os campos pedidos são encontrados.
 """
 
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, FrozenSet, Iterable, Iterator, Sized, Tuple
 from PIL import Image
 
 from src.utils.logger import get_logger
-from .parsers import EXIFParser, GPSParser, DateTimeParser
+from .metadata_cache import MetadataCache
+from .photo_record import PhotoRecord
+from .parsers import EXIFParser, GPSParser, DateTimeParser, HeaderParser
+
+# campos resolvidos pela leitura projetada, sem o parse completo do EXIF
+PROJECTABLE_FIELDS = frozenset({
+    "file_path", "file_name", "file_size", "file_extension",
+    "width", "height", "mode", "format", "datetime", "utc_offset",
+})
+_DIMENSION_FIELDS = frozenset({"width", "height", "mode"})
 
 
 class MetadataReader:
     """Leitor de metadados de imagens."""
 
-    def __init__(self):
-        """Inicializa o leitor de metadados."""
+    def __init__(self, cache: Optional[MetadataCache] = None):
+        """
+        Inicializa o leitor de metadados.
+
+        Args:
+            cache: Cache persistente consultado antes de ler o arquivo
+                (ex.: `get_metadata_cache()`)
+        """
         self.logger = get_logger()
+        self.cache = cache
 
-    def read_metadata(self, file_path: Path) -> Dict[str, Any]:
+    def read_metadata(self, file_path: Path, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
-        Lê todos os metadados disponíveis de uma imagem.
+        Lê os metadados de uma imagem, passando pelo cache se houver.
 
         Args:
             file_path: Caminho do arquivo de imagem
+            fields: Projeção opcional (ex.: {"datetime"}); retorna só esses
+                campos e `file_path`. Se todos estão em `PROJECTABLE_FIELDS`,
+                a data vem do scanner rápido de DateTimeOriginal, sem PIL
 
         Returns:
             Dicionário com todos os metadados disponíveis
         """
-        if not file_path.exists():
+        if self.cache is None:
+            return self._read_uncached(file_path, fields)
+        fields = frozenset(fields) if fields is not None else None
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return self._read_uncached(file_path, fields)
+        metadata = self.cache.get(stat, file_path, fields)
+        if metadata is None:
+            # o stat da chave do cache é repassado: sem um segundo fstat na leitura
+            metadata = self._read_uncached(file_path, fields, stat)
+            if metadata.get("datetime") is not None:
+                self.cache.put(stat, metadata, fields)
+        return metadata
+
+    def _read_uncached(self, file_path: Path, fields: Optional[Iterable[str]] = None,
+                       stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Lê os metadados direto do arquivo (ver `read_metadata`); `stat` evita o fstat."""
+        fields = frozenset(fields) if fields is not None else None
+        projected = fields is not None and fields <= PROJECTABLE_FIELDS
+        try:
+            header = HeaderParser.read_header(
+                file_path, dimensions=not projected or bool(fields & _DIMENSION_FIELDS), stat=stat
+            )
+        except FileNotFoundError:
             self.logger.error(f"Arquivo não encontrado: {file_path}")
             return {}
+        except OSError as e:
+            self.logger.warning(f"Erro ao ler metadados de {file_path}: {e}")
+            return {}
+
+        stat = header["stat"]
+        if projected:
+            metadata = self._read_projected(file_path, header, fields)
+            if metadata is not None:
+                return metadata
 
         metadata = {
             "file_path": str(file_path),
             "file_name": file_path.name,
-            "file_size": file_path.stat().st_size,
+            "file_size": stat.st_size,
             "file_extension": file_path.suffix.lower(),
         }
 
         try:
-            # Ler metadados da imagem com PIL
-            with Image.open(file_path) as img:
-                metadata.update(self._read_basic_info(img))
-                metadata.update(EXIFParser.read_exif_data(file_path))
+            if "ifds" in header:
+                # contêiner TIFF: tudo vem dos IFDs já percorridos
+                metadata.update(self._header_basic_info(header))
+                metadata.update(EXIFParser.parse_ifds(header["ifds"]))
+            elif header.get("width"):
+                metadata.update(self._header_basic_info(header))
+                if header["exif"]:
+                    metadata.update(EXIFParser.parse_exif(header["exif"]))
+            else:
+                # Formato sem parser de cabeçalho: ler metadados com PIL
+                with Image.open(file_path) as img:
+                    metadata.update(self._read_basic_info(img))
+                    metadata.update(EXIFParser.read_exif_data(file_path))
 
             # Determinar data/hora
-            metadata["datetime"] = DateTimeParser._get_datetime(metadata, file_path)
+            metadata["datetime"] = DateTimeParser._get_datetime(metadata, file_path, stat.st_mtime)
+            metadata["utc_offset"] = DateTimeParser._get_utc_offset(metadata)
 
         except Exception as e:
             self.logger.warning(f"Erro ao ler metadados de {file_path}: {e}")
 
+        if fields is not None:
+            return {k: v for k, v in metadata.items() if k in fields or k == "file_path"}
+        return metadata
+
+    def _read_projected(
+        self, file_path: Path, header: Dict[str, Any], fields: FrozenSet[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Resolve a projeção só com o cabeçalho; None se precisar da leitura completa."""
+        if "format" not in header:
+            return None
+        stat = header["stat"]
+        metadata: Dict[str, Any] = {"file_path": str(file_path)}
+        if "file_name" in fields:
+            metadata["file_name"] = file_path.name
+        if "file_size" in fields:
+            metadata["file_size"] = stat.st_size
+        if "file_extension" in fields:
+            metadata["file_extension"] = file_path.suffix.lower()
+        if fields & _DIMENSION_FIELDS and not header.get("width"):
+            return None
+        for key in ("width", "height", "mode", "format"):
+            if key in fields:
+                metadata[key] = header[key]
+        if fields & {"datetime", "utc_offset"}:
+            # mesmos campos (data, subsegundos, fuso) que a leitura completa usa
+            if "ifds" in header:
+                dates = EXIFParser._parse_exif_ifd(header["ifds"]["Exif"])
+            else:
+                exif = header["exif"]
+                dates = DateTimeParser.scan_exif_dates(exif) if exif else {}
+            if "datetime" in fields:
+                metadata["datetime"] = DateTimeParser._get_datetime(dates, file_path, stat.st_mtime)
+            if "utc_offset" in fields:
+                metadata["utc_offset"] = DateTimeParser._get_utc_offset(dates)
         return metadata
 
+    def read_many(
+        self,
+        paths: Iterable[Path],
+        workers: int = 0,
+        ordered: bool = False,
+        queue_depth: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        """
+        Lê metadados de vários arquivos em um pool de threads.
+
+        Os resultados são gerados à medida que ficam prontos; no máximo
+        `queue_depth` leituras ficam em andamento ao mesmo tempo, então
+        `paths` pode ser um iterador longo. Ao terminar, as entradas novas do
+        cache são gravadas de uma vez (`MetadataCache.flush`).
+
+        Args:
+            paths: Caminhos dos arquivos
+            workers: Número de threads (0 = automático)
+            ordered: Se True, gera os resultados na ordem de `paths`
+            queue_depth: Leituras em andamento (padrão: 4 por thread)
+            fields: Projeção de campos repassada a `read_metadata`
+
+        Yields:
+            Tuplas (caminho, metadados). Uma falha afeta só o seu item, que
+            vem com metadados `{"error": "<mensagem>"}`.
+        """
+        # mesmo padrão do ThreadPoolExecutor: leitura de cabeçalho é limitada por I/O
+        workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        if isinstance(paths, Sized):
+            workers = min(workers, max(1, len(paths)))  # sem threads ociosas para listas curtas
+        depth = max(1, queue_depth or workers * 4)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metadata")
+        source = iter(paths)
+        pending = deque()
+
+        def fill() -> None:
+            while len(pending) < depth:
+                path = next(source, None)
+                if path is None:
+                    return
+                pending.append((path, pool.submit(self.read_metadata, Path(path), fields)))
+
+        try:
+            fill()
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    wait([fut for _, fut in pending], return_when=FIRST_COMPLETED)
+                    done = [item for item in pending if item[1].done()]
+                    for item in done:
+                        pending.remove(item)
+                for path, fut in done:
+                    try:
+                        metadata = fut.result()
+                    except Exception as e:
+                        self.logger.warning(f"Erro ao ler metadados de {path}: {e}")
+                        metadata = {"error": str(e)}
+                    yield Path(path), metadata
+                fill()
+        finally:
+            for _, fut in pending:
+                fut.cancel()
+            pool.shutdown(wait=True)
+            if self.cache is not None:
+                self.cache.flush()
+
+    def read_records(self, paths: Iterable[Path], workers: int = 0,
+                     ordered: bool = False) -> Iterator[PhotoRecord]:
+        """
+        Como `read_many`, mas gera `PhotoRecord` compactos em vez de dicionários.
+
+        Falhas de leitura geram registros só com o caminho e `error`.
+        """
+        for path, metadata in self.read_many(paths, workers=workers, ordered=ordered):
+            yield PhotoRecord.from_metadata(path, metadata)
+
+    @staticmethod
+    def _header_basic_info(header: Dict[str, Any]) -> Dict[str, Any]:
+        """Informações básicas vindas do cabeçalho (SOF/IHDR/IFD0)."""
+        return {
+            "width": header["width"],
+            "height": header["height"],
+            "mode": header["mode"],
+            "format": header["format"],
+        }
+
     def _read_basic_info(self, img: Image.Image) -> Dict[str, Any]:
         """Lê informações básicas da imagem."""
         return {
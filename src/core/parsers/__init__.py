@@ -7,9 +7,13 @@ Este pacote contém todos os parsers especializados para metadados de imagem.
 from .exif_parser import EXIFParser
 from .gps_parser import GPSParser
 from .datetime_parser import DateTimeParser
+from .header_parser import HeaderParser
+from .tiff_parser import TIFFParser
 
 __all__ = [
     "EXIFParser",
     "GPSParser",
     "DateTimeParser",
+    "HeaderParser",
+    "TIFFParser",
 ]
\ No newline at end of file
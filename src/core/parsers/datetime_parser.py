@@ -2,76 +2,237 @@
 DateTime Parser Module.
 
 Responsável por extrair e parsear informações de data/hora de metadados.
+
+O layout EXIF fixo ("YYYY:MM:DD HH:MM:SS") é lido por fatias de posição
+fixa, sem `strptime`; outros layouts passam por uma lista de expressões
+pré-compiladas. SubSecTimeOriginal vira microssegundos e
+OffsetTimeOriginal vira um deslocamento UTC em minutos (ver `to_utc`).
 """
 
+import re
+import struct
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Tuple
+
+
+# tags EXIF usadas pelo scanner rápido -> chave no dicionário de metadados
+_EXIF_IFD_POINTER = 0x8769
+_SCANNED_DATE_TAGS = {
+    0x9003: "datetime_original",
+    0x9004: "datetime_digitized",
+    0x9291: "subsec_time_original",
+    0x9292: "subsec_time_digitized",
+    0x9011: "offset_time_original",
+    0x9012: "offset_time_digitized",
+}
+# (data, subsegundos, fuso) em ordem de prioridade
+_DATE_FIELDS = (
+    ("datetime_original", "subsec_time_original", "offset_time_original"),
+    ("datetime_digitized", "subsec_time_digitized", "offset_time_digitized"),
+)
+
+# layouts alternativos: ISO, separadores "-", "/" ou ".", sem segundos
+_ALTERNATE_DATETIME = (
+    re.compile(r"(\d{4})[:\-/.](\d{1,2})[:\-/.](\d{1,2})[ T](\d{1,2}):(\d{2})(?::(\d{2}))?(?:[.,](\d+))?"),
+    re.compile(r"(\d{4})[:\-/.](\d{1,2})[:\-/.](\d{1,2})$"),
+)
+_UTC_OFFSET = re.compile(r"([+-])(\d{2}):?(\d{2})$")
 
 
 class DateTimeParser:
     """Parser para informações de data e hora."""
 
     @staticmethod
-    def _parse_exif_datetime(dt_str: str) -> Optional[datetime]:
+    def scan_exif_datetime(data: bytes) -> Optional[str]:
+        """
+        Procura DateTimeOriginal (ou DateTimeDigitized) direto nos bytes EXIF.
+
+        Args:
+            data: Segmento APP1 ("Exif\\0\\0...") ou início de um TIFF
+
+        Returns:
+            String de data/hora EXIF ou None se ausente/fora dos bytes lidos
+        """
+        dates = DateTimeParser.scan_exif_dates(data)
+        return dates.get("datetime_original") or dates.get("datetime_digitized")
+
+    @staticmethod
+    def scan_exif_dates(data: bytes) -> Dict[str, str]:
+        """
+        Lê as tags de data do EXIF IFD direto nos bytes, sem o parse completo.
+
+        Percorre só as entradas do IFD0 e do EXIF IFD, sem decodificar os
+        valores das demais tags. Todas as entradas são visitadas: muitas
+        câmeras e editores gravam IFDs fora da ordem numérica.
+
+        Args:
+            data: Segmento APP1 ("Exif\\0\\0...") ou início de um TIFF
+
+        Returns:
+            Dicionário com as chaves do `EXIFParser` (`datetime_original`,
+            `subsec_time_original`, `offset_time_original` e as de
+            Digitized) presentes; vazio se ausente/fora dos bytes lidos
+        """
+        tiff = memoryview(data)
+        if bytes(tiff[:6]) == b"Exif\x00\x00":
+            tiff = tiff[6:]
+        found: Dict[str, str] = {}
+        try:
+            order = "<" if bytes(tiff[:2]) == b"II" else ">"
+            exif_ifd = DateTimeParser._find_tag(tiff, order, struct.unpack_from(order + "I", tiff, 4)[0],
+                                                _EXIF_IFD_POINTER)
+            if exif_ifd is None:
+                return found
+            offset = struct.unpack_from(order + "I", exif_ifd, 8)[0]
+            count = struct.unpack_from(order + "H", tiff, offset)[0]
+            for i in range(count):
+                entry = offset + 2 + 12 * i
+                tag, _, length, value = struct.unpack_from(order + "HHII", tiff, entry)
+                key = _SCANNED_DATE_TAGS.get(tag)
+                if key is None:
+                    continue
+                start = entry + 8 if length <= 4 else value
+                raw = bytes(tiff[start:start + length])
+                if len(raw) == length:
+                    found[key] = raw.decode("ascii", errors="ignore").strip("\x00 ")
+        except struct.error:
+            pass
+        return {k: v for k, v in found.items() if v}
+
+    @staticmethod
+    def _find_tag(tiff: memoryview, order: str, offset: int, wanted: int) -> Optional[memoryview]:
+        """Retorna a entrada (12 bytes) da tag `wanted` no IFD em `offset`."""
+        count = struct.unpack_from(order + "H", tiff, offset)[0]
+        for i in range(count):
+            entry = offset + 2 + 12 * i
+            tag = struct.unpack_from(order + "H", tiff, entry)[0]
+            if tag == wanted:
+                return tiff[entry:entry + 12]
+        return None
+
+    @staticmethod
+    def _parse_exif_datetime(dt_str: str, subsec: Optional[str] = None) -> Optional[datetime]:
         """
         Parse data/hora do formato EXIF.
 
         Args:
             dt_str: String de data/hora no formato EXIF
+            subsec: SubSecTime correspondente (ex.: "045" -> 45 ms)
 
         Returns:
             Objeto datetime ou None se inválido
         """
-        if not dt_str or dt_str.strip() == '':
+        if not dt_str:
             return None
-
+        s = dt_str.strip()
         try:
-            # Formato EXIF: "YYYY:MM:DD HH:MM:SS"
-            return datetime.strptime(dt_str, "%Y:%m:%d %H:%M:%S")
+            # Formato EXIF: "YYYY:MM:DD HH:MM:SS" em posições fixas
+            if len(s) == 19 and s[4] == s[7] == ":" and s[10] == " " and s[13] == s[16] == ":":
+                dt = datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                              int(s[11:13]), int(s[14:16]), int(s[17:19]))
+            else:
+                dt = DateTimeParser._parse_alternate(s)
+                if dt is None:
+                    return None
         except ValueError:
-            try:
-                # Tentar outros formatos comuns
-                return datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                return None
+            return None
+        if subsec:
+            digits = subsec.strip()[:6]
+            if digits.isdigit():
+                dt = dt.replace(microsecond=int(digits.ljust(6, "0")))
+        return dt
+
+    @staticmethod
+    def _parse_alternate(s: str) -> Optional[datetime]:
+        for pattern in _ALTERNATE_DATETIME:
+            match = pattern.match(s)
+            if match:
+                parts = match.groups()
+                fields = [int(p) for p in parts[:6] if p]
+                dt = datetime(*fields)
+                if len(parts) > 6 and parts[6]:
+                    dt = dt.replace(microsecond=int(parts[6][:6].ljust(6, "0")))
+                return dt
+        return None
+
+    @staticmethod
+    def parse_utc_offset(offset: Optional[str]) -> Optional[int]:
+        """
+        Converte um OffsetTime EXIF ("+02:00", "-0330") em minutos.
+
+        Returns:
+            Deslocamento em minutos ou None se ausente/inválido
+        """
+        if not offset:
+            return None
+        match = _UTC_OFFSET.match(offset.strip())
+        if not match:
+            return None
+        sign, hours, minutes = match.groups()
+        total = int(hours) * 60 + int(minutes)
+        if total > 14 * 60:
+            return None
+        return -total if sign == "-" else total
+
+    @staticmethod
+    def to_utc(dt: datetime, utc_offset: Optional[int]) -> datetime:
+        """Datetime ciente em UTC a partir da hora local e do deslocamento (minutos)."""
+        if utc_offset is None:
+            return dt.astimezone(timezone.utc)
+        return dt.replace(tzinfo=timezone(timedelta(minutes=utc_offset))).astimezone(timezone.utc)
 
     @staticmethod
-    def _get_datetime(metadata: dict, file_path: Path) -> datetime:
+    def _get_datetime(metadata: dict, file_path: Path, mtime: Optional[float] = None) -> datetime:
         """
         Determina a melhor data/hora disponível para a imagem.
 
         Args:
             metadata: Dicionário com metadados
             file_path: Caminho do arquivo
+            mtime: `st_mtime` já obtido (evita um novo stat)
 
         Returns:
-            Objeto datetime determinado
+            Objeto datetime determinado (hora local da câmera, sem fuso)
         """
         # Prioridade: DateTimeOriginal > DateTimeDigitized > data do arquivo
-        datetime_str = metadata.get("datetime_original") or metadata.get("datetime_digitized")
-
-        if datetime_str:
-            parsed_dt = DateTimeParser._parse_exif_datetime(datetime_str)
-            if parsed_dt:
-                return parsed_dt
+        parsed_dt, _ = DateTimeParser._get_exif_datetime(metadata)
+        if parsed_dt:
+            return parsed_dt
 
         # Fallback para data do arquivo
-        return DateTimeParser._get_file_datetime(file_path)
+        return DateTimeParser._get_file_datetime(file_path, mtime)
+
+    @staticmethod
+    def _get_utc_offset(metadata: dict) -> Optional[int]:
+        """Deslocamento UTC (minutos) do mesmo campo usado por `_get_datetime`."""
+        return DateTimeParser._get_exif_datetime(metadata)[1]
+
+    @staticmethod
+    def _get_exif_datetime(metadata: dict) -> Tuple[Optional[datetime], Optional[int]]:
+        """(data, deslocamento UTC) do primeiro campo EXIF de data que é válido."""
+        for key, subsec_key, offset_key in _DATE_FIELDS:
+            datetime_str = metadata.get(key)
+            if datetime_str:
+                parsed_dt = DateTimeParser._parse_exif_datetime(datetime_str, metadata.get(subsec_key))
+                if parsed_dt:
+                    return parsed_dt, DateTimeParser.parse_utc_offset(metadata.get(offset_key))
+        return None, None
 
     @staticmethod
-    def _get_file_datetime(file_path: Path) -> datetime:
+    def _get_file_datetime(file_path: Path, mtime: Optional[float] = None) -> datetime:
         """
         Obtém data/hora da modificação do arquivo.
 
         Args:
             file_path: Caminho do arquivo
+            mtime: `st_mtime` já obtido (evita um novo stat)
 
         Returns:
             Objeto datetime da modificação do arquivo
         """
         try:
-            timestamp = file_path.stat().st_mtime
+            timestamp = mtime if mtime is not None else file_path.stat().st_mtime
             return datetime.fromtimestamp(timestamp)
         except (OSError, ValueError):
             return datetime.now()
\ No newline at end of file
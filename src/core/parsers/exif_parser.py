@@ -5,10 +5,12 @@ Responsável por extrair e parsear dados EXIF de imagens.
 """
 
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Union
 import piexif
 from PIL import Image
 
+from .gps_parser import GPSParser
+
 
 class EXIFParser:
     """Parser para dados EXIF de imagens."""
@@ -24,8 +26,36 @@ class EXIFParser:
         Returns:
             Dicionário com dados EXIF parseados
         """
+        return EXIFParser.parse_exif(str(file_path))
+
+    @staticmethod
+    def parse_exif(data: Union[str, bytes]) -> Dict[str, Any]:
+        """
+        Parseia EXIF a partir de um caminho ou de bytes já lidos.
+
+        Args:
+            data: Caminho, segmento APP1 ("Exif\\0\\0...") ou início de um TIFF
+
+        Returns:
+            Dicionário com dados EXIF parseados ({} se inválido)
+        """
+        try:
+            return EXIFParser.parse_ifds(piexif.load(data))
+        except Exception:
+            return {}
+
+    @staticmethod
+    def parse_ifds(exif_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parseia IFDs já carregados (formato do `piexif.load` ou do `TIFFParser`).
+
+        Args:
+            exif_dict: Dicionário com "0th", "Exif" e/ou "GPS"
+
+        Returns:
+            Dicionário com dados EXIF parseados ({} se inválido)
+        """
         try:
-            exif_dict = piexif.load(str(file_path))
             metadata = {}
 
             # Parse IFD0 (informações básicas)
@@ -38,7 +68,7 @@ class EXIFParser:
 
             # Parse GPS IFD
             if "GPS" in exif_dict:
-                metadata.update(EXIFParser._parse_gps(exif_dict["GPS"]))
+                metadata.update(GPSParser._parse_gps(exif_dict["GPS"]))
 
             return metadata
         except Exception:
@@ -84,6 +114,16 @@ class EXIFParser:
             dt_str = exif_ifd[piexif.ExifIFD.DateTimeDigitized].decode('utf-8', errors='ignore').strip('\x00')
             metadata["datetime_digitized"] = dt_str
 
+        # Frações de segundo e fuso horário das datas (EXIF 2.31)
+        for tag, key in (
+            (piexif.ExifIFD.SubSecTimeOriginal, "subsec_time_original"),
+            (piexif.ExifIFD.SubSecTimeDigitized, "subsec_time_digitized"),
+            (piexif.ExifIFD.OffsetTimeOriginal, "offset_time_original"),
+            (piexif.ExifIFD.OffsetTimeDigitized, "offset_time_digitized"),
+        ):
+            if tag in exif_ifd:
+                metadata[key] = exif_ifd[tag].decode('utf-8', errors='ignore').strip('\x00 ')
+
         # Configurações da câmera
         if piexif.ExifIFD.FNumber in exif_ifd:
             metadata["f_number"] = exif_ifd[piexif.ExifIFD.FNumber]
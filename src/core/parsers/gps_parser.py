@@ -7,6 +7,8 @@ Responsável por extrair e parsear coordenadas GPS de metadados EXIF.
 from typing import Dict, Any, Optional
 import piexif
 
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
 
 class GPSParser:
     """Parser para dados GPS de imagens."""
@@ -35,6 +37,9 @@ class GPSParser:
                     longitude = -longitude
                 metadata["longitude"] = longitude
 
+            if "latitude" in metadata and "longitude" in metadata:
+                metadata["geohash"] = GPSParser.encode_geohash(metadata["latitude"], metadata["longitude"])
+
             # Altitude
             if piexif.GPSIFD.GPSAltitude in gps_ifd:
                 alt = gps_ifd[piexif.GPSIFD.GPSAltitude]
@@ -56,6 +61,38 @@ class GPSParser:
 
         return metadata
 
+    @staticmethod
+    def encode_geohash(latitude: float, longitude: float, precision: int = 9) -> str:
+        """
+        Codifica uma coordenada em geohash (9 caracteres ~ 5 m).
+
+        Args:
+            latitude: Latitude em graus decimais
+            longitude: Longitude em graus decimais
+            precision: Número de caracteres
+
+        Returns:
+            Geohash em base 32
+        """
+        lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+        chars = []
+        bits, bit_count, even = 0, 0, True
+        while len(chars) < precision:
+            rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+            mid = (rng[0] + rng[1]) / 2
+            bits <<= 1
+            if value >= mid:
+                bits |= 1
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+            bit_count += 1
+            if bit_count == 5:
+                chars.append(_GEOHASH_ALPHABET[bits])
+                bits, bit_count = 0, 0
+        return "".join(chars)
+
     @staticmethod
     def _convert_gps_coordinate(coord: tuple) -> float:
         """
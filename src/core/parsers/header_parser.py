@@ -0,0 +1,117 @@
+"""
+Header Parser Module.
+
+Lê apenas o cabeçalho de uma imagem, com uma única abertura do arquivo e
+um único `fstat`: segmentos APP/SOF do JPEG, o chunk IHDR do PNG e os IFDs
+de contêineres TIFF (TIFF, DNG e RAWs como CR2/NEF, via `TIFFParser`).
+Dimensões vêm do SOF/IHDR/IFDs; o bloco EXIF do JPEG é devolvido em bytes
+para o `EXIFParser`, sem carregar o arquivo inteiro na memória.
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .tiff_parser import TIFFParser
+
+# SOF0..SOF15, exceto DHT (C4), JPG (C8) e DAC (CC)
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_JPEG_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+_PNG_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+
+
+class HeaderParser:
+    """Parser de cabeçalhos de imagem (JPEG, PNG e TIFF/RAW)."""
+
+    @staticmethod
+    def read_header(file_path: Path, dimensions: bool = True,
+                    stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """
+        Lê o cabeçalho de um arquivo de imagem.
+
+        Args:
+            file_path: Caminho do arquivo
+            dimensions: Se False, em JPEGs para logo após o segmento EXIF
+                (sem `width`/`height`/`mode`)
+            stat: `os.stat_result` já obtido pelo chamador (dispensa o `fstat`)
+
+        Returns:
+            Dicionário com `stat` (os.stat_result) e, quando o formato é
+            reconhecido, `format`, `width`, `height`, `mode` e `exif` (bytes
+            ou None). Contêineres TIFF trazem também `ifds` (ver
+            `TIFFParser.read`). Formatos não reconhecidos trazem só `stat`.
+
+        Raises:
+            OSError: Se o arquivo não puder ser aberto
+        """
+        with open(file_path, "rb") as f:
+            header: Dict[str, Any] = {"stat": stat if stat is not None else os.fstat(f.fileno())}
+            magic = f.read(8)
+            try:
+                if magic[:2] == b"\xff\xd8":
+                    header.update(HeaderParser._read_jpeg(f, dimensions))
+                elif magic == b"\x89PNG\r\n\x1a\n":
+                    header.update(HeaderParser._read_png(f))
+                elif TIFFParser.is_tiff(magic):
+                    header.update(HeaderParser._read_tiff(f, Path(file_path)))
+            except (struct.error, IndexError, ValueError, OSError):
+                # cabeçalho truncado ou corrompido: quem chamou usa o caminho lento
+                pass
+        return header
+
+    @staticmethod
+    def _read_jpeg(f, dimensions: bool = True) -> Dict[str, Any]:
+        info: Dict[str, Any] = {"format": "JPEG", "exif": None}
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                break
+            code = marker[1]
+            while code == 0xFF:  # bytes de preenchimento
+                code = f.read(1)[0]
+            if code == 0x01 or 0xD0 <= code <= 0xD8:
+                continue
+            if code in (0xD9, 0xDA):  # EOI / início dos dados comprimidos
+                break
+            length = struct.unpack(">H", f.read(2))[0] - 2
+            if code == 0xE1 and info["exif"] is None:
+                data = f.read(length)
+                if data.startswith(b"Exif\x00\x00"):
+                    info["exif"] = data
+                    if not dimensions:
+                        break
+            elif code in _SOF_MARKERS:
+                _, height, width, components = struct.unpack(">BHHB", f.read(6))
+                info.update(width=width, height=height, mode=_JPEG_MODES.get(components, "RGB"))
+                break
+            else:
+                f.seek(length, os.SEEK_CUR)
+        return info
+
+    @staticmethod
+    def _read_png(f) -> Dict[str, Any]:
+        length, chunk = struct.unpack(">I4s", f.read(8))
+        if chunk != b"IHDR" or length < 13:
+            raise ValueError("PNG sem IHDR")
+        width, height, depth, color = struct.unpack(">IIBB", f.read(10))
+        mode = _PNG_MODES.get(color, "RGB")
+        if color == 0 and depth == 16:
+            mode = "I;16"
+        return {"format": "PNG", "width": width, "height": height, "mode": mode, "exif": None}
+
+    @staticmethod
+    def _read_tiff(f, file_path: Path) -> Dict[str, Any]:
+        ifds = TIFFParser.read(f)
+        width, height = TIFFParser.dimensions(ifds) or (None, None)
+        ext = file_path.suffix.lower()
+        fmt = "TIFF" if ext in ("", ".tif", ".tiff") else ext.lstrip(".").upper()
+        return {
+            "format": fmt,
+            "width": width,
+            "height": height,
+            "mode": TIFFParser.mode(ifds),
+            "exif": None,
+            "ifds": ifds,
+        }
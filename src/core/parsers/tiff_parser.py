@@ -0,0 +1,191 @@
+"""
+TIFF Parser Module.
+
+Percorre os IFDs de contêineres TIFF (TIFF, DNG, CR2, NEF, ARW, ORF, RW2)
+indo direto aos offsets com `seek`: só as tabelas de entradas e os valores
+que não cabem nelas são lidos, poucas leituras pequenas em vez do arquivo
+inteiro. As tags são devolvidas no mesmo formato do `piexif.load` (ASCII em
+bytes, RATIONAL como (num, den), contagem > 1 como tupla), para que o
+`EXIFParser` e o `GPSParser` interpretem os valores sem mudanças.
+"""
+
+import struct
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+# assinaturas: TIFF padrão e variantes de RAW (ORF, RW2)
+TIFF_MAGICS = (b"II*\x00", b"MM\x00*", b"IIRO", b"MMOR", b"IIU\x00")
+
+# tipo -> (formato struct, tamanho em bytes)
+_TYPES = {
+    1: ("B", 1), 2: ("s", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8),
+    6: ("b", 1), 7: ("s", 1), 8: ("h", 2), 9: ("i", 4), 10: ("ii", 8),
+    11: ("f", 4), 12: ("d", 8), 13: ("I", 4),
+}
+
+NEW_SUBFILE_TYPE = 0x00FE
+IMAGE_WIDTH = 0x0100
+IMAGE_LENGTH = 0x0101
+COMPRESSION = 0x0103
+PHOTOMETRIC = 0x0106
+STRIP_OFFSETS = 0x0111
+SAMPLES_PER_PIXEL = 0x0115
+STRIP_BYTE_COUNTS = 0x0117
+SUB_IFDS = 0x014A
+JPEG_OFFSET = 0x0201
+JPEG_LENGTH = 0x0202
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+PIXEL_X_DIMENSION = 0xA002
+PIXEL_Y_DIMENSION = 0xA003
+
+# Compression = 6/7: dados JPEG (old-style / novo)
+_JPEG_COMPRESSION = (6, 7)
+# limites contra arquivos corrompidos
+_MAX_ENTRIES = 1024
+_MAX_VALUE_BYTES = 64 * 1024
+_MAX_IFDS = 32
+
+
+class TIFFParser:
+    """Leitor de IFDs de contêineres TIFF por acesso direto aos offsets."""
+
+    @staticmethod
+    def is_tiff(magic: bytes) -> bool:
+        return magic[:4] in TIFF_MAGICS
+
+    @staticmethod
+    def read(f: BinaryIO) -> Dict[str, Any]:
+        """
+        Lê a estrutura de IFDs de um arquivo TIFF aberto.
+
+        Args:
+            f: Arquivo aberto em modo binário
+
+        Returns:
+            Dicionário com "0th", "Exif" e "GPS" (tags no formato piexif),
+            "images" (todos os IFDs de imagem: IFD0, cadeia e SubIFDs) e
+            "previews" (lista de (offset, tamanho) de JPEGs embutidos)
+
+        Raises:
+            ValueError: Se o arquivo não for um TIFF válido
+        """
+        f.seek(0)
+        head = f.read(8)
+        if not TIFFParser.is_tiff(head):
+            raise ValueError("Não é um contêiner TIFF")
+        order = "<" if head[:2] == b"II" else ">"
+        walker = _IFDWalker(f, order)
+
+        images: List[Dict[int, Any]] = []
+        offset = struct.unpack(order + "I", head[4:8])[0]
+        queue = [offset]
+        seen = set()
+        while queue and len(seen) < _MAX_IFDS:
+            offset = queue.pop(0)
+            if not offset or offset in seen:
+                continue
+            seen.add(offset)
+            tags, next_offset = walker.read_ifd(offset)
+            images.append(tags)
+            subs = tags.get(SUB_IFDS)
+            if subs is not None:
+                queue.extend(subs if isinstance(subs, tuple) else (subs,))
+            if next_offset:
+                queue.append(next_offset)
+
+        ifd0 = images[0] if images else {}
+        exif = walker.read_ifd(ifd0[EXIF_IFD])[0] if isinstance(ifd0.get(EXIF_IFD), int) else {}
+        gps = walker.read_ifd(ifd0[GPS_IFD])[0] if isinstance(ifd0.get(GPS_IFD), int) else {}
+        return {
+            "0th": ifd0,
+            "Exif": exif,
+            "GPS": gps,
+            "images": images,
+            "previews": TIFFParser._previews(images),
+        }
+
+    @staticmethod
+    def dimensions(info: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        """Maior imagem de resolução cheia (NewSubfileType = 0); senão a maior."""
+        best, best_full = None, None
+        for tags in info["images"]:
+            width, height = tags.get(IMAGE_WIDTH), tags.get(IMAGE_LENGTH)
+            if not isinstance(width, int) or not isinstance(height, int):
+                continue
+            size = (width, height)
+            if best is None or width * height > best[0] * best[1]:
+                best = size
+            if tags.get(NEW_SUBFILE_TYPE, 0) == 0 and (best_full is None or width * height > best_full[0] * best_full[1]):
+                best_full = size
+        exif = info["Exif"]
+        if best_full is None and isinstance(exif.get(PIXEL_X_DIMENSION), int):
+            return exif[PIXEL_X_DIMENSION], exif.get(PIXEL_Y_DIMENSION)
+        return best_full or best
+
+    @staticmethod
+    def mode(info: Dict[str, Any]) -> str:
+        ifd0 = info["0th"]
+        if ifd0.get(PHOTOMETRIC) == 5:
+            return "CMYK"
+        return {1: "L", 2: "LA", 3: "RGB", 4: "RGBA"}.get(ifd0.get(SAMPLES_PER_PIXEL, 3), "RGB")
+
+    @staticmethod
+    def _previews(images: List[Dict[int, Any]]) -> List[Tuple[int, int]]:
+        ranges = []
+        for tags in images:
+            if tags.get(COMPRESSION) in _JPEG_COMPRESSION:
+                offsets, lengths = tags.get(STRIP_OFFSETS), tags.get(STRIP_BYTE_COUNTS)
+                if isinstance(offsets, int) and isinstance(lengths, int):
+                    ranges.append((offsets, lengths))
+            if isinstance(tags.get(JPEG_OFFSET), int):
+                ranges.append((tags[JPEG_OFFSET], tags.get(JPEG_LENGTH, 0)))
+        return [(offset, length) for offset, length in ranges if length > 0]
+
+
+class _IFDWalker:
+    def __init__(self, f: BinaryIO, order: str):
+        self.f = f
+        self.order = order
+
+    def read_ifd(self, offset: int) -> Tuple[Dict[int, Any], int]:
+        """Lê um IFD; retorna (tag -> valor, offset do próximo IFD)."""
+        order = self.order
+        self.f.seek(offset)
+        raw = self.f.read(2)
+        if len(raw) < 2:
+            return {}, 0
+        count = min(struct.unpack(order + "H", raw)[0], _MAX_ENTRIES)
+        table = self.f.read(12 * count + 4)
+        tags: Dict[int, Any] = {}
+        for i in range(min(count, len(table) // 12)):
+            tag, kind, n = struct.unpack_from(order + "HHI", table, 12 * i)
+            if kind not in _TYPES:
+                continue
+            fmt, size = _TYPES[kind]
+            total = size * n
+            if total <= 4:
+                data = table[12 * i + 8: 12 * i + 8 + total]
+            elif total <= _MAX_VALUE_BYTES:
+                pos = self.f.tell()
+                self.f.seek(struct.unpack_from(order + "I", table, 12 * i + 8)[0])
+                data = self.f.read(total)
+                self.f.seek(pos)
+            else:
+                continue
+            if len(data) < total:
+                continue
+            tags[tag] = self._decode(kind, fmt, n, data)
+        next_offset = 0
+        if len(table) >= 12 * count + 4:
+            next_offset = struct.unpack_from(order + "I", table, 12 * count)[0]
+        return tags, next_offset
+
+    def _decode(self, kind: int, fmt: str, n: int, data: bytes) -> Any:
+        if kind == 2:  # ASCII: bytes sem o NUL final, como no piexif
+            return data[:-1] if data.endswith(b"\x00") else data
+        if kind == 7:  # UNDEFINED
+            return data
+        values = struct.unpack(self.order + fmt * n, data)
+        if kind in (5, 10):
+            values = tuple(zip(values[::2], values[1::2]))
+        return values[0] if n == 1 else values
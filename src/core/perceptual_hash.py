@@ -0,0 +1,136 @@
+"""
+Hashes perceptuais calculados a partir de pixels.
+
+Separa a decodificação da imagem (PIL) do cálculo do hash, para que o
+raster reduzido em tons de cinza possa ser produzido em um processo e
+hasheado em outro, ou reaproveitado para vários algoritmos.
+Com o raster no tamanho exato do algoritmo (ex.: hash_size * 4 para pHash)
+os resultados são idênticos aos de `imagehash`; a partir de um raster maior
+há um redimensionamento extra, consistente entre imagens.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Union
+
+import imagehash
+import numpy as np
+import scipy.fftpack
+from PIL import Image
+
+from .preview_extractor import PreviewExtractor
+
+RESAMPLE = Image.Resampling.LANCZOS
+
+
+def load_grayscale(
+    source: Union[Path, Image.Image],
+    size: int,
+    draft: bool = False,
+    preview_min_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Decodifica uma imagem e retorna o raster `size`x`size` em tons de cinza.
+
+    Args:
+        source: Caminho do arquivo ou imagem PIL já aberta
+        size: Lado do raster quadrado
+        draft: Em JPEGs, decodifica já reduzido (escala 1/2..1/8), bem mais
+            rápido; o raster resultante difere levemente da decodificação completa
+        preview_min_size: Se definido, usa o preview embutido (EXIF/RAW) com
+            pelo menos esse lado, quando existir, em vez de decodificar o arquivo
+
+    Returns:
+        Array uint8 de formato (size, size)
+    """
+    if isinstance(source, Image.Image):
+        return np.asarray(source.convert("L").resize((size, size), RESAMPLE))
+    if preview_min_size:
+        preview = PreviewExtractor.extract(Path(source), preview_min_size)
+        if preview is not None:
+            return load_grayscale(preview, size)
+    with Image.open(source) as img:
+        if draft:
+            img.draft("L", (size, size))
+        return np.asarray(img.convert("L").resize((size, size), RESAMPLE))
+
+
+def _resize(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    if pixels.shape == (height, width):
+        return pixels
+    return np.asarray(Image.fromarray(pixels).resize((width, height), RESAMPLE))
+
+
+def bits_to_int(bits: np.ndarray) -> int:
+    """Converte um array de bits (linha a linha) para inteiro."""
+    flat = np.asarray(bits, dtype=bool).ravel()
+    packed = int.from_bytes(np.packbits(flat).tobytes(), "big")
+    return packed >> ((-flat.size) % 8)
+
+
+def phash_bits(pixels: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """pHash (DCT) sobre um raster em tons de cinza; retorna a matriz de bits."""
+    pixels = _resize(pixels, hash_size * 4, hash_size * 4)
+    dct = scipy.fftpack.dct(scipy.fftpack.dct(pixels, axis=0), axis=1)
+    lowfreq = dct[:hash_size, :hash_size]
+    return lowfreq > np.median(lowfreq)
+
+
+def phash_from_pixels(pixels: np.ndarray, hash_size: int = 8) -> int:
+    """pHash como inteiro de hash_size² bits."""
+    return bits_to_int(phash_bits(pixels, hash_size))
+
+
+def phash_dihedral_bits(pixels: np.ndarray, hash_size: int = 8) -> List[np.ndarray]:
+    """
+    pHash das 8 orientações (rotações de 90° e espelhamentos) com uma única DCT.
+
+    Espelhar o raster multiplica o coeficiente k da DCT-II por (-1)^k no eixo
+    espelhado e transpor o raster transpõe a DCT, então todas as variantes
+    saem do mesmo bloco de baixa frequência, sem nova decodificação.
+    """
+    pixels = _resize(pixels, hash_size * 4, hash_size * 4)
+    dct = scipy.fftpack.dct(scipy.fftpack.dct(pixels, axis=0), axis=1)
+    lowfreq = dct[:hash_size, :hash_size]
+    sign = (-1.0) ** np.arange(hash_size)
+    variants = []
+    for block in (lowfreq, lowfreq.T):
+        for flipped in (block, block * sign[:, None], block * sign[None, :], block * np.outer(sign, sign)):
+            variants.append(flipped > np.median(flipped))
+    return variants
+
+
+def canonical_phash_bits(pixels: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """Bits da variante de menor valor entre as 8 orientações (hash canônico)."""
+    return min(phash_dihedral_bits(pixels, hash_size), key=bits_to_int)
+
+
+def canonical_phash_from_pixels(pixels: np.ndarray, hash_size: int = 8) -> int:
+    """pHash invariante a rotação/espelhamento como inteiro."""
+    return min(bits_to_int(bits) for bits in phash_dihedral_bits(pixels, hash_size))
+
+
+def dhash_from_pixels(pixels: np.ndarray, hash_size: int = 8) -> int:
+    """dHash (diferença entre colunas vizinhas) como inteiro."""
+    pixels = _resize(pixels, hash_size + 1, hash_size)
+    return bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def ahash_from_pixels(pixels: np.ndarray, hash_size: int = 8) -> int:
+    """aHash (média) como inteiro."""
+    pixels = _resize(pixels, hash_size, hash_size)
+    return bits_to_int(pixels > pixels.mean())
+
+
+def whash_from_pixels(pixels: np.ndarray, hash_size: int = 8) -> int:
+    """wHash (wavelet Haar, via imagehash) como inteiro."""
+    return bits_to_int(imagehash.whash(Image.fromarray(pixels), hash_size=hash_size).hash)
+
+
+HASH_FUNCTIONS = {
+    "phash": phash_from_pixels,
+    "phash_rot": canonical_phash_from_pixels,
+    "dhash": dhash_from_pixels,
+    "ahash": ahash_from_pixels,
+    "whash": whash_from_pixels,
+}
+
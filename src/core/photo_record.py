@@ -0,0 +1,104 @@
+"""
+Registro compacto de foto.
+
+`PhotoRecord` guarda só os campos usados no pipeline (organização,
+duplicatas e banco, incluindo geohash e fuso da captura) em `__slots__`,
+sem `__dict__` por instância. O caminho
+fica como `str` (o `Path` é criado sob demanda) e câmera/formato são
+internados com `sys.intern`: em coleções grandes, milhares de fotos da
+mesma câmera compartilham uma única string.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def _intern(value: Any) -> Optional[str]:
+    if not value:
+        return None
+    return sys.intern(str(value).strip())
+
+
+class PhotoRecord:
+    """Metadados essenciais de uma foto (ver `from_metadata`)."""
+
+    __slots__ = (
+        "file_path", "md5", "datetime", "file_size", "width", "height",
+        "format", "camera_make", "camera_model", "latitude", "longitude",
+        "geohash", "utc_offset", "error",
+    )
+
+    def __init__(
+        self,
+        file_path: str,
+        md5: Optional[str] = None,
+        datetime: Optional[datetime] = None,
+        file_size: Optional[int] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        format: Optional[str] = None,
+        camera_make: Optional[str] = None,
+        camera_model: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        geohash: Optional[str] = None,
+        utc_offset: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        self.file_path = str(file_path)
+        self.md5 = md5
+        self.datetime = datetime
+        self.file_size = file_size
+        self.width = width
+        self.height = height
+        self.format = _intern(format)
+        self.camera_make = _intern(camera_make)
+        self.camera_model = _intern(camera_model)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.geohash = geohash
+        self.utc_offset = utc_offset
+        self.error = error
+
+    @classmethod
+    def from_metadata(cls, file_path: Path, metadata: Dict[str, Any], md5: Optional[str] = None) -> "PhotoRecord":
+        """
+        Cria o registro a partir do dicionário do `MetadataReader`.
+
+        Args:
+            file_path: Caminho do arquivo
+            metadata: Metadados lidos (campos ausentes ficam None)
+            md5: Hash MD5 já calculado, se houver
+
+        Returns:
+            PhotoRecord com os campos essenciais (`error` preenchido se a
+            leitura falhou)
+        """
+        get = metadata.get
+        return cls(
+            file_path, md5, get("datetime"), get("file_size"), get("width"), get("height"),
+            get("format"), get("camera_make"), get("camera_model"), get("latitude"), get("longitude"),
+            get("geohash"), get("utc_offset"), get("error"),
+        )
+
+    @property
+    def path(self) -> Path:
+        return Path(self.file_path)
+
+    @property
+    def megapixels(self) -> Optional[float]:
+        if not self.width or not self.height:
+            return None
+        return round(self.width * self.height / 1_000_000, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dicionário no formato dos metadados (para o banco e relatórios)."""
+        data = {name: getattr(self, name) for name in self.__slots__ if name != "error"}
+        data["file_name"] = self.path.name
+        data["megapixels"] = self.megapixels
+        return data
+
+    def __repr__(self) -> str:
+        return f"PhotoRecord({self.file_path!r}, datetime={self.datetime!r})"
@@ -0,0 +1,81 @@
+"""
+Extrator de previews embutidos.
+
+JPEGs costumam carregar uma miniatura EXIF (IFD1) e arquivos RAW em
+contêiner TIFF (CR2, NEF, DNG) embutem previews JPEG. Hashear o preview
+evita a decodificação completa e dá cobertura a formatos que o PIL não
+consegue abrir.
+"""
+
+import io
+import struct
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import piexif
+from PIL import Image
+
+from .parsers import TIFFParser
+
+RAW_EXTENSIONS = {".raw", ".cr2", ".nef", ".dng", ".arw", ".orf", ".rw2"}
+
+
+class PreviewExtractor:
+    """Localiza e abre previews JPEG embutidos em uma imagem."""
+
+    @staticmethod
+    def extract(file_path: Path, min_size: int = 160) -> Optional[Image.Image]:
+        """
+        Retorna o menor preview embutido com lado menor >= `min_size`.
+
+        Args:
+            file_path: Caminho da imagem
+            min_size: Lado mínimo aceitável do preview (pixels)
+
+        Returns:
+            Imagem PIL já carregada ou None se não houver preview adequado
+        """
+        best = None
+        for data in PreviewExtractor._candidates(file_path):
+            try:
+                img = Image.open(io.BytesIO(data))
+            except Exception:
+                continue
+            if min(img.size) < min_size:
+                continue
+            if best is None or img.width * img.height < best.width * best.height:
+                best = img
+        if best is None:
+            return None
+        try:
+            best.load()
+        except Exception:
+            return None
+        return best
+
+    @staticmethod
+    def _candidates(file_path: Path) -> List[bytes]:
+        try:
+            with open(file_path, "rb") as f:
+                if TIFFParser.is_tiff(f.read(4)):
+                    # contêiner TIFF/RAW: previews vêm dos IFDs, lidos por seek
+                    ranges = TIFFParser.read(f)["previews"]
+                    return PreviewExtractor._read_ranges(f, ranges)
+        except (OSError, struct.error, ValueError):
+            return []
+
+        try:
+            exif = piexif.load(str(file_path))
+        except Exception:
+            return []
+        return [exif["thumbnail"]] if exif.get("thumbnail") else []
+
+    @staticmethod
+    def _read_ranges(f, ranges: List[Tuple[int, int]]) -> List[bytes]:
+        found = []
+        for offset, length in ranges:
+            f.seek(offset)
+            data = f.read(length)
+            if data[:2] == b"\xff\xd8":
+                found.append(data)
+        return found
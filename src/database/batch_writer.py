@@ -0,0 +1,111 @@
+"""Batched, transactional writes for SQLite.
+
+Rows are buffered and written with `executemany` in one transaction per
+`batch_size` rows, so the journal is synced once per batch instead of once
+per row. Consecutive rows with the same statement share a single
+`executemany` call, and the statement order is preserved.
+
+Buffered rows are not visible to queries yet. Callers that need
+read-your-writes can tag rows with a key and look it up with `pending`, or
+`flush` before querying.
+
+A batch that fails is retried row by row in one transaction. Rows that
+still fail are dropped and logged with their key (see `rows_lost`). The
+buffer is always emptied, so one bad row does not fail every later flush.
+"""
+import sqlite3
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from src.utils.logger import get_logger
+
+
+class BatchWriter:
+    """Buffer of parameterised statements flushed in transactions.
+
+    Args:
+        conn: SQLite connection to write to
+        batch_size: Rows per transaction
+
+    Usable as a context manager; leaving the block flushes the rest.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = 100):
+        self.logger = get_logger()
+        self.conn = conn
+        self.batch_size = max(1, batch_size)
+        self.rows_written = 0
+        self.rows_lost = 0
+        # (statement, rows, labels); a label names the row in failure logs
+        self._batches: List[Tuple[str, List[Sequence[Any]], List[Any]]] = []
+        self._size = 0
+        self._keys: Dict[Hashable, Any] = {}
+
+    def add(self, sql: str, params: Sequence[Any], key: Optional[Hashable] = None, value: Any = True) -> None:
+        """Buffer one row; `key`/`value` make it visible to `pending` until flushed."""
+        label = None if key is None else (key if value is True else f"{key} ({value})")
+        if self._batches and self._batches[-1][0] == sql:
+            self._batches[-1][1].append(params)
+            self._batches[-1][2].append(label)
+        else:
+            self._batches.append((sql, [params], [label]))
+        self._size += 1
+        if key is not None:
+            self._keys[key] = value
+        if self._size >= self.batch_size:
+            self.flush()
+
+    def pending(self, key: Hashable) -> Any:
+        """Value tagged to a buffered row with this key, or None."""
+        return self._keys.get(key)
+
+    def flush(self) -> int:
+        """Write every buffered row in one transaction. Returns the rows written.
+
+        On failure the batch is retried row by row; rows that fail again are
+        dropped, logged and counted in `rows_lost`.
+        """
+        if not self._size:
+            return 0
+        batches, count = self._batches, self._size
+        self._batches, self._size = [], 0
+        self._keys.clear()
+        try:
+            with self.conn:
+                for sql, rows, _ in batches:
+                    self.conn.executemany(sql, rows)
+            written = count
+        except sqlite3.Error as e:
+            self.logger.warning(f"Lote de {count} linhas falhou ({e}); repetindo linha a linha")
+            written = self._write_rows(batches, count)
+        self.rows_written += written
+        self.rows_lost += count - written
+        return written
+
+    def _write_rows(self, batches, count: int) -> int:
+        written, lost = 0, []
+        try:
+            with self.conn:
+                for sql, rows, labels in batches:
+                    for params, label in zip(rows, labels):
+                        try:
+                            self.conn.execute(sql, params)
+                            written += 1
+                        except sqlite3.Error as e:
+                            lost.append(f"{label if label is not None else params}: {e}")
+        except sqlite3.Error as e:
+            # the transaction itself failed (e.g. locked or disk full): nothing was written
+            labels = [label for _, _, batch_labels in batches for label in batch_labels if label is not None]
+            self.logger.error(f"Lote descartado, {count} linhas perdidas ({e}); linhas identificadas: {labels}")
+            return 0
+        for entry in lost:
+            self.logger.error(f"Linha descartada: {entry}")
+        return written
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
@@ -1,45 +1,225 @@
 """DB manager utilities for Photo Organizer.
 
 Provides a small wrapper around SQLite for initializing tables,
-basic queries with pagination, lookup by MD5 and simple backup.
+basic queries with pagination, lookup by MD5, persisted duplicate
+groups, location queries and online backups.
+
+Connections are tuned by `configure_connection`: WAL journal with
+`synchronous=NORMAL` (one sync per checkpoint instead of per commit), a
+busy timeout so concurrent writers wait for the lock instead of failing,
+plus page cache and memory-map sizes from the `performance` section.
+
+The schema is created and upgraded by the versioned migrations in
+`src.database.migrations`. Photo locations are indexed by an R*Tree
+virtual table (`images_rtree`) kept in sync with `images.latitude`/
+`longitude` by triggers, so bounding box and radius queries never scan
+the whole table.
 """
 from pathlib import Path
+from datetime import datetime, timedelta
+import base64
+import hashlib
+import json
+import math
+import os
 import sqlite3
-import shutil
-from typing import List, Dict, Optional, Tuple
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 from src.utils.logger import get_logger
 from src.utils.config import get_config
+from src.database.migrations import migrate
+
+EARTH_RADIUS_KM = 6371.0088
+
+# sort name -> column for query_images; every one is backed by an index whose
+# implicit rowid suffix gives the (column, id) keyset order
+IMAGE_SORTS = {
+    "id": "id",
+    "datetime": "datetime",
+    "size": "file_size",
+    "path": "file_path",
+}
+MAX_PAGE_SIZE = 1000
+
+IMAGE_INSERT_SQL = """
+    INSERT OR IGNORE INTO images (
+        file_path, file_name, file_size, format, width, height, megapixels,
+        datetime, camera_make, camera_model, md5_hash, latitude, longitude, geohash, utc_offset
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# pages copied per backup step (4 MiB with the default 4 KiB pages)
+BACKUP_PAGES_PER_STEP = 1024
+
+# how long a statement waits for another connection's write lock
+BUSY_TIMEOUT_MS = 5000
+
+# values bound per `IN (...)` (older SQLite builds allow 999 variables per statement)
+SQL_IN_CHUNK = 500
+
+
+def _chunked(values: Iterable[Any]) -> Iterator[List[Any]]:
+    """Split `values` into lists of at most SQL_IN_CHUNK items."""
+    values = list(values)
+    for i in range(0, len(values), SQL_IN_CHUNK):
+        yield values[i:i + SQL_IN_CHUNK]
+
+
+def _marks(values: List[Any]) -> str:
+    return ", ".join("?" * len(values))
+
+
+def configure_connection(conn: sqlite3.Connection, cache_mb: Optional[int] = None,
+                         mmap_mb: Optional[int] = None) -> sqlite3.Connection:
+    """Apply the write/read pragmas used for the image database.
+
+    Sizes default to `performance.sqlite_cache_mb` / `sqlite_mmap_mb`.
+    """
+    if cache_mb is None or mmap_mb is None:
+        perf = get_config().performance
+        cache_mb = perf.sqlite_cache_mb if cache_mb is None else cache_mb
+        mmap_mb = perf.sqlite_mmap_mb if mmap_mb is None else mmap_mb
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA cache_size = {-int(cache_mb) * 1024}")  # negative = KiB
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_mb) * 1024 * 1024}")
+    return conn
+
+
+def image_row(meta: Dict[str, Any], md5: str) -> tuple:
+    """Parameters of IMAGE_INSERT_SQL for one image."""
+    return (
+        meta.get("file_path"),
+        meta.get("file_name"),
+        meta.get("file_size"),
+        meta.get("format"),
+        meta.get("width"),
+        meta.get("height"),
+        meta.get("megapixels"),
+        meta.get("datetime").isoformat() if meta.get("datetime") else None,
+        meta.get("camera_make"),
+        meta.get("camera_model"),
+        md5,
+        meta.get("latitude"),
+        meta.get("longitude"),
+        meta.get("geohash"),
+        meta.get("utc_offset"),
+    )
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _encode_cursor(fingerprint: str, value: Any, row_id: int) -> str:
+    raw = json.dumps([fingerprint, value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, fingerprint: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        found, value, row_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if found != fingerprint or not isinstance(row_id, int):
+        raise ValueError("Cursor belongs to a different query")
+    return value, row_id
+
+
+def _keyset_condition(column: str, descending: bool, value: Any, row_id: int) -> Tuple[str, List[Any]]:
+    """Rows strictly after (value, row_id) in ORDER BY column, id.
+
+    SQLite sorts NULLs first, so ascending pages reach non-NULL values after
+    the NULLs, and descending pages end with them.
+    """
+    if column == "id":
+        return ("id < ?" if descending else "id > ?"), [row_id]
+    if not descending:
+        if value is None:
+            return f"({column} IS NULL AND id > ?) OR {column} IS NOT NULL", [row_id]
+        return f"{column} > ? OR ({column} = ? AND id > ?)", [value, value, row_id]
+    if value is None:
+        return f"{column} IS NULL AND id < ?", [row_id]
+    return f"{column} < ? OR ({column} = ? AND id < ?) OR {column} IS NULL", [value, value, row_id]
 
 
 class DBManager:
     def __init__(self, db_path: Optional[str] = None):
         self.logger = get_logger()
-        cfg = get_config()
-        self.db_path = Path(db_path) if db_path else cfg.get_database_path()
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.db_path = Path(db_path) if db_path else get_config().get_database_path()
+        self.conn = configure_connection(sqlite3.connect(str(self.db_path)))
         self.conn.row_factory = sqlite3.Row
 
     def init_tables(self) -> None:
-        """Ensure required tables exist."""
-        self.conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                file_path TEXT UNIQUE,
-                file_name TEXT,
-                file_size INTEGER,
-                format TEXT,
-                width INTEGER,
-                height INTEGER,
-                megapixels REAL,
-                datetime TEXT,
-                camera_make TEXT,
-                camera_model TEXT,
-                md5_hash TEXT
-            )
-            """
+        """Bring the schema up to date (see `src.database.migrations`)."""
+        migrate(self.conn)
+
+    def images_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Return image rows located inside a bounding box.
+
+        A box with min_lon > max_lon crosses the antimeridian.
+        """
+        if min_lon <= max_lon:
+            spans = [(min_lon, max_lon)]
+        else:
+            spans = [(min_lon, 180.0), (-180.0, max_lon)]
+        where = " OR ".join("(r.max_lon >= ? AND r.min_lon <= ?)" for _ in spans)
+        sql = (
+            "SELECT i.* FROM images_rtree r JOIN images i ON i.id = r.id "
+            f"WHERE r.max_lat >= ? AND r.min_lat <= ? AND ({where}) ORDER BY i.id"
         )
-        self.conn.commit()
+        params: List = [min_lat, max_lat]
+        for lo, hi in spans:
+            params += [lo, hi]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def images_within_radius(
+        self, lat: float, lon: float, radius_km: float, limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Return image rows within `radius_km` of a point, nearest first.
+
+        Candidates come from the R*Tree using the circle's bounding box;
+        each row gets a `distance_km` key.
+        """
+        angular = radius_km / EARTH_RADIUS_KM
+        min_lat = lat - math.degrees(angular)
+        max_lat = lat + math.degrees(angular)
+        if min_lat <= -90.0 or max_lat >= 90.0 or angular >= math.pi:
+            # the circle contains a pole: every longitude is possible
+            min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+            min_lon, max_lon = -180.0, 180.0
+        else:
+            dlon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+            min_lon = (lon - dlon + 180.0) % 360.0 - 180.0
+            max_lon = (lon + dlon + 180.0) % 360.0 - 180.0
+            if dlon >= 180.0:
+                min_lon, max_lon = -180.0, 180.0
+
+        rows = []
+        for row in self.images_in_bbox(min_lat, min_lon, max_lat, max_lon):
+            dist = haversine_km(lat, lon, row["latitude"], row["longitude"])
+            if dist <= radius_km:
+                row["distance_km"] = dist
+                rows.append(row)
+        rows.sort(key=lambda r: r["distance_km"])
+        return rows[:limit] if limit is not None else rows
 
     def count_images(self) -> int:
         cur = self.conn.execute("SELECT COUNT(*) as cnt FROM images")
@@ -47,13 +227,114 @@ class DBManager:
         return int(row["cnt"]) if row else 0
 
     def get_images(self, page: int = 1, page_size: int = 50) -> List[Dict]:
-        """Return paginated list of images (dict rows)."""
+        """Return paginated list of images (dict rows).
+
+        OFFSET paging gets slower with the page number; prefer `query_images`.
+        """
         offset = (page - 1) * page_size
         cur = self.conn.execute(
             "SELECT * FROM images ORDER BY id LIMIT ? OFFSET ?", (page_size, offset)
         )
         return [dict(r) for r in cur.fetchall()]
 
+    def query_images(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        descending: bool = False,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        camera_make: Optional[str] = None,
+        camera_model: Optional[str] = None,
+        format: Optional[str] = None,
+        folder: Optional[str] = None,
+        duplicate: Optional[bool] = None,
+        duplicate_kind: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Filtered image rows with keyset (cursor) pagination.
+
+        Each page continues after the last (sort value, id) of the previous
+        one, so the cost of a page does not depend on how deep it is.
+
+        Args:
+            limit: Rows per page (at most MAX_PAGE_SIZE)
+            cursor: Opaque `next_cursor` of the previous page
+            sort: One of IMAGE_SORTS; ties are broken by id
+            descending: Reverse order (rows without a value come last)
+            date_from: ISO date/datetime, inclusive
+            date_to: ISO date (whole day included) or datetime, inclusive
+            camera_make, camera_model, format: Exact matches
+            folder: Only files under this folder (any depth)
+            duplicate: True/False = only files in / not in a duplicate group
+            duplicate_kind: Restrict `duplicate` to groups of this kind
+
+        Returns:
+            (rows, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: Unknown sort, bad date or cursor from another query
+        """
+        if sort not in IMAGE_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        column = IMAGE_SORTS[sort]
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        where: List[str] = []
+        params: List[Any] = []
+        if date_from:
+            where.append("datetime >= ?")
+            params.append(datetime.fromisoformat(date_from).isoformat())
+        if date_to:
+            end = datetime.fromisoformat(date_to)
+            if len(date_to) == 10:  # plain date: include the whole day
+                where.append("datetime < ?")
+                params.append((end + timedelta(days=1)).isoformat())
+            else:
+                where.append("datetime <= ?")
+                params.append(end.isoformat())
+        for name, value in (("camera_make", camera_make), ("camera_model", camera_model), ("format", format)):
+            if value:
+                where.append(f"{name} = ?")
+                params.append(value)
+        if folder:
+            # prefix range instead of LIKE, so the file_path index is used
+            prefix = str(Path(folder)).rstrip("/\\") + os.sep
+            where.append("file_path >= ? AND file_path < ?")
+            params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+        if duplicate is not None:
+            member = (
+                "SELECT 1 FROM duplicate_group_members m JOIN duplicate_groups g ON g.id = m.group_id "
+                "WHERE m.file_path = images.file_path"
+            )
+            if duplicate_kind:
+                member += " AND g.kind = ?"
+                params.append(duplicate_kind)
+            where.append(f"{'' if duplicate else 'NOT '}EXISTS ({member})")
+
+        filters = [date_from, date_to, camera_make, camera_model, format, folder, duplicate, duplicate_kind]
+        fingerprint = hashlib.sha1(json.dumps([sort, descending, filters]).encode()).hexdigest()[:12]
+        if cursor:
+            last_value, last_id = _decode_cursor(cursor, fingerprint)
+            keyset, keyset_params = _keyset_condition(column, descending, last_value, last_id)
+            where.append(keyset)
+            params += keyset_params
+
+        direction = "DESC" if descending else "ASC"
+        order = "id" if column == "id" else f"{column} {direction}, id"
+        sql = (
+            "SELECT * FROM images"
+            + (" WHERE " + " AND ".join(f"({w})" for w in where) if where else "")
+            + f" ORDER BY {order} {direction} LIMIT ?"
+        )
+        rows = [dict(r) for r in self.conn.execute(sql, (*params, limit + 1))]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(fingerprint, last[column], last["id"])
+        return rows, next_cursor
+
     def get_by_md5(self, md5: str) -> Optional[Dict]:
         cur = self.conn.execute("SELECT * FROM images WHERE md5_hash = ? LIMIT 1", (md5,))
         row = cur.fetchone()
@@ -64,7 +345,8 @@ class DBManager:
         self.conn.execute(
             """
             UPDATE images SET
-                file_path = ?, file_name = ?, file_size = ?, format = ?, width = ?, height = ?, megapixels = ?, datetime = ?, camera_make = ?, camera_model = ?
+                file_path = ?, file_name = ?, file_size = ?, format = ?, width = ?, height = ?, megapixels = ?, datetime = ?, camera_make = ?, camera_model = ?,
+                latitude = ?, longitude = ?, geohash = ?, utc_offset = ?
             WHERE md5_hash = ?
             """,
             (
@@ -78,25 +360,267 @@ class DBManager:
                 meta.get("datetime").isoformat() if meta.get("datetime") else None,
                 meta.get("camera_make"),
                 meta.get("camera_model"),
+                meta.get("latitude"),
+                meta.get("longitude"),
+                meta.get("geohash"),
+                meta.get("utc_offset"),
                 md5,
             ),
         )
         self.conn.commit()
 
-    def backup(self, dest: Optional[str] = None) -> Path:
-        """Create a backup copy of the DB file. Returns backup path."""
+    def save_groups(self, kind: str, groups: List[List[str]], replace: bool = True) -> List[int]:
+        """Persist groups of file paths (e.g. kind='burst' or 'similar').
+
+        With `replace`, previous groups of the same kind are removed first.
+        Returns the new group ids.
+        """
+        with self.conn:
+            if replace:
+                self._delete_groups(kind)
+            return self._insert_groups(kind, groups)
+
+    def replace_groups(self, kind: str, group_ids: Iterable[int], groups: List[List[str]]) -> List[int]:
+        """Delete the groups `group_ids` of `kind` and store `groups`, in one transaction.
+
+        Returns the new group ids.
+        """
+        with self.conn:
+            for chunk in _chunked(group_ids):
+                self.conn.execute(
+                    f"DELETE FROM duplicate_group_members WHERE group_id IN "
+                    f"(SELECT id FROM duplicate_groups WHERE kind = ? AND id IN ({_marks(chunk)}))",
+                    (kind, *chunk),
+                )
+                self.conn.execute(
+                    f"DELETE FROM duplicate_groups WHERE kind = ? AND id IN ({_marks(chunk)})", (kind, *chunk)
+                )
+            return self._insert_groups(kind, groups)
+
+    def _insert_groups(self, kind: str, groups: List[List[str]]) -> List[int]:
+        ts = datetime.now().isoformat()
+        ids = []
+        for members in groups:
+            cur = self.conn.execute("INSERT INTO duplicate_groups (kind, created_at) VALUES (?, ?)", (kind, ts))
+            gid = cur.lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO duplicate_group_members (group_id, file_path) VALUES (?, ?)",
+                [(gid, str(p)) for p in members],
+            )
+            ids.append(gid)
+        return ids
+
+    def get_groups(self, kind: Optional[str] = None) -> Dict[int, List[str]]:
+        """Return group_id -> member paths, optionally filtered by kind."""
+        sql = (
+            "SELECT g.id, m.file_path FROM duplicate_groups g "
+            "JOIN duplicate_group_members m ON m.group_id = g.id"
+        )
+        params: Tuple = ()
+        if kind:
+            sql += " WHERE g.kind = ?"
+            params = (kind,)
+        groups: Dict[int, List[str]] = {}
+        for row in self.conn.execute(sql + " ORDER BY g.id, m.file_path", params):
+            groups.setdefault(row[0], []).append(row[1])
+        return groups
+
+    def get_groups_with_paths(self, kind: str, paths: Iterable[str]) -> Dict[int, List[str]]:
+        """Return group_id -> member paths for the groups of `kind` that contain any of `paths`."""
+        ids = set()
+        for chunk in _chunked(paths):
+            ids.update(row[0] for row in self.conn.execute(
+                f"SELECT m.group_id FROM duplicate_group_members m JOIN duplicate_groups g ON g.id = m.group_id "
+                f"WHERE g.kind = ? AND m.file_path IN ({_marks(chunk)})",
+                (kind, *chunk),
+            ))
+        groups: Dict[int, List[str]] = {}
+        for chunk in _chunked(sorted(ids)):
+            for row in self.conn.execute(
+                f"SELECT group_id, file_path FROM duplicate_group_members WHERE group_id IN ({_marks(chunk)}) "
+                f"ORDER BY group_id, file_path",
+                chunk,
+            ):
+                groups.setdefault(row[0], []).append(row[1])
+        return groups
+
+    def _delete_groups(self, kind: str) -> None:
+        self.conn.execute(
+            "DELETE FROM duplicate_group_members WHERE group_id IN (SELECT id FROM duplicate_groups WHERE kind = ?)",
+            (kind,),
+        )
+        self.conn.execute("DELETE FROM duplicate_groups WHERE kind = ?", (kind,))
+
+    def load_hashes(self, algorithm: str = "phash", hash_size: int = 16,
+                    md5s: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Return md5 -> perceptual hash (hex) of this kind, for every stored hash or only `md5s`."""
+        sql = "SELECT md5_hash, value FROM perceptual_hashes WHERE algorithm = ? AND hash_size = ?"
+        if md5s is None:
+            return {row[0]: row[1] for row in self.conn.execute(sql, (algorithm, hash_size))}
+        found = {}
+        for chunk in _chunked(md5s):
+            cur = self.conn.execute(f"{sql} AND md5_hash IN ({_marks(chunk)})", (algorithm, hash_size, *chunk))
+            found.update((row[0], row[1]) for row in cur)
+        return found
+
+    def save_hashes(self, hashes: Dict[str, str], algorithm: str = "phash", hash_size: int = 16) -> None:
+        """Store md5 -> perceptual hash (hex), replacing existing values.
+
+        An upsert keeps the rowid of an existing row, so the change log
+        (and `HashStore`) only sees the rows whose value really changed.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO perceptual_hashes (md5_hash, algorithm, hash_size, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (md5_hash, algorithm, hash_size) DO UPDATE SET value = excluded.value "
+                "WHERE value <> excluded.value",
+                [(md5, algorithm, hash_size, value) for md5, value in hashes.items()],
+            )
+
+    def save_pairs(self, pairs: List[Tuple[str, str, int]]) -> None:
+        """Store (md5_a, md5_b, distance) pairs in the pair-distance cache."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO similar_pairs (md5_a, md5_b, distance) VALUES (?, ?, ?)",
+                [(a, b, d) if a < b else (b, a, d) for a, b, d in pairs],
+            )
+
+    def clear_pairs(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM similar_pairs")
+
+    def get_pairs(self, max_distance: int) -> List[Tuple[str, str, int]]:
+        cur = self.conn.execute(
+            "SELECT md5_a, md5_b, distance FROM similar_pairs WHERE distance <= ?", (max_distance,)
+        )
+        return [tuple(row) for row in cur]
+
+    def pair_histogram(self) -> Dict[int, int]:
+        """Return distance -> number of cached pairs."""
+        cur = self.conn.execute("SELECT distance, COUNT(*) FROM similar_pairs GROUP BY distance ORDER BY distance")
+        return {row[0]: row[1] for row in cur}
+
+    def get_paths_by_md5(self, md5s: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """Return md5 -> file paths for every image row, or only for `md5s`."""
+        sql = "SELECT md5_hash, file_path FROM images WHERE md5_hash IS NOT NULL"
+        if md5s is None:
+            rows = self.conn.execute(sql)
+        else:
+            rows = (
+                row for chunk in _chunked(md5s)
+                for row in self.conn.execute(f"{sql} AND md5_hash IN ({_marks(chunk)})", chunk)
+            )
+        paths: Dict[str, List[str]] = {}
+        for row in rows:
+            paths.setdefault(row[0], []).append(row[1])
+        return paths
+
+    def get_md5_by_path(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Return file path -> md5 for the image rows of `paths`."""
+        found = {}
+        for chunk in _chunked(paths):
+            found.update(self.conn.execute(
+                f"SELECT file_path, md5_hash FROM images WHERE md5_hash IS NOT NULL AND file_path IN ({_marks(chunk)})",
+                chunk,
+            ).fetchall())
+        return found
+
+    def images_without_hash(self, algorithm: str = "phash", hash_size: int = 16) -> List[Dict[str, Any]]:
+        """Image rows (file_path, md5_hash) whose content has no stored perceptual hash of this kind."""
+        cur = self.conn.execute(
+            "SELECT file_path, md5_hash FROM images i WHERE md5_hash IS NOT NULL AND NOT EXISTS ("
+            "SELECT 1 FROM perceptual_hashes p WHERE p.md5_hash = i.md5_hash AND p.algorithm = ? AND p.hash_size = ?)"
+            " ORDER BY file_path",
+            (algorithm, hash_size),
+        )
+        return [{"file_path": row[0], "md5_hash": row[1]} for row in cur]
+
+    def backup(
+        self,
+        dest: Optional[str] = None,
+        pages_per_step: int = BACKUP_PAGES_PER_STEP,
+        retention_days: Optional[int] = None,
+        progress: Optional[Callable[[int, int, float], None]] = None,
+    ) -> Path:
+        """Online backup of the DB through the SQLite backup API. Returns backup path.
+
+        The copy runs on its own connection, `pages_per_step` pages at a time,
+        so `self.conn` and other writers keep working meanwhile. A read
+        transaction pins the WAL snapshot taken at the start; without it every
+        concurrent commit would restart the copy. The file is written as
+        `.part` and renamed when complete.
+
+        `progress(copied_pages, total_pages, mb_per_s)` is called after each
+        step. Afterwards backups older than `retention_days` (default
+        `database.backup_retention_days`) are pruned.
+        """
         dest_dir = Path(dest) if dest else self.db_path.parent / "backups"
         dest_dir.mkdir(parents=True, exist_ok=True)
-        ts = __import__("datetime").datetime.now().strftime("%Y%m%d_%H%M%S")
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = dest_dir / f"{self.db_path.stem}_backup_{ts}{self.db_path.suffix}"
-        self.conn.close()
-        shutil.copy2(self.db_path, backup_path)
-        # re-open connection
-        self.conn = sqlite3.connect(str(self.db_path))
-        self.conn.row_factory = sqlite3.Row
-        self.logger.info(f"DB backup criado: {backup_path}")
+        part_path = backup_path.with_name(backup_path.name + ".part")
+
+        src = sqlite3.connect(str(self.db_path), isolation_level=None)
+        dst = sqlite3.connect(str(part_path))
+        try:
+            page_size = src.execute("PRAGMA page_size").fetchone()[0]
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # starts the snapshot
+            started = last_log = time.perf_counter()
+
+            def on_step(status: int, remaining: int, total: int) -> None:
+                nonlocal last_log
+                now = time.perf_counter()
+                copied = total - remaining
+                rate = copied * page_size / (1024 * 1024) / max(now - started, 1e-9)
+                if progress:
+                    progress(copied, total, rate)
+                if now - last_log >= 1.0:
+                    last_log = now
+                    self.logger.info(
+                        f"Backup do DB: {copied}/{total} páginas ({copied / max(total, 1):.0%}), {rate:.1f} MB/s"
+                    )
+
+            src.backup(dst, pages=max(1, pages_per_step), progress=on_step)
+            src.execute("COMMIT")
+        except Exception:
+            dst.close()
+            part_path.unlink(missing_ok=True)
+            raise
+        finally:
+            src.close()
+        dst.close()
+        os.replace(part_path, backup_path)
+
+        elapsed = time.perf_counter() - started
+        size_mb = backup_path.stat().st_size / (1024 * 1024)
+        self.logger.info(
+            f"DB backup criado: {backup_path} ({size_mb:.1f} MB em {elapsed:.2f}s, "
+            f"{size_mb / max(elapsed, 1e-9):.1f} MB/s)"
+        )
+        self.prune_backups(dest_dir, retention_days)
         return backup_path
 
+    def prune_backups(self, dest: Optional[str] = None, retention_days: Optional[int] = None) -> List[Path]:
+        """Delete backups of this DB older than `retention_days`. Returns removed paths.
+
+        A retention of 0 or less keeps every backup.
+        """
+        if retention_days is None:
+            retention_days = get_config().database.backup_retention_days
+        if retention_days <= 0:
+            return []
+        dest_dir = Path(dest) if dest else self.db_path.parent / "backups"
+        cutoff = (datetime.now() - timedelta(days=retention_days)).timestamp()
+        removed = []
+        for path in dest_dir.glob(f"{self.db_path.stem}_backup_*{self.db_path.suffix}"):
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed.append(path)
+        if removed:
+            self.logger.info(f"Backups antigos removidos: {len(removed)} (retenção de {retention_days} dias)")
+        return removed
+
     def close(self):
         try:
             self.conn.close()
@@ -0,0 +1,554 @@
+"""Columnar, memory-mapped sidecar of the `perceptual_hashes` table.
+
+One directory per (algorithm, hash_size) next to the database holds four
+NumPy arrays, opened with `mmap_mode="r"` so the whole library's hash set
+is available in milliseconds without copying:
+
+- `row_ids.npy`  int64      rowid of the `perceptual_hashes` row
+- `digests.npy`  S16        raw md5 digest of the content (`bytes.fromhex`)
+- `hashes.npy`   uint64[W]  perceptual hash packed in big-endian 64-bit words
+- `sizes.npy`    int64      file size of the content (-1 if unknown)
+
+The files only grow: `refresh` reads the rows inserted after the last
+rowid seen, writes them at the end of each file and patches the `.npy`
+header in place. Rows updated or deleted in the table are listed in
+`perceptual_hash_changes` (filled by triggers, see `migrations`); only
+then are the columns rewritten. Finding out that nothing changed takes
+two indexed lookups, never a scan of the table.
+
+`BandIndex` persists the multi-index hashing bands of the store, so radius
+queries and all-pairs searches run over the packed `hashes` array without
+building a Python object per hash.
+"""
+import io
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import get_logger
+
+STORE_VERSION = 3
+COLUMNS = ("row_ids", "digests", "hashes", "sizes")
+DIGEST_DTYPE = np.dtype("S16")
+# hashes compared per step in `pairs` (bounds the candidate arrays)
+QUERY_CHUNK = 4096
+# rowids per `IN (...)` when re-reading changed rows
+_IN_CHUNK = 500
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits of each uint64 (summed over the last axis)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = words.view(np.uint8).reshape(*words.shape[:-1], -1)
+    return np.unpackbits(as_bytes, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def pack_digests(md5s: Iterable[str]) -> np.ndarray:
+    """md5 hex strings -> S16 array of raw digests (ValueError if one is not an md5)."""
+    raw = [bytes.fromhex(md5) for md5 in md5s]
+    if any(len(r) != DIGEST_DTYPE.itemsize for r in raw):
+        raise ValueError("not an md5 hex digest")
+    return np.frombuffer(b"".join(raw), dtype=DIGEST_DTYPE)
+
+
+def _is_md5(key: str) -> bool:
+    try:
+        return len(key) == 2 * DIGEST_DTYPE.itemsize and len(bytes.fromhex(key)) == DIGEST_DTYPE.itemsize
+    except (TypeError, ValueError):
+        return False
+
+
+def _append_npy(path: Path, rows: np.ndarray) -> bool:
+    """Append `rows` to a .npy file, rewriting only its header in place.
+
+    Returns False (file untouched) if the file does not exist, has another
+    layout or its header has no room for the new shape.
+    """
+    fmt = np.lib.format
+    headers = {
+        (1, 0): (fmt.read_array_header_1_0, fmt.write_array_header_1_0),
+        (2, 0): (fmt.read_array_header_2_0, fmt.write_array_header_2_0),
+    }
+    if not path.exists():
+        return False
+    with open(path, "r+b") as f:
+        version = fmt.read_magic(f)
+        if version not in headers:
+            return False
+        read_header, write_header = headers[version]
+        shape, fortran_order, dtype = read_header(f)
+        data_start = f.tell()
+        if fortran_order or dtype != rows.dtype or tuple(shape[1:]) != rows.shape[1:]:
+            return False
+        header = io.BytesIO()
+        write_header(header, {
+            "descr": fmt.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (shape[0] + len(rows), *shape[1:]),
+        })
+        if header.tell() != data_start:
+            return False
+        data_end = data_start + shape[0] * rows.itemsize * int(np.prod(rows.shape[1:]))
+        if os.fstat(f.fileno()).st_size > data_end:
+            f.truncate(data_end)  # leftovers of an interrupted append
+        # rows first, header last: an interrupted append keeps the old shape
+        f.seek(data_end)
+        f.write(np.ascontiguousarray(rows).tobytes())
+        f.seek(0)
+        f.write(header.getvalue())
+    return True
+
+
+class HashStore:
+    """Memory-mapped hash columns for one (algorithm, hash_size).
+
+    Args:
+        directory: Store directory (created on the first `refresh`); None
+            keeps the columns in memory only
+        algorithm: Perceptual hash algorithm (as in `perceptual_hashes`)
+        hash_size: Hash side; the hash has hash_size ** 2 bits
+    """
+
+    def __init__(self, directory: Optional[Path], algorithm: str = "phash", hash_size: int = 16):
+        self.logger = get_logger()
+        self.directory = Path(directory) if directory is not None else None
+        self.algorithm = algorithm
+        self.hash_size = hash_size
+        self.bits = hash_size * hash_size
+        self.words = (self.bits + 63) // 64
+        self.max_rowid = 0
+        self.change_seq = 0
+        # changes on every rewrite of the columns; band runs of another generation are stale
+        self.generation = uuid.uuid4().hex
+        # positions of the rows appended by the last `refresh`
+        self.added = np.empty(0, dtype=np.int64)
+        self._bands: Dict[int, "BandIndex"] = {}
+        self._empty()
+
+    @classmethod
+    def for_db(cls, dbm, algorithm: str = "phash", hash_size: int = 16) -> "HashStore":
+        """Open and refresh the store that sits next to `dbm`'s database file."""
+        if str(dbm.db_path) == ":memory:":
+            store = cls(None, algorithm, hash_size)
+        else:
+            directory = dbm.db_path.parent / f"{dbm.db_path.stem}_hashes" / f"{algorithm}_{hash_size}"
+            store = cls(directory, algorithm, hash_size)
+            store.open()
+        store.refresh(dbm.conn)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def open(self) -> bool:
+        """Memory-map the stored columns. Returns False if missing or inconsistent."""
+        if self.directory is None:
+            return False
+        try:
+            meta = json.loads((self.directory / "meta.json").read_text(encoding="utf-8"))
+            if (meta.get("version"), meta.get("algorithm"), meta.get("hash_size")) != (
+                STORE_VERSION, self.algorithm, self.hash_size
+            ):
+                return False
+            count = meta["count"]
+            if count:
+                arrays = {name: np.load(self.directory / f"{name}.npy", mmap_mode="r") for name in COLUMNS}
+            else:
+                self._empty()
+                arrays = dict(zip(COLUMNS, self._arrays()))
+        except (OSError, ValueError, KeyError):
+            return False
+        if any(len(a) != count for a in arrays.values()):
+            return False
+        self.row_ids, self.digests, self.hashes, self.sizes = (arrays[name] for name in COLUMNS)
+        self.max_rowid = meta["max_rowid"]
+        self.change_seq = meta["change_seq"]
+        self.generation = meta["generation"]
+        return True
+
+    def refresh(self, conn) -> int:
+        """Sync with `perceptual_hashes`. Returns the number of added + removed rows."""
+        self.added = np.empty(0, dtype=np.int64)
+        max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM perceptual_hashes").fetchone()[0]
+        change_seq, changed = self._changes(conn)
+        consistent = self._last_row_matches(conn, changed) and change_seq >= self.change_seq
+        if consistent and change_seq == self.change_seq and max_rowid == self.max_rowid:
+            return 0
+
+        if consistent:
+            keep = ~np.isin(self.row_ids, changed) if len(changed) else np.ones(len(self), dtype=bool)
+            since = self.max_rowid
+            reread = [int(r) for r in changed if r <= since]
+        else:
+            # rowids reused or another database file: start over
+            keep = np.zeros(len(self), dtype=bool)
+            since, reread = 0, []
+        new_rows = self._read(conn, since, reread)
+        added = self._columns(new_rows)
+        removed = int((~keep).sum())
+        self.max_rowid, self.change_seq = max_rowid, change_seq
+        if removed:
+            kept = [np.asarray(old[keep]) for old in self._arrays()]
+            self._rewrite([np.concatenate([old, new]) for old, new in zip(kept, added)])
+            start = len(kept[0])
+        else:
+            start = len(self)
+            self._append(added)
+        self.added = np.arange(start, len(self), dtype=np.int64)
+        changed_rows = len(added[0]) + removed
+        if changed_rows:
+            self.logger.info(
+                f"Hash store {self.algorithm}/{self.hash_size}: {len(added[0])} adicionados, "
+                f"{removed} removidos, {len(self)} no total"
+            )
+        return changed_rows
+
+    def md5(self, i: int) -> str:
+        # via bytes of the slice: indexing an S16 item drops trailing zero bytes
+        return self.digests[i:i + 1].tobytes().hex()
+
+    def md5_many(self, positions: np.ndarray) -> List[str]:
+        """md5 hex strings of the rows at `positions`."""
+        raw = np.asarray(self.digests[positions]).tobytes().hex()
+        width = 2 * DIGEST_DTYPE.itemsize
+        return [raw[k:k + width] for k in range(0, len(raw), width)]
+
+    def value(self, i: int) -> int:
+        return int.from_bytes(self.hashes[i].astype(">u8").tobytes(), "big")
+
+    def hex(self, i: int) -> str:
+        """Hash of row `i` in hex, as stored in `perceptual_hashes`."""
+        return self.hashes[i].astype(">u8").tobytes().hex()[-((self.bits + 3) // 4):]
+
+    def pack(self, value: int) -> np.ndarray:
+        """Hash int -> packed uint64 words (the layout of `hashes`)."""
+        return self.pack_many([value])[0]
+
+    def pack_many(self, values: Iterable[int]) -> np.ndarray:
+        """Hash ints -> (n, W) array of packed words."""
+        width = 8 * self.words
+        raw = b"".join(v.to_bytes(width, "big") for v in values)
+        return np.frombuffer(raw, dtype=">u8").astype(np.uint64).reshape(-1, self.words)
+
+    def distances(self, value: int) -> np.ndarray:
+        """Hamming distance from `value` to every stored hash (vectorised)."""
+        return _popcount(self.hashes ^ self.pack(value))
+
+    def nearest(self, value: int, max_distance: int, limit: int = 50,
+                exclude: Optional[str] = None) -> List[Tuple[str, int]]:
+        """[(md5, distance)] of stored hashes within `max_distance`, closest first."""
+        dist = self.distances(value)
+        idx = np.flatnonzero(dist <= max_distance)
+        idx = idx[np.argsort(dist[idx], kind="stable")]
+        hits = [(self.md5(i), int(dist[i])) for i in idx]
+        return [hit for hit in hits if hit[0] != exclude][:limit]
+
+    def find(self, md5: str) -> Optional[int]:
+        """Row position of a content md5, or None."""
+        if not _is_md5(md5):
+            return None
+        match = np.flatnonzero(self.digests == pack_digests([md5])[0])
+        return int(match[0]) if len(match) else None
+
+    def band_index(self, radius: int) -> "BandIndex":
+        """Persisted band index for radius queries, brought up to date with the store."""
+        index = self._bands.get(radius)
+        if index is None:
+            index = self._bands[radius] = BandIndex(self, radius)
+        return index.sync()
+
+    def query(self, values: np.ndarray, radius: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Stored rows within `radius` of each packed hash in `values` (n, W).
+
+        Returns (query index, row position, distance) arrays, sorted by
+        query and then distance. A query that is stored matches its own row.
+        """
+        empty = np.empty(0, dtype=np.int64)
+        if not len(self) or not len(values):
+            return empty, empty, empty
+        index = self.band_index(radius)
+        qi, pos = index.candidates(index.keys(values))
+        if not len(qi):
+            return empty, empty, empty
+        # a pair shares up to n_bands bands: keep it once
+        qi, pos = np.divmod(np.unique(qi * len(self) + pos), len(self))
+        dist = _popcount(np.asarray(self.hashes[pos]) ^ values[qi])
+        ok = dist <= radius
+        qi, pos, dist = qi[ok], pos[ok], dist[ok]
+        order = np.lexsort((pos, dist, qi))
+        return qi[order], pos[order], dist[order]
+
+    def pairs(self, radius: int, chunk: int = QUERY_CHUNK) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """All stored pairs (i < j) within `radius`, as chunks of (i, j, distance) arrays."""
+        for start in range(0, len(self), chunk):
+            qi, pos, dist = self.query(np.asarray(self.hashes[start:start + chunk]), radius)
+            i = qi + start
+            keep = i < pos
+            yield i[keep], pos[keep], dist[keep]
+
+    def _empty(self) -> None:
+        self.row_ids = np.empty(0, dtype=np.int64)
+        self.digests = np.empty(0, dtype=DIGEST_DTYPE)
+        self.hashes = np.empty((0, self.words), dtype=np.uint64)
+        self.sizes = np.empty(0, dtype=np.int64)
+
+    def _arrays(self):
+        return self.row_ids, self.digests, self.hashes, self.sizes
+
+    def _changes(self, conn) -> Tuple[int, np.ndarray]:
+        """(last change seq, rowids updated or deleted since `change_seq`)."""
+        if not len(self):
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM perceptual_hash_changes").fetchone()[0]
+            return seq, np.empty(0, dtype=np.int64)
+        rows = conn.execute(
+            "SELECT seq, row_id FROM perceptual_hash_changes WHERE seq > ? ORDER BY seq", (self.change_seq,)
+        ).fetchall()
+        if not rows:
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM perceptual_hash_changes").fetchone()[0]
+            return seq, np.empty(0, dtype=np.int64)
+        return rows[-1][0], np.unique(np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows)))
+
+    def _last_row_matches(self, conn, changed: np.ndarray) -> bool:
+        """Cheap check that the newest stored row still belongs to this table.
+
+        A row listed in the change log is fine (`refresh` re-reads it); a
+        missing or reused rowid that the log does not explain is not.
+        """
+        if not len(self):
+            return True
+        row_id = int(self.row_ids[-1])
+        if row_id in changed:
+            return True
+        row = conn.execute("SELECT md5_hash FROM perceptual_hashes WHERE rowid = ?", (row_id,)).fetchone()
+        return row is not None and row[0] == self.md5(len(self) - 1)
+
+    def _read(self, conn, since: int, reread: List[int]) -> list:
+        """Rows of this (algorithm, hash_size) in `reread` or with rowid > `since`."""
+        sql = """
+            SELECT p.rowid, p.md5_hash, p.value,
+                   (SELECT file_size FROM images i WHERE i.md5_hash = p.md5_hash LIMIT 1)
+            FROM perceptual_hashes p
+            WHERE p.algorithm = ? AND p.hash_size = ? AND {}
+            ORDER BY p.rowid
+        """
+        params = (self.algorithm, self.hash_size)
+        rows = []
+        for i in range(0, len(reread), _IN_CHUNK):
+            chunk = reread[i:i + _IN_CHUNK]
+            rows += conn.execute(sql.format(f"p.rowid IN ({', '.join('?' * len(chunk))})"), (*params, *chunk))
+        rows += conn.execute(sql.format("p.rowid > ?"), (*params, since))
+        return rows
+
+    def _columns(self, rows) -> Tuple[np.ndarray, ...]:
+        valid = [r for r in rows if _is_md5(r[1])]
+        if len(valid) != len(rows):
+            self.logger.warning(
+                f"Hash store {self.algorithm}/{self.hash_size}: {len(rows) - len(valid)} linhas ignoradas "
+                f"(chave não é um md5 em hex)"
+            )
+        n = len(valid)
+        row_ids = np.fromiter((r[0] for r in valid), dtype=np.int64, count=n)
+        digests = pack_digests(r[1] for r in valid)
+        hashes = self.pack_many(int(r[2], 16) for r in valid)
+        sizes = np.fromiter((r[3] if r[3] is not None else -1 for r in valid), dtype=np.int64, count=n)
+        return row_ids, digests, hashes, sizes
+
+    def _append(self, added) -> None:
+        """Append rows to the column files (and the meta), then re-map them."""
+        if self.directory is None:
+            self.row_ids, self.digests, self.hashes, self.sizes = (
+                np.concatenate([old, new]) for old, new in zip(self._arrays(), added)
+            )
+            return
+        if not len(self):
+            self._rewrite(list(added))
+            return
+        try:
+            for name, rows in zip(COLUMNS, added):
+                if len(rows) and not _append_npy(self.directory / f"{name}.npy", rows):
+                    raise ValueError(f"{name}.npy cannot be appended to")
+            self._save_meta(len(self) + len(added[0]))
+        except (OSError, ValueError) as e:
+            self.logger.info(f"Hash store {self.directory}: regravando as colunas ({e})")
+            self._rewrite([np.concatenate([np.asarray(old), new]) for old, new in zip(self._arrays(), added)])
+            return
+        self.open()
+
+    def _rewrite(self, arrays) -> None:
+        """Write whole columns (temp file + rename) and re-map them read-only."""
+        self.row_ids, self.digests, self.hashes, self.sizes = arrays
+        self.generation = uuid.uuid4().hex
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for name, array in zip(COLUMNS, arrays):
+                tmp = self.directory / f"{name}.tmp.npy"
+                np.save(tmp, np.ascontiguousarray(array))
+                os.replace(tmp, self.directory / f"{name}.npy")
+            self._save_meta(len(self))
+        except OSError as e:
+            # e.g. another process still maps the files on Windows: keep the in-memory copy
+            self.logger.warning(f"Hash store não gravado ({self.directory}): {e}")
+            return
+        self.open()
+
+    def _save_meta(self, count: int) -> None:
+        meta = {
+            "version": STORE_VERSION,
+            "algorithm": self.algorithm,
+            "hash_size": self.hash_size,
+            "count": count,
+            "max_rowid": self.max_rowid,
+            "change_seq": self.change_seq,
+            "generation": self.generation,
+        }
+        tmp = self.directory / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.directory / "meta.json")
+
+
+class BandIndex:
+    """Multi-index hashing bands of a `HashStore`, persisted next to it.
+
+    The hash bits are split into at least radius + 1 contiguous bands of up
+    to 64 bits: two hashes within `radius` agree exactly on some band
+    (pigeonhole). Every run of rows appended to the store keeps, per band,
+    its sorted keys and the row positions, so a query is a `searchsorted`
+    per band and run. A run is merged into the previous one when that one
+    is at most twice its size, which keeps O(log n) runs.
+
+    Args:
+        store: Store whose `hashes` are indexed
+        radius: Largest radius the index answers exactly
+    """
+
+    def __init__(self, store: HashStore, radius: int):
+        self.logger = get_logger()
+        self.store = store
+        self.radius = max(0, int(radius))
+        n_bands = min(store.bits, max(self.radius + 1, store.words))
+        base, extra = divmod(store.bits, n_bands)
+        self.bands: List[Tuple[int, int]] = []  # (shift from the lowest bit, width)
+        shift = 0
+        for i in range(n_bands):
+            width = base + (1 if i < extra else 0)
+            self.bands.append((shift, width))
+            shift += width
+        self.directory = store.directory / f"bands_{n_bands}" if store.directory is not None else None
+        self.generation: Optional[str] = None
+        self.runs: List[Tuple[int, np.ndarray, np.ndarray]] = []  # (first position, keys, positions)
+
+    @property
+    def covered(self) -> int:
+        if not self.runs:
+            return 0
+        start, keys, _ = self.runs[-1]
+        return start + keys.shape[1]
+
+    def keys(self, hashes: np.ndarray) -> np.ndarray:
+        """(n_bands, n) band keys of packed hashes (n, W)."""
+        words = self.store.words
+        out = np.empty((len(self.bands), len(hashes)), dtype=np.uint64)
+        for b, (shift, width) in enumerate(self.bands):
+            col, offset = words - 1 - shift // 64, shift % 64
+            key = hashes[:, col] >> np.uint64(offset)
+            if offset + width > 64:
+                key = key | (hashes[:, col - 1] << np.uint64(64 - offset))
+            if width < 64:
+                key = key & np.uint64((1 << width) - 1)
+            out[b] = key
+        return out
+
+    def sync(self) -> "BandIndex":
+        """Load the persisted runs and index the rows appended since."""
+        if self.generation != self.store.generation:
+            self.runs = self._load()
+            self.generation = self.store.generation
+        if self.covered < len(self.store):
+            self.runs.append(self._build(self.covered, len(self.store)))
+            while len(self.runs) > 1 and self.runs[-2][1].shape[1] <= 2 * self.runs[-1][1].shape[1]:
+                self.runs[-2:] = [self._build(self.runs[-2][0], len(self.store))]
+            self._save()
+        return self
+
+    def candidates(self, qkeys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(query index, row position) of rows sharing a band key (with repeats)."""
+        n = qkeys.shape[1]
+        found_q, found_pos = [], []
+        for _, keys, positions in self.runs:
+            for b in range(len(self.bands)):
+                lo = np.searchsorted(keys[b], qkeys[b], side="left")
+                counts = np.searchsorted(keys[b], qkeys[b], side="right") - lo
+                total = int(counts.sum())
+                if not total:
+                    continue
+                starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+                found_q.append(np.repeat(np.arange(n, dtype=np.int64), counts))
+                found_pos.append(np.asarray(positions[b])[np.arange(total) + starts])
+        if not found_q:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(found_q), np.concatenate(found_pos)
+
+    def _build(self, start: int, end: int) -> Tuple[int, np.ndarray, np.ndarray]:
+        keys = self.keys(np.asarray(self.store.hashes[start:end]))
+        order = np.argsort(keys, axis=1, kind="stable")
+        return start, np.take_along_axis(keys, order, axis=1), order.astype(np.int64) + start
+
+    def _file(self, name: str, start: int, end: int) -> Path:
+        # rows [start, end) of one generation never change: the file name says
+        # which rows it holds, so a run file is written once and never replaced
+        return self.directory / f"{name}_{self.store.generation}_{start}_{end}.npy"
+
+    def _load(self) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+        if self.directory is None:
+            return []
+        try:
+            meta = json.loads((self.directory / "meta.json").read_text(encoding="utf-8"))
+            if meta.get("generation") != self.store.generation or meta.get("count", 0) > len(self.store):
+                return []
+            runs = []
+            for start, end in meta["runs"]:
+                keys = np.load(self._file("keys", start, end), mmap_mode="r")
+                positions = np.load(self._file("positions", start, end), mmap_mode="r")
+                runs.append((start, keys, positions))
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+        return runs
+
+    def _save(self) -> None:
+        """Write the new run files, then `meta.json`, then drop unreferenced files."""
+        if self.directory is None:
+            return
+        spans = [(start, start + keys.shape[1]) for start, keys, _ in self.runs]
+        files = set()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for (start, end), (_, keys, positions) in zip(spans, self.runs):
+                for name, array in (("keys", keys), ("positions", positions)):
+                    path = self._file(name, start, end)
+                    files.add(path.name)
+                    if path.exists():  # same rows, same content (maybe saved by another store)
+                        continue
+                    tmp = path.with_suffix(".npy.part")
+                    with open(tmp, "wb") as f:
+                        np.save(f, array)
+                    os.replace(tmp, path)
+            meta = {"generation": self.generation, "count": self.covered, "runs": spans}
+            tmp = self.directory / "meta.json.tmp"
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, self.directory / "meta.json")
+        except OSError as e:
+            self.logger.warning(f"Índice de faixas não gravado ({self.directory}): {e}")
+            return
+        for path in self.directory.glob("*.npy"):
+            if path.name not in files:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # still mapped (Windows): removed by a later save
@@ -0,0 +1,232 @@
+"""Versioned schema migrations for the image database.
+
+Every schema change is a numbered migration in `MIGRATIONS`. The
+`schema_version` table records which ones were applied, and `migrate`
+runs the pending ones in order, each in its own transaction, followed by
+`ANALYZE` so the query planner sees the new indexes.
+
+Migrations are written to be idempotent (`IF NOT EXISTS`, column checks).
+Databases created before this table existed therefore adopt the
+versioning on their first `migrate`.
+
+Both the CLI (`main.init_db`) and `DBManager.init_tables` go through here.
+"""
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from src.utils.logger import get_logger
+
+# columns added after the first schema
+IMAGE_GEO_COLUMNS = (
+    ("latitude", "REAL"),
+    ("longitude", "REAL"),
+    ("geohash", "TEXT"),
+)
+
+RTREE_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS images_rtree_insert AFTER INSERT ON images
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+    BEGIN
+        INSERT OR REPLACE INTO images_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_rtree_update AFTER UPDATE OF latitude, longitude ON images
+    BEGIN
+        DELETE FROM images_rtree WHERE id = old.id;
+        INSERT INTO images_rtree
+            SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_rtree_delete AFTER DELETE ON images
+    BEGIN
+        DELETE FROM images_rtree WHERE id = old.id;
+    END
+    """,
+)
+
+
+def _base_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_path TEXT UNIQUE,
+            file_name TEXT,
+            file_size INTEGER,
+            format TEXT,
+            width INTEGER,
+            height INTEGER,
+            megapixels REAL,
+            datetime TEXT,
+            camera_make TEXT,
+            camera_model TEXT,
+            md5_hash TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS duplicate_groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            created_at TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS duplicate_group_members (
+            group_id INTEGER NOT NULL REFERENCES duplicate_groups(id) ON DELETE CASCADE,
+            file_path TEXT NOT NULL,
+            PRIMARY KEY (group_id, file_path)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perceptual_hashes (
+            md5_hash TEXT NOT NULL,
+            algorithm TEXT NOT NULL,
+            hash_size INTEGER NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (md5_hash, algorithm, hash_size)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS similar_pairs (
+            md5_a TEXT NOT NULL,
+            md5_b TEXT NOT NULL,
+            distance INTEGER NOT NULL,
+            PRIMARY KEY (md5_a, md5_b)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_similar_pairs_distance ON similar_pairs(distance)")
+
+
+def _geo_columns_and_rtree(conn: sqlite3.Connection) -> None:
+    """Location columns, the R*Tree over them, its sync triggers and the geohash index."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(images)")}
+    for name, kind in IMAGE_GEO_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE images ADD COLUMN {name} {kind}")
+    created = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'images_rtree'").fetchone() is None
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS images_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+    )
+    for trigger in RTREE_TRIGGERS:
+        conn.execute(trigger)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_geohash ON images(geohash)")
+    if created:
+        # backfill rows stored before the index existed
+        conn.execute(
+            "INSERT INTO images_rtree SELECT id, latitude, latitude, longitude, longitude FROM images "
+            "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+
+
+def _lookup_indexes(conn: sqlite3.Connection) -> None:
+    """Indexes for duplicate lookups by md5, date/camera blocking and size + md5 collapsing."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_md5 ON images(md5_hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_datetime ON images(datetime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_camera ON images(camera_make, camera_model)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_size ON images(file_size, md5_hash)")
+
+
+def _query_indexes(conn: sqlite3.Connection) -> None:
+    """Composite indexes for `DBManager.query_images` filters and sort orders."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_file_size ON images(file_size)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_camera_datetime ON images(camera_model, datetime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_images_format_datetime ON images(format, datetime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_group_members_path ON duplicate_group_members(file_path)")
+
+
+def _utc_offset_column(conn: sqlite3.Connection) -> None:
+    """UTC offset (minutes) of the capture time, from EXIF OffsetTime*; NULL if unknown."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(images)")}
+    if "utc_offset" not in existing:
+        conn.execute("ALTER TABLE images ADD COLUMN utc_offset INTEGER")
+
+
+def _perceptual_hash_changes(conn: sqlite3.Connection) -> None:
+    """Log of updated/deleted `perceptual_hashes` rowids, read by `HashStore.refresh`."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perceptual_hash_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            row_id INTEGER NOT NULL
+        )
+        """
+    )
+    for event in ("UPDATE", "DELETE"):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS perceptual_hashes_log_{event.lower()} AFTER {event} ON perceptual_hashes
+            BEGIN
+                INSERT INTO perceptual_hash_changes (row_id) VALUES (old.rowid);
+            END
+            """
+        )
+
+
+# (version, description, migration); versions are applied in increasing order
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "base schema", _base_schema),
+    (2, "image locations and R*Tree index", _geo_columns_and_rtree),
+    (3, "md5, datetime, camera and size indexes", _lookup_indexes),
+    (4, "image query indexes", _query_indexes),
+    (5, "capture UTC offset", _utc_offset_column),
+    (6, "perceptual hash change log", _perceptual_hash_changes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration (0 for a database without `schema_version`)."""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description TEXT, applied_at TEXT)"
+    )
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """Apply pending migrations in order. Returns the versions applied now."""
+    logger = get_logger()
+    if conn.in_transaction:
+        conn.commit()
+    if current_version(conn) >= LATEST_VERSION:
+        conn.commit()
+        return []
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        # BEGIN IMMEDIATE takes the write lock before re-checking, so two
+        # processes starting together do not run the same migration twice
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().isoformat(timespec="seconds")),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+        logger.info(f"Migração {version} aplicada: {description}")
+    if applied:
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
@@ -0,0 +1,124 @@
+"""Bloqueio de candidatos por metadados antes da comparação visual.
+
+Quase-duplicatas (rajadas, reexportações) têm a mesma proporção, horários
+próximos e a mesma câmera. As imagens são distribuídas em blocos
+(câmera, faixa de proporção, janela de tempo) e só são comparados pares do
+mesmo bloco ou de blocos vizinhos (±1 faixa de proporção, ±1 janela), o que
+garante que pares dentro das tolerâncias nunca são perdidos.
+
+Imagens sem data ou sem dimensões formam seus próprios blocos (valor None).
+"""
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.parsers import DateTimeParser
+from src.utils.logger import get_logger
+
+# metade da vizinhança 3x3 (a outra metade é coberta pelo bloco vizinho)
+_HALF_NEIGHBORHOOD = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def to_timestamp(value: Any, utc_offset: Optional[int] = None) -> Optional[float]:
+    """Converte datetime ou string ISO (como gravada no banco) em timestamp.
+
+    Com `utc_offset` (minutos, ver `DateTimeParser.to_utc`) a hora local da
+    câmera vira um instante absoluto, comparável entre fusos.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except (TypeError, ValueError):
+            return None
+    if utc_offset is not None and value.tzinfo is None:
+        return DateTimeParser.to_utc(value, utc_offset).timestamp()
+    return value.timestamp()
+
+
+class CandidateBlocker:
+    """Gera pares candidatos a partir de `width`, `height`, `datetime` e `camera_model`.
+
+    Args:
+        time_window: Tolerância de horário em segundos
+        aspect_tolerance: Tolerância relativa da proporção (0.02 = 2%)
+        use_camera: Se False, ignora o modelo da câmera
+    """
+
+    def __init__(self, time_window: float = 60, aspect_tolerance: float = 0.02, use_camera: bool = True):
+        self.logger = get_logger()
+        self.time_window = max(float(time_window), 1e-6)
+        self.aspect_step = math.log1p(max(aspect_tolerance, 1e-6))
+        self.use_camera = use_camera
+        self.stats: Dict[str, int] = {}
+
+    def block_key(self, row: Dict[str, Any]) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+        camera = None
+        if self.use_camera:
+            camera = (row.get("camera_model") or "").strip().lower() or None
+
+        aspect_bucket = None
+        width, height = row.get("width") or 0, row.get("height") or 0
+        if width > 0 and height > 0:
+            # proporção independente de orientação (retrato/paisagem)
+            aspect = max(width, height) / min(width, height)
+            aspect_bucket = int(math.log(aspect) // self.aspect_step)
+
+        time_bucket = None
+        ts = to_timestamp(row.get("datetime"), row.get("utc_offset"))
+        if ts is not None:
+            time_bucket = int(ts // self.time_window)
+
+        return camera, aspect_bucket, time_bucket
+
+    def candidate_pairs(self, rows: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """Retorna pares (i, j), i < j, de índices de `rows` a comparar."""
+        blocks: Dict[Tuple, List[int]] = {}
+        for idx, row in enumerate(rows):
+            blocks.setdefault(self.block_key(row), []).append(idx)
+
+        pairs: List[Tuple[int, int]] = []
+        for key, members in blocks.items():
+            pairs.extend(self._within(members))
+            camera, a_bucket, t_bucket = key
+            if a_bucket is None and t_bucket is None:
+                continue
+            for da, dt in _HALF_NEIGHBORHOOD:
+                if (a_bucket is None and da) or (t_bucket is None and dt):
+                    continue
+                neighbor = (
+                    camera,
+                    None if a_bucket is None else a_bucket + da,
+                    None if t_bucket is None else t_bucket + dt,
+                )
+                other = blocks.get(neighbor)
+                if other and neighbor != key:
+                    pairs.extend(self._across(members, other))
+
+        total = len(rows) * (len(rows) - 1) // 2
+        self.stats = {
+            "images": len(rows),
+            "blocks": len(blocks),
+            "total_pairs": total,
+            "candidate_pairs": len(pairs),
+            "pruned_pairs": total - len(pairs),
+        }
+        pct = 100.0 * self.stats["pruned_pairs"] / total if total else 0.0
+        self.logger.info(
+            f"Bloqueio: {len(rows)} imagens em {len(blocks)} blocos; "
+            f"{len(pairs)} pares candidatos, {self.stats['pruned_pairs']} descartados ({pct:.1f}%)"
+        )
+        return pairs
+
+    @staticmethod
+    def _within(members: List[int]) -> Iterable[Tuple[int, int]]:
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                yield members[a], members[b]
+
+    @staticmethod
+    def _across(left: List[int], right: List[int]) -> Iterable[Tuple[int, int]]:
+        for i in left:
+            for j in right:
+                yield (i, j) if i < j else (j, i)
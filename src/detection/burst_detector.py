@@ -0,0 +1,82 @@
+"""Detecção de rajadas (sequências de disparo) por janela de tempo.
+
+Ordena as imagens pela data de captura (a mesma determinada pelo
+`DateTimeParser` e gravada no banco, convertida para UTC quando o fuso
+EXIF é conhecido) e percorre cada câmera em ordem:
+fotos consecutivas com intervalo <= `max_gap` segundos formam uma sequência.
+Custo O(N log N), sem decodificar nenhuma imagem. Opcionalmente, cada
+sequência é confirmada por pHash calculado apenas dentro dela.
+"""
+from typing import Any, Dict, List, Optional
+
+from src.detection.blocking import to_timestamp
+from src.detection.similar_detector import SimilarDuplicateDetector
+from src.utils.logger import get_logger
+
+
+class BurstDetector:
+    """Encontra sequências de fotos tiradas em rajada.
+
+    Args:
+        max_gap: Intervalo máximo (segundos) entre fotos consecutivas
+        min_size: Tamanho mínimo de uma sequência
+        per_camera: Separa as sequências por modelo de câmera
+    """
+
+    def __init__(self, max_gap: float = 2.0, min_size: int = 2, per_camera: bool = True):
+        self.logger = get_logger()
+        self.max_gap = max_gap
+        self.min_size = max(2, min_size)
+        self.per_camera = per_camera
+
+    def detect(self, rows: List[Dict[str, Any]]) -> List[List[str]]:
+        """Retorna as sequências (listas de `file_path` em ordem de captura)."""
+        entries = []
+        for row in rows:
+            ts = to_timestamp(row.get("datetime"), row.get("utc_offset"))
+            if ts is None:
+                continue
+            camera = (row.get("camera_model") or "").strip().lower() if self.per_camera else ""
+            entries.append((camera, ts, str(row["file_path"])))
+        entries.sort()
+
+        sequences: List[List[str]] = []
+        current: List[str] = []
+        prev_camera, prev_ts = None, None
+        for camera, ts, path in entries:
+            if current and camera == prev_camera and ts - prev_ts <= self.max_gap:
+                current.append(path)
+            else:
+                if len(current) >= self.min_size:
+                    sequences.append(current)
+                current = [path]
+            prev_camera, prev_ts = camera, ts
+        if len(current) >= self.min_size:
+            sequences.append(current)
+
+        self.logger.info(
+            f"Rajadas: {len(sequences)} sequências com {sum(len(s) for s in sequences)} fotos "
+            f"(intervalo máximo {self.max_gap}s)"
+        )
+        return sequences
+
+    def confirm(
+        self,
+        sequences: List[List[str]],
+        detector: Optional[SimilarDuplicateDetector] = None,
+        max_distance: int = 8,
+        keys: Optional[Dict[str, str]] = None,
+    ) -> List[List[str]]:
+        """Divide cada sequência em grupos visualmente similares (pHash só dentro dela).
+
+        `keys` (caminho -> md5) permite reaproveitar o cache de rasters do detector.
+        """
+        detector = detector or SimilarDuplicateDetector()
+        # um único lote de hashes (aproveita o pool de processos, se houver)
+        all_hashes = detector.compute_hashes([p for seq in sequences for p in seq], keys)
+        confirmed = []
+        for seq in sequences:
+            hashes = {p: all_hashes[p] for p in seq if p in all_hashes}
+            for members in detector.cluster_hashes(hashes, max_distance).values():
+                confirmed.append(members)
+        return confirmed
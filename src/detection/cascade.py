@@ -0,0 +1,140 @@
+"""Detecção de similares em cascata: pré-filtro barato, confirmação por pHash.
+
+1. Pré-filtro: decodifica cada imagem já reduzida (draft JPEG) e calcula um
+   dHash/aHash de 64 bits. Um `HammingIndex` gera os pares candidatos.
+2. Confirmação: apenas imagens que aparecem em algum candidato recebem o
+   pHash completo (e opcionalmente wHash); só os pares confirmados viram grupos.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.perceptual_hash import HASH_FUNCTIONS, load_grayscale, whash_from_pixels
+from src.detection.clustering import cluster_pairs
+from src.detection.hash_index import HammingIndex, hamming_distance
+from src.detection.similar_detector import SimilarDuplicateDetector
+from src.utils.logger import get_logger
+
+PREFILTER_HASH_SIZE = 8
+PREFILTER_RASTER = 32
+
+
+class CascadeSimilarityMatcher:
+    """Agrupa imagens similares com pré-filtro dHash/aHash e confirmação pHash.
+
+    Args:
+        prefilter_hash: "dhash" ou "ahash"
+        prefilter_threshold: Distância máxima (de 64 bits) para virar candidato
+        confirm_threshold: Distância máxima do pHash para confirmar o par
+        whash_threshold: Se definido, o par também precisa passar no wHash
+        hash_size: Lado do pHash de confirmação
+        workers: Processos para o pHash dos candidatos (ver SimilarDuplicateDetector)
+        preview_min_size: Usa previews embutidos com pelo menos esse lado
+    """
+
+    def __init__(
+        self,
+        prefilter_hash: str = "dhash",
+        prefilter_threshold: int = 12,
+        confirm_threshold: int = 8,
+        whash_threshold: Optional[int] = None,
+        hash_size: int = 16,
+        workers: int = 1,
+        batch_size: int = 256,
+        preview_min_size: Optional[int] = None,
+    ):
+        if prefilter_hash not in ("dhash", "ahash"):
+            raise ValueError(f"Hash de pré-filtro inválido: {prefilter_hash}")
+        self.logger = get_logger()
+        self.prefilter_fn = HASH_FUNCTIONS[prefilter_hash]
+        self.prefilter_threshold = prefilter_threshold
+        self.confirm_threshold = confirm_threshold
+        self.whash_threshold = whash_threshold
+        self.preview_min_size = preview_min_size
+        self.detector = SimilarDuplicateDetector(
+            hash_size=hash_size, workers=workers, batch_size=batch_size, preview_min_size=preview_min_size
+        )
+        self.stats: Dict[str, int] = {}
+
+    def prefilter_hashes(self, paths: Iterable[Path]) -> Dict[str, int]:
+        hashes = {}
+        for p in paths:
+            try:
+                pixels = load_grayscale(
+                    Path(p), PREFILTER_RASTER, draft=True, preview_min_size=self.preview_min_size
+                )
+                hashes[str(p)] = self.prefilter_fn(pixels, PREFILTER_HASH_SIZE)
+            except Exception as e:
+                self.logger.debug(f"Erro no pré-filtro de {p}: {e}")
+        return hashes
+
+    def candidate_pairs(self, prefilter: Dict[str, int]) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """Pares (i, j) sobre `keys` ordenadas cujo pré-filtro está no limiar."""
+        keys = sorted(prefilter)
+        index = HammingIndex(PREFILTER_HASH_SIZE * PREFILTER_HASH_SIZE, self.prefilter_threshold)
+        for k in keys:
+            index.add(k, prefilter[k])
+        return keys, [(i, j) for i, j, _ in index.pairs()]
+
+    def group_similar(self, paths: List[Path]) -> Dict[str, List[str]]:
+        """Mesmo formato de `SimilarDuplicateDetector.group_similar`."""
+        prefilter = self.prefilter_hashes(paths)
+        keys, candidates = self.candidate_pairs(prefilter)
+
+        involved: Set[int] = {i for pair in candidates for i in pair}
+        phashes = self.detector.compute_hashes([Path(keys[i]) for i in sorted(involved)])
+        whashes = self._whashes([keys[i] for i in sorted(involved)]) if self.whash_threshold is not None else {}
+
+        confirmed = []
+        for i, j in candidates:
+            a, b = keys[i], keys[j]
+            if a not in phashes or b not in phashes:
+                continue
+            dist = hamming_distance(phashes[a], phashes[b])
+            if dist > self.confirm_threshold:
+                continue
+            if whashes and (a not in whashes or b not in whashes
+                            or hamming_distance(whashes[a], whashes[b]) > self.whash_threshold):
+                continue
+            confirmed.append((i, j, dist))
+
+        self.stats = {
+            "images": len(prefilter),
+            "candidate_pairs": len(candidates),
+            "phash_computed": len(phashes),
+            "confirmed_pairs": len(confirmed),
+        }
+        self.logger.info(
+            f"Cascata: {self.stats['images']} imagens, {self.stats['candidate_pairs']} candidatos, "
+            f"{self.stats['phash_computed']} pHash calculados, {self.stats['confirmed_pairs']} pares confirmados"
+        )
+        clusters = cluster_pairs(len(keys), confirmed)
+        return {keys[c[0]]: [keys[i] for i in c] for c in clusters}
+
+    def _whashes(self, paths: List[str]) -> Dict[str, int]:
+        hashes = {}
+        for p in paths:
+            try:
+                pixels = load_grayscale(Path(p), 64, preview_min_size=self.preview_min_size)
+                hashes[p] = whash_from_pixels(pixels, self.detector.hash_size)
+            except Exception:
+                continue
+        return hashes
+
+
+def group_pairs(groups: Dict[str, List[str]]) -> Set[Tuple[str, str]]:
+    """Converte grupos em pares não ordenados (para medir precisão/recall)."""
+    pairs = set()
+    for members in groups.values():
+        ordered = sorted(members)
+        for a in range(len(ordered)):
+            for b in range(a + 1, len(ordered)):
+                pairs.add((ordered[a], ordered[b]))
+    return pairs
+
+
+def precision_recall(found: Set[Tuple[str, str]], expected: Set[Tuple[str, str]]) -> Tuple[float, float]:
+    """Precisão e recall de pares encontrados contra um gabarito."""
+    hits = len(found & expected)
+    precision = hits / len(found) if found else 1.0
+    recall = hits / len(expected) if expected else 1.0
+    return precision, recall
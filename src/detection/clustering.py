@@ -0,0 +1,107 @@
+"""Agrupamento de imagens similares a partir de pares candidatos.
+
+Union-find (componentes conexos, ligação simples) com compressão de caminho
+e união por tamanho. Opcionalmente aplica um teto de ligação completa: dois
+grupos só são unidos se *todos* os pares entre eles estiverem dentro do teto.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class UnionFind:
+    """Estrutura union-find sobre os inteiros 0..n-1."""
+
+    def __init__(self, n: int = 0):
+        self.parent: List[int] = list(range(n))
+        self.size: List[int] = [1] * n
+
+    def add(self) -> int:
+        """Adiciona um novo elemento isolado e retorna seu índice."""
+        idx = len(self.parent)
+        self.parent.append(idx)
+        self.size.append(1)
+        return idx
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # compressão de caminho
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> int:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+    def components(self) -> Dict[int, List[int]]:
+        """Retorna raiz -> membros (ordenados) para todos os elementos."""
+        comps: Dict[int, List[int]] = {}
+        for x in range(len(self.parent)):
+            comps.setdefault(self.find(x), []).append(x)
+        return comps
+
+
+def cluster_pairs(
+    n: int,
+    pairs: Iterable[Tuple[int, int, int]],
+    max_group_distance: Optional[int] = None,
+    distance: Optional[Callable[[int, int], int]] = None,
+    initial: Iterable[List[int]] = (),
+) -> List[List[int]]:
+    """Agrupa `n` elementos a partir de pares (i, j, distância).
+
+    Sem `max_group_distance` o resultado são os componentes conexos (ligação
+    simples), independente da ordem dos pares. Com o teto, os pares são
+    processados em ordem crescente de distância e uma união só acontece se a
+    maior distância entre os dois grupos for <= teto; nesse modo `distance(i, j)`
+    é obrigatório.
+
+    `initial` são grupos já formados (ex.: persistidos em execução anterior),
+    unidos antes dos pares e sem nova verificação do teto.
+
+    Returns:
+        Lista de grupos (listas de índices ordenadas) com 2+ membros,
+        ordenada pelo menor índice de cada grupo.
+    """
+    uf = UnionFind(n)
+    initial = [list(group) for group in initial]
+    for group in initial:
+        for other in group[1:]:
+            uf.union(group[0], other)
+    # membros de cada grupo já formado, para o teto de ligação completa
+    members: Dict[int, List[int]] = {}
+    for x in sorted({x for group in initial for x in group}):
+        members.setdefault(uf.find(x), []).append(x)
+
+    if max_group_distance is None:
+        for i, j, _ in pairs:
+            uf.union(i, j)
+    else:
+        if distance is None:
+            raise ValueError("distance é obrigatório quando max_group_distance é usado")
+        for i, j, dist in sorted(pairs, key=lambda p: (p[2], p[0], p[1])):
+            if dist > max_group_distance:
+                continue
+            ra, rb = uf.find(i), uf.find(j)
+            if ra == rb:
+                continue
+            group_a = members.get(ra, [ra])
+            group_b = members.get(rb, [rb])
+            if any(distance(x, y) > max_group_distance for x in group_a for y in group_b):
+                continue
+            root = uf.union(ra, rb)
+            members.pop(ra, None)
+            members.pop(rb, None)
+            members[root] = group_a + group_b
+
+    groups = [sorted(m) for m in uf.components().values() if len(m) > 1]
+    groups.sort(key=lambda g: g[0])
+    return groups
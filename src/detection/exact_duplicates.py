@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 import hashlib
 import sqlite3
 
@@ -47,3 +47,47 @@ class ExactDuplicateDetector:
             except Exception as e:
                 self.logger.warning(f"Erro ao calcular MD5 de {p}: {e}")
         return groups
+
+
+def collapse_exact(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, List[str]]]:
+    """Reduz linhas de `images` a um representante por conteúdo (tamanho + md5).
+
+    Linhas sem md5 representam só a si mesmas. Retorna as linhas
+    representantes (na ordem original) e representante -> todos os caminhos
+    com o mesmo conteúdo, para `expand_groups` desfazer a redução.
+    """
+    reps: List[Dict[str, Any]] = []
+    members: Dict[str, List[str]] = {}
+    rep_by_key: Dict[Any, str] = {}
+    for row in rows:
+        path = str(row["file_path"])
+        md5 = row.get("md5_hash")
+        key = (row.get("file_size"), md5) if md5 else path
+        rep = rep_by_key.get(key)
+        if rep is None:
+            rep_by_key[key] = path
+            members[path] = [path]
+            reps.append(row)
+        else:
+            members[rep].append(path)
+    return reps, members
+
+
+def expand_groups(groups: Dict[str, List[str]], members: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Troca cada representante pelos caminhos idênticos a ele.
+
+    Representantes com cópias idênticas que não entraram em nenhum grupo de
+    similares formam o próprio grupo (distância 0), como se tivessem sido
+    comparados individualmente.
+    """
+    expanded: Dict[str, List[str]] = {}
+    grouped = set()
+    for group in groups.values():
+        paths = sorted(p for rep in group for p in members.get(rep, [rep]))
+        grouped.update(group)
+        expanded[paths[0]] = paths
+    for rep, paths in members.items():
+        if rep not in grouped and len(paths) > 1:
+            paths = sorted(paths)
+            expanded[paths[0]] = paths
+    return dict(sorted(expanded.items()))
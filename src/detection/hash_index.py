@@ -0,0 +1,132 @@
+"""Índice de hashes perceptuais por distância de Hamming.
+
+Usa o princípio da casa dos pombos (multi-index hashing): o hash é dividido
+em `max_distance + 1` faixas e quaisquer dois hashes a distância <= max_distance
+coincidem exatamente em pelo menos uma faixa. Assim, pares candidatos são
+encontrados por lookup em dicionários, sem comparar todos contra todos.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+def hash_to_int(value: Any) -> int:
+    """Converte `imagehash.ImageHash`, string hex ou array de bits para int."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return int(value, 16)
+    bits = getattr(value, "hash", value)
+    flat = np.asarray(bits, dtype=bool).flatten()
+    if flat.size == 0:
+        return 0
+    # packbits completa o último byte com zeros à direita
+    packed = int.from_bytes(np.packbits(flat).tobytes(), "big")
+    return packed >> ((-flat.size) % 8)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Distância de Hamming entre dois hashes inteiros."""
+    return (a ^ b).bit_count()
+
+
+class HammingIndex:
+    """Índice para busca por raio em hashes de `bits` bits.
+
+    Buscas com raio <= `max_distance` são exatas (não perdem vizinhos).
+    """
+
+    def __init__(self, bits: int, max_distance: int):
+        if bits <= 0:
+            raise ValueError("bits deve ser positivo")
+        self.bits = bits
+        self.max_distance = max(0, int(max_distance))
+        n_bands = min(self.max_distance + 1, bits)
+        base, extra = divmod(bits, n_bands)
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for i in range(n_bands):
+            width = base + (1 if i < extra else 0)
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+        self._keys: List[Any] = []
+        self._values: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, key: Any, value: Union[int, str, Any]) -> int:
+        """Adiciona um hash ao índice. Retorna a posição interna."""
+        h = hash_to_int(value)
+        idx = len(self._values)
+        self._keys.append(key)
+        self._values.append(h)
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            table.setdefault((h >> shift) & mask, []).append(idx)
+        return idx
+
+    def key(self, idx: int) -> Any:
+        return self._keys[idx]
+
+    def value(self, idx: int) -> int:
+        return self._values[idx]
+
+    def _candidates(self, h: int) -> set:
+        found = set()
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            bucket = table.get((h >> shift) & mask)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def query(self, value: Union[int, str, Any], radius: Optional[int] = None) -> List[Tuple[Any, int]]:
+        """Retorna [(key, distância)] dos hashes a distância <= radius, ordenados."""
+        radius = self._check_radius(radius)
+        h = hash_to_int(value)
+        hits = []
+        for idx in self._candidates(h):
+            dist = (h ^ self._values[idx]).bit_count()
+            if dist <= radius:
+                hits.append((dist, idx))
+        hits.sort()
+        return [(self._keys[idx], dist) for dist, idx in hits]
+
+    def nearest(self, value: Union[int, str, Any], k: int = 1, exclude: Any = None) -> List[Tuple[Any, int]]:
+        """Os `k` vizinhos mais próximos dentro de `max_distance` (pode ser vazio)."""
+        hits = [hit for hit in self.query(value) if exclude is None or hit[0] != exclude]
+        return hits[:k]
+
+    def pairs(self, radius: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+        """Gera (i, j, distância) com i < j para todos os pares a distância <= radius.
+
+        Os índices são posições internas; use `key()` para obter as chaves.
+        """
+        radius = self._check_radius(radius)
+        seen = set()
+        values = self._values
+        for table in self._tables:
+            for bucket in table.values():
+                if len(bucket) < 2:
+                    continue
+                for a in range(len(bucket)):
+                    i = bucket[a]
+                    hi = values[i]
+                    for b in range(a + 1, len(bucket)):
+                        j = bucket[b]
+                        pair = (i, j) if i < j else (j, i)
+                        if pair in seen:
+                            continue
+                        seen.add(pair)
+                        dist = (hi ^ values[j]).bit_count()
+                        if dist <= radius:
+                            yield pair[0], pair[1], dist
+
+    def _check_radius(self, radius: Optional[int]) -> int:
+        if radius is None:
+            return self.max_distance
+        if radius > self.max_distance:
+            raise ValueError(
+                f"raio {radius} maior que o max_distance do índice ({self.max_distance})"
+            )
+        return radius
@@ -0,0 +1,190 @@
+"""Detecção de similares incremental.
+
+Os pHashes ficam persistidos no banco (tabela `perceptual_hashes`, chaveados
+pelo md5 do conteúdo e pelo algoritmo, que inclui o modo de preview) e
+espelhados no `HashStore` mapeado em memória, junto com o índice de faixas
+(`BandIndex`). A cada execução apenas os conteúdos ainda sem hash são
+decodificados e consultados contra esse índice. Só os grupos persistidos que
+os pares novos tocam são lidos, refeitos e regravados; os caminhos e hashes
+envolvidos vêm do banco por md5/caminho. O custo de decodificação, busca e
+reagrupamento é proporcional ao lote novo, não ao tamanho da biblioteca.
+
+Com `max_group_distance`, a união respeita o mesmo teto de ligação completa
+de `cluster_pairs` (os grupos já persistidos contam como formados).
+
+Com `pair_ceiling`, todos os pares novos até essa distância também são
+gravados no cache de pares (`similar_pairs`, ver `PairDistanceCache`).
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.database.db_manager import DBManager
+from src.database.hash_store import HashStore
+from src.detection.clustering import cluster_pairs
+from src.detection.similar_detector import SimilarDuplicateDetector
+from src.utils.logger import get_logger
+
+
+def hash_to_hex(value: int, bits: int) -> str:
+    return format(value, f"0{(bits + 3) // 4}x")
+
+
+class IncrementalSimilarity:
+    """Atualiza os grupos de similares comparando só imagens novas.
+
+    Args:
+        dbm: Banco com `images`, `perceptual_hashes` e grupos persistidos
+        detector: Detector usado para calcular os hashes das imagens novas
+        max_distance: Limiar de distância (ligação simples)
+        group_kind: Tipo dos grupos persistidos a atualizar
+        pair_ceiling: Se definido, grava no cache os pares até essa distância
+        max_group_distance: Teto de ligação completa (None = sem teto)
+    """
+
+    def __init__(self, dbm: DBManager, detector: SimilarDuplicateDetector, max_distance: int,
+                 group_kind: str = "similar", pair_ceiling: Optional[int] = None,
+                 max_group_distance: Optional[int] = None):
+        self.logger = get_logger()
+        self.dbm = dbm
+        self.detector = detector
+        self.max_distance = max_distance
+        self.group_kind = group_kind
+        self.pair_ceiling = pair_ceiling
+        self.max_group_distance = max_group_distance
+        self.algorithm = detector.algorithm
+        self.bits = detector.hash_size * detector.hash_size
+        self.stats: Dict[str, int] = {}
+
+    def update(self, rows: Optional[List[Dict[str, Any]]] = None) -> List[List[str]]:
+        """Processa linhas de `images` (precisam de `file_path` e `md5_hash`).
+
+        Sem `rows`, usa as imagens cujo conteúdo ainda não tem hash. Linhas
+        de conteúdos já hasheados não são recalculadas nem consultadas.
+
+        Returns:
+            Grupos (listas de caminhos) criados ou alterados nesta execução.
+        """
+        if rows is None:
+            rows = self.dbm.images_without_hash(self.algorithm, self.detector.hash_size)
+        paths_by_md5: Dict[str, List[str]] = {}
+        for row in rows:
+            if row.get("md5_hash"):
+                paths_by_md5.setdefault(row["md5_hash"], []).append(str(row["file_path"]))
+
+        store = HashStore.for_db(self.dbm, self.algorithm, self.detector.hash_size)
+        known = self.dbm.load_hashes(self.algorithm, self.detector.hash_size, md5s=paths_by_md5)
+        pending = sorted(md5 for md5 in paths_by_md5 if md5 not in known)
+        fresh = self._hash_pending(pending, paths_by_md5)
+        store.refresh(self.dbm.conn)
+        new_pos = np.array([p for p in store.added if store.md5(p) in fresh], dtype=np.int64)
+
+        # só os hashes novos são consultados no índice de faixas persistido
+        radius = max(self.max_distance, self.pair_ceiling or 0)
+        qi, pos, dist = store.query(np.asarray(store.hashes[new_pos]), radius)
+        own = new_pos[qi]
+        # cada par uma vez: sem o próprio hash e, entre dois novos, só a partir do primeiro
+        keep = (pos != own) & (~np.isin(pos, new_pos) | (own < pos))
+        new_pairs, cached_pairs = [], []
+        for a, b, d in zip(own[keep].tolist(), pos[keep].tolist(), dist[keep].tolist()):
+            pair = (store.md5(a), store.md5(b), d)
+            if d <= self.max_distance:
+                new_pairs.append(pair)
+            if self.pair_ceiling is not None and d <= self.pair_ceiling:
+                cached_pairs.append(pair)
+        if cached_pairs:
+            self.dbm.save_pairs(cached_pairs)
+
+        changed, replaced = self._merge(new_pairs, paths_by_md5)
+
+        self.stats = {
+            "known_hashes": len(store) - len(new_pos),
+            "new_hashes": len(fresh),
+            "new_pairs": len(new_pairs),
+            "replaced_groups": replaced,
+            "changed_groups": len(changed),
+        }
+        self.logger.info(
+            f"Similares incremental: {len(fresh)} novas contra {len(store) - len(new_pos)} conhecidas, "
+            f"{len(new_pairs)} pares novos, {len(changed)} grupos alterados"
+        )
+        return changed
+
+    def _hash_pending(self, pending: List[str], paths_by_md5: Dict[str, List[str]]) -> Dict[str, int]:
+        if not pending:
+            return {}
+        reps = {paths_by_md5[md5][0]: md5 for md5 in pending}
+        computed = self.detector.compute_hashes([Path(p) for p in reps], keys={p: md5 for p, md5 in reps.items()})
+        fresh = {reps[path]: value for path, value in computed.items()}
+        self.dbm.save_hashes(
+            {md5: hash_to_hex(v, self.bits) for md5, v in fresh.items()},
+            self.algorithm,
+            self.detector.hash_size,
+        )
+        return fresh
+
+    def _merge(self, new_pairs, row_paths: Dict[str, List[str]]) -> Tuple[List[List[str]], int]:
+        """Une os pares novos aos grupos persistidos que eles tocam.
+
+        Returns:
+            (grupos novos ou alterados, nº de grupos antigos substituídos)
+        """
+        if not new_pairs:
+            return [], 0
+        pair_md5s = {md5 for a, b, _ in new_pairs for md5 in (a, b)}
+        paths_by_md5 = self._paths(pair_md5s, row_paths)
+        old_groups = self.dbm.get_groups_with_paths(
+            self.group_kind, [p for paths in paths_by_md5.values() for p in paths]
+        )
+        md5_by_path = self.dbm.get_md5_by_path(p for members in old_groups.values() for p in members)
+        md5_by_path.update((p, md5) for md5, paths in row_paths.items() for p in paths)
+
+        nodes: Dict[str, int] = {md5: i for i, md5 in enumerate(sorted(pair_md5s))}
+
+        def node(md5: str) -> int:
+            if md5 not in nodes:
+                nodes[md5] = len(nodes)
+            return nodes[md5]
+
+        initial = []
+        for members in old_groups.values():
+            group = sorted({node(md5_by_path[p]) for p in members if p in md5_by_path})
+            if len(group) > 1:
+                initial.append(group)
+        pairs = [(nodes[a], nodes[b], d) for a, b, d in new_pairs]
+
+        md5_of = sorted(nodes, key=nodes.get)
+        distance = None
+        if self.max_group_distance is not None:
+            hexes = self.dbm.load_hashes(self.algorithm, self.detector.hash_size, md5s=md5_of)
+            values = [int(hexes[md5], 16) if md5 in hexes else None for md5 in md5_of]
+
+            def distance(i: int, j: int) -> int:
+                if values[i] is None or values[j] is None:
+                    return self.bits
+                return (values[i] ^ values[j]).bit_count()
+
+        groups = cluster_pairs(len(nodes), pairs, self.max_group_distance, distance, initial=initial)
+
+        paths_by_md5.update(self._paths(set(md5_of) - pair_md5s, row_paths))
+        new_groups = []
+        for members in groups:
+            paths = sorted({p for idx in members for p in paths_by_md5.get(md5_of[idx], [])})
+            if len(paths) > 1:
+                new_groups.append(paths)
+        unchanged = {tuple(paths) for paths in old_groups.values()}
+        changed = [paths for paths in new_groups if tuple(paths) not in unchanged]
+        kept = {tuple(paths) for paths in new_groups}
+        stale = [gid for gid, paths in old_groups.items() if tuple(paths) not in kept]
+        self.dbm.replace_groups(self.group_kind, stale, changed)
+        return changed, len(stale)
+
+    def _paths(self, md5s, row_paths: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """md5 -> caminhos no banco, mais os das linhas recebidas."""
+        paths = self.dbm.get_paths_by_md5(md5s)
+        for md5 in md5s:
+            extra = [p for p in row_paths.get(md5, []) if p not in paths.get(md5, [])]
+            if extra:
+                paths[md5] = sorted(paths.get(md5, []) + extra)
+        return paths
@@ -3,10 +3,15 @@ from typing import Dict, Any, List
 from datetime import datetime
 from src.utils.logger import get_logger
 from src.core.metadata_reader import MetadataReader
+from src.core.metadata_cache import get_metadata_cache
 
 
 logger = get_logger()
 
+# grupos até este tamanho são lidos em série: abrir um pool por grupo de 2-3
+# arquivos custa mais do que as próprias leituras
+SERIAL_GROUP_SIZE = 4
+
 
 def _to_datetime(value):
     if value is None:
@@ -60,19 +65,24 @@ def choose_keeper(existing: Dict[str, Any], new: Dict[str, Any], policy: str = "
     return "existing"
 
 
-def choose_keeper_among(paths: List[Path], policy: str = "highest_resolution") -> Path:
+def choose_keeper_among(paths: List[Path], policy: str = "highest_resolution", workers: int = 0) -> Path:
     """Escolhe o melhor arquivo dentre uma lista de `paths` segundo a `policy`.
 
+    Grupos de até `SERIAL_GROUP_SIZE` arquivos são lidos em série; os maiores
+    em paralelo (`workers` threads, 0 = automático, nunca mais que o grupo).
     Retorna o Path do arquivo a ser mantido.
     """
-    reader = MetadataReader()
+    reader = MetadataReader(cache=get_metadata_cache())
     best = None
     best_meta = None
 
-    for p in paths:
-        try:
-            meta = reader.read_metadata(p)
-        except Exception:
+    if len(paths) <= SERIAL_GROUP_SIZE:
+        results = _read_serial(reader, paths)
+    else:
+        results = reader.read_many(paths, workers=workers, ordered=True)
+
+    for p, meta in results:
+        if "error" in meta:
             continue
         if best is None:
             best = Path(p)
@@ -85,3 +95,17 @@ def choose_keeper_among(paths: List[Path], policy: str = "highest_resolution") -
             best_meta = meta
 
     return best
+
+
+def _read_serial(reader: MetadataReader, paths: List[Path]):
+    """Como `read_many(ordered=True)`, sem pool de threads."""
+    try:
+        for p in paths:
+            try:
+                yield Path(p), reader.read_metadata(Path(p))
+            except Exception as e:
+                logger.warning(f"Erro ao ler metadados de {p}: {e}")
+                yield Path(p), {"error": str(e)}
+    finally:
+        if reader.cache is not None:
+            reader.cache.flush()
@@ -0,0 +1,72 @@
+"""Cache de distâncias entre pares para ajuste instantâneo do limiar.
+
+Todos os pares com distância <= `ceiling` ficam na tabela `similar_pairs`
+(md5_a, md5_b, distância). Reagrupar com qualquer limiar <= ceiling, ou
+montar o histograma de distâncias, é só uma consulta SQL + union-find,
+sem decodificar nem hashear nada.
+"""
+from typing import Dict, List, Optional
+
+from src.database.db_manager import DBManager
+from src.database.hash_store import HashStore
+from src.detection.clustering import UnionFind
+from src.utils.logger import get_logger
+
+
+class PairDistanceCache:
+    """Consulta e reconstrói o cache de pares.
+
+    Args:
+        dbm: Banco com as tabelas `similar_pairs`, `perceptual_hashes` e `images`
+        ceiling: Maior distância guardada no cache
+    """
+
+    def __init__(self, dbm: DBManager, ceiling: int = 20):
+        self.logger = get_logger()
+        self.dbm = dbm
+        self.ceiling = ceiling
+
+    def regroup(self, threshold: int) -> Dict[str, List[str]]:
+        """Grupos (representante -> caminhos) para um limiar <= ceiling."""
+        if threshold > self.ceiling:
+            raise ValueError(f"Limiar {threshold} acima do teto do cache ({self.ceiling})")
+        nodes: Dict[str, int] = {}
+        uf = UnionFind()
+        for a, b, _ in self.dbm.get_pairs(threshold):
+            for md5 in (a, b):
+                if md5 not in nodes:
+                    nodes[md5] = uf.add()
+            uf.union(nodes[a], nodes[b])
+
+        md5_of = {idx: md5 for md5, idx in nodes.items()}
+        paths_by_md5 = self.dbm.get_paths_by_md5(nodes)
+        groups = {}
+        for members in uf.components().values():
+            paths = sorted(p for idx in members for p in paths_by_md5.get(md5_of[idx], []))
+            if len(paths) > 1:
+                groups[paths[0]] = paths
+        return dict(sorted(groups.items()))
+
+    def histogram(self) -> Dict[int, int]:
+        """Distância -> quantidade de pares no cache."""
+        return self.dbm.pair_histogram()
+
+    def rebuild(self, hash_size: int = 16, algorithm: str = "phash") -> int:
+        """Recalcula o cache inteiro a partir dos hashes persistidos. Retorna o nº de pares."""
+        store = HashStore.for_db(self.dbm, algorithm, hash_size)
+        pairs = []
+        for i, j, dist in store.pairs(self.ceiling):
+            pairs += zip(store.md5_many(i), store.md5_many(j), dist.tolist())
+        self.dbm.clear_pairs()
+        self.dbm.save_pairs(pairs)
+        self.logger.info(f"Cache de pares reconstruído: {len(pairs)} pares até distância {self.ceiling}")
+        return len(pairs)
+
+    @staticmethod
+    def summary(groups: Dict[str, List[str]], threshold: int, histogram: Optional[Dict[int, int]] = None) -> Dict:
+        return {
+            "threshold": threshold,
+            "groups": len(groups),
+            "images_in_groups": sum(len(g) for g in groups.values()),
+            "histogram": histogram or {},
+        }
@@ -0,0 +1,161 @@
+"""Cálculo de pHash em paralelo com um pool de processos.
+
+O GIL serializa decodificação e DCT no laço original. Aqui cada lote passa
+por duas etapas no mesmo pool de processos:
+
+1. decodificação: cada worker abre um arquivo, reduz para o raster em tons
+   de cinza e escreve os pixels direto em um slot de `SharedMemory`;
+2. hash: workers leem os slots da memória compartilhada e calculam a DCT.
+
+Somente caminhos, índices de slot e os hashes (ints) atravessam o pickling;
+os pixels nunca são copiados entre processos.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.perceptual_hash import canonical_phash_from_pixels, load_grayscale, phash_from_pixels
+from src.utils.logger import get_logger
+
+
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_pixels: Optional[np.ndarray] = None
+
+
+def _attach_shared(name: str, slots: int, img_size: int) -> None:
+    """Initializer do pool: anexa o bloco de memória compartilhada."""
+    global _worker_shm, _worker_pixels
+    # o resource tracker é herdado do processo pai, que é o dono do bloco
+    # e o único que chama unlink()
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_pixels = np.ndarray((slots, img_size, img_size), dtype=np.uint8, buffer=_worker_shm.buf)
+
+
+def _decode_into_slot(slot: int, path: str, preview_min_size: Optional[int]) -> Tuple[int, bool, int, float]:
+    start = time.perf_counter()
+    try:
+        img_size = _worker_pixels.shape[1]
+        _worker_pixels[slot] = load_grayscale(Path(path), img_size, preview_min_size=preview_min_size)
+        ok = True
+    except Exception:
+        ok = False
+    return slot, ok, os.getpid(), time.perf_counter() - start
+
+
+def _hash_slots(slots: List[int], hash_size: int, canonical: bool) -> Tuple[List[Tuple[int, int]], int, float]:
+    start = time.perf_counter()
+    fn = canonical_phash_from_pixels if canonical else phash_from_pixels
+    hashes = [(slot, fn(_worker_pixels[slot], hash_size)) for slot in slots]
+    return hashes, os.getpid(), time.perf_counter() - start
+
+
+class ParallelPhashHasher:
+    """Calcula pHash de muitos arquivos usando todos os núcleos.
+
+    Args:
+        hash_size: Lado do hash (bits = hash_size²)
+        workers: Número de processos (0 = os.cpu_count())
+        batch_size: Imagens por lote (slots na memória compartilhada)
+        preview_min_size: Usa previews embutidos com pelo menos esse lado
+        orientation_invariant: Calcula o pHash canônico das 8 orientações
+        raster_size: Lado do raster decodificado (padrão hash_size * 4); um
+            raster maior pode ser guardado no `FeatureCache`
+    """
+
+    def __init__(self, hash_size: int = 16, workers: int = 0, batch_size: int = 256,
+                 preview_min_size: Optional[int] = None, orientation_invariant: bool = False,
+                 raster_size: Optional[int] = None):
+        self.logger = get_logger()
+        self.hash_size = hash_size
+        self.preview_min_size = preview_min_size
+        self.orientation_invariant = orientation_invariant
+        self.raster_size = raster_size or hash_size * 4
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self.stats: Dict[int, Dict[str, float]] = {}
+        self._pixels: Optional[np.ndarray] = None
+        self._on_raster: Optional[Callable[[str, np.ndarray], None]] = None
+
+    def hash_paths(
+        self,
+        paths: List[Path],
+        on_raster: Optional[Callable[[str, np.ndarray], None]] = None,
+    ) -> Dict[str, int]:
+        """Retorna caminho -> pHash (int). Arquivos ilegíveis são ignorados.
+
+        `on_raster(caminho, pixels)` recebe uma cópia de cada raster decodificado.
+        """
+        self.stats = {}
+        if not paths:
+            return {}
+        img_size = self.raster_size
+        slots = min(self.batch_size, len(paths))
+        shm = shared_memory.SharedMemory(create=True, size=slots * img_size * img_size)
+        self._pixels = np.ndarray((slots, img_size, img_size), dtype=np.uint8, buffer=shm.buf)
+        self._on_raster = on_raster
+        results: Dict[str, int] = {}
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_attach_shared,
+                initargs=(shm.name, slots, img_size),
+            ) as pool:
+                for offset in range(0, len(paths), slots):
+                    batch = [str(p) for p in paths[offset:offset + slots]]
+                    results.update(self._run_batch(pool, batch))
+        finally:
+            # a view precisa ser liberada antes de fechar o bloco
+            self._pixels = None
+            shm.close()
+            shm.unlink()
+        self._log_throughput(len(results), time.perf_counter() - started)
+        return results
+
+    def _run_batch(self, pool: ProcessPoolExecutor, batch: List[str]) -> Dict[str, int]:
+        decoded = []
+        for slot, ok, pid, elapsed in pool.map(
+            _decode_into_slot, range(len(batch)), batch, [self.preview_min_size] * len(batch)
+        ):
+            self._record(pid, "decoded", elapsed)
+            if ok:
+                decoded.append(slot)
+                if self._on_raster is not None:
+                    self._on_raster(batch[slot], self._pixels[slot].copy())
+            else:
+                self.logger.debug(f"Erro ao decodificar {batch[slot]}")
+
+        chunk = max(1, len(decoded) // self.workers + 1)
+        chunks = [decoded[i:i + chunk] for i in range(0, len(decoded), chunk)]
+        futures = [pool.submit(_hash_slots, c, self.hash_size, self.orientation_invariant) for c in chunks]
+        out = {}
+        for fut in futures:
+            hashes, pid, elapsed = fut.result()
+            self._record(pid, "hashed", elapsed, len(hashes))
+            for slot, value in hashes:
+                out[batch[slot]] = value
+        return out
+
+    def _record(self, pid: int, kind: str, elapsed: float, count: int = 1) -> None:
+        st = self.stats.setdefault(pid, {"decoded": 0, "hashed": 0, "seconds": 0.0})
+        st[kind] += count
+        st["seconds"] += elapsed
+
+    def _log_throughput(self, total: int, elapsed: float) -> None:
+        rate = total / elapsed if elapsed > 0 else 0.0
+        self.logger.info(
+            f"pHash paralelo: {total} imagens em {elapsed:.1f}s ({rate:.1f} img/s, {self.workers} workers)"
+        )
+        for pid, st in sorted(self.stats.items()):
+            busy = st["seconds"]
+            per_s = st["decoded"] / busy if busy > 0 else 0.0
+            st["images_per_second"] = round(per_s, 1)
+            self.logger.info(
+                f"  worker {pid}: {int(st['decoded'])} decodificadas, {int(st['hashed'])} hashes, "
+                f"{busy:.1f}s ocupado ({per_s:.1f} img/s)"
+            )
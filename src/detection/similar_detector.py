@@ -1,39 +1,228 @@
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Tuple
 from PIL import Image
 import imagehash
+from src.core.feature_cache import FeatureCache
+from src.core.perceptual_hash import HASH_FUNCTIONS, canonical_phash_bits, load_grayscale
+from src.core.preview_extractor import PreviewExtractor
 from src.utils.logger import get_logger
+from src.detection.hash_index import HammingIndex, hamming_distance, hash_to_int
+from src.detection.clustering import cluster_pairs
+from src.detection.parallel_hasher import ParallelPhashHasher
 
 
 class SimilarDuplicateDetector:
     """Detecta duplicatas visuais usando hashes perceptuais (phash).
 
-    Método simples: calcula `imagehash.phash` para cada imagem e agrupa
-    imagens cuja distância de Hamming seja menor ou igual a um limite.
+    Calcula `imagehash.phash` para cada imagem e agrupa imagens cuja
+    distância de Hamming seja menor ou igual a um limite. O agrupamento pode
+    ser guloso (`greedy`, comportamento original) ou por union-find
+    (`union_find`), que é transitivo e não depende da ordem de entrada.
+
+    Com `workers` diferente de 1 os hashes são calculados em um pool de
+    processos (`ParallelPhashHasher`; 0 = todos os núcleos). Com
+    `preview_min_size`, previews embutidos (miniatura EXIF, preview JPEG de
+    RAW) grandes o bastante são hasheados no lugar do arquivo completo.
+    Com `orientation_invariant`, o hash é o mínimo das 8 orientações
+    (rotações de 90° e espelhamentos), derivadas de uma única decodificação.
+    Com `feature_cache`, o raster reduzido de cada conteúdo fica guardado em
+    disco e os hashes são recalculados dele sem abrir o arquivo de novo.
     """
 
-    def __init__(self, hash_size: int = 16):
+    METHODS = ("greedy", "union_find")
+
+    def __init__(self, hash_size: int = 16, workers: int = 1, batch_size: int = 256,
+                 preview_min_size: Optional[int] = None, orientation_invariant: bool = False,
+                 feature_cache: Optional[FeatureCache] = None):
         self.logger = get_logger()
         self.hash_size = hash_size
+        self.workers = workers
+        self.batch_size = batch_size
+        self.preview_min_size = preview_min_size
+        self.orientation_invariant = orientation_invariant
+        self.feature_cache = feature_cache
+
+    @property
+    def hash_function(self) -> str:
+        """Função de hash aplicada ao raster (chave de `HASH_FUNCTIONS`)."""
+        return "phash_rot" if self.orientation_invariant else "phash"
+
+    @property
+    def algorithm(self) -> str:
+        """Nome do hash produzido (usado para persistir hashes sem misturá-los).
+
+        Inclui o modo de preview: hashes de previews embutidos e de
+        decodificações completas do mesmo conteúdo diferem.
+        """
+        if self.preview_min_size:
+            return f"{self.hash_function}_preview{self.preview_min_size}"
+        return self.hash_function
 
     def compute_hash(self, path: Path) -> imagehash.ImageHash:
         try:
+            if self.orientation_invariant:
+                pixels = load_grayscale(Path(path), self.hash_size * 4, preview_min_size=self.preview_min_size)
+                return imagehash.ImageHash(canonical_phash_bits(pixels, self.hash_size))
+            if self.preview_min_size:
+                preview = PreviewExtractor.extract(Path(path), self.preview_min_size)
+                if preview is not None:
+                    return imagehash.phash(preview, hash_size=self.hash_size)
             with Image.open(path) as im:
                 return imagehash.phash(im, hash_size=self.hash_size)
         except Exception as e:
             self.logger.debug(f"Erro ao calcular hash de {path}: {e}")
             raise
 
-    def group_similar(self, paths: List[Path], max_distance: int = 5) -> Dict[str, List[str]]:
-        """Agrupa imagens similares. Retorna dict: representative_hash -> [paths]."""
+    def compute_hashes(self, paths: List[Path], keys: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """Calcula o phash (int) de cada caminho, ignorando arquivos ilegíveis.
+
+        Args:
+            paths: Imagens a hashear
+            keys: caminho -> hash do conteúdo (md5); com `feature_cache`,
+                habilita o reaproveitamento dos rasters guardados
+        """
+        cache = self.feature_cache
+        if cache is not None and keys and cache.supports(self.hash_size):
+            return self._compute_with_cache(paths, keys)
+        if self.workers != 1 and len(paths) > 1:
+            hasher = ParallelPhashHasher(
+                self.hash_size, self.workers, self.batch_size, self.preview_min_size, self.orientation_invariant
+            )
+            return hasher.hash_paths(paths)
         hashes = {}
         for p in paths:
             try:
-                h = self.compute_hash(p)
-                hashes[str(p)] = h
+                hashes[str(p)] = hash_to_int(self.compute_hash(p))
             except Exception:
                 continue
+        return hashes
+
+    def _compute_with_cache(self, paths: List[Path], keys: Dict[str, str]) -> Dict[str, int]:
+        cache = self.feature_cache
+        fn = HASH_FUNCTIONS[self.hash_function]
+        # rasters de preview e de decodificação completa não se misturam
+        keys = {p: FeatureCache.content_key(md5, self.preview_min_size) for p, md5 in keys.items() if md5}
+        cached = cache.get_many(keys[str(p)] for p in paths if str(p) in keys)
+        hashes: Dict[str, int] = {}
+        missing = []
+        for p in paths:
+            key = keys.get(str(p))
+            if key in cached:
+                hashes[str(p)] = fn(cached[key], self.hash_size)
+            else:
+                missing.append(p)
+
+        fresh = {}
+
+        def keep(path: str, pixels) -> None:
+            if keys.get(path):
+                fresh[keys[path]] = pixels
+
+        if self.workers != 1 and len(missing) > 1:
+            hasher = ParallelPhashHasher(
+                self.hash_size, self.workers, self.batch_size, self.preview_min_size,
+                self.orientation_invariant, raster_size=cache.size,
+            )
+            hashes.update(hasher.hash_paths(missing, on_raster=keep))
+        else:
+            for p in missing:
+                try:
+                    pixels = load_grayscale(Path(p), cache.size, preview_min_size=self.preview_min_size)
+                except Exception as e:
+                    self.logger.debug(f"Erro ao calcular hash de {p}: {e}")
+                    continue
+                keep(str(p), pixels)
+                hashes[str(p)] = fn(pixels, self.hash_size)
+        cache.put_many(fresh)
+        self.logger.debug(f"Cache de rasters: {len(paths) - len(missing)} reaproveitados, {len(fresh)} novos")
+        return hashes
+
+    def group_similar(
+        self,
+        paths: List[Path],
+        max_distance: int = 5,
+        method: str = "greedy",
+        max_group_distance: Optional[int] = None,
+        keys: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, List[str]]:
+        """Agrupa imagens similares. Retorna dict: representative -> [paths].
+
+        Args:
+            paths: Imagens a comparar
+            max_distance: Distância máxima para ligar duas imagens
+            method: "greedy" ou "union_find"
+            max_group_distance: Teto de ligação completa (apenas union_find);
+                nenhum par dentro de um grupo fica acima desse valor
+            keys: caminho -> md5, para usar o `feature_cache`
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Método de agrupamento inválido: {method}")
+        hashes = self.compute_hashes(paths, keys)
+        if method == "union_find":
+            return self.cluster_hashes(hashes, max_distance, max_group_distance)
+        return self._group_greedy(hashes, max_distance)
 
+    def cluster_hashes(
+        self,
+        hashes: Dict[str, object],
+        max_distance: int,
+        max_group_distance: Optional[int] = None,
+    ) -> Dict[str, List[str]]:
+        """Agrupa hashes já calculados por componentes conexos (union-find).
+
+        Os pares candidatos vêm de um `HammingIndex`, evitando a comparação
+        de todos contra todos. O resultado não depende da ordem de `hashes`.
+        """
+        keys = sorted(hashes)
+        if not keys:
+            return {}
+        values = [hash_to_int(hashes[k]) for k in keys]
+        bits = self.hash_size * self.hash_size
+        radius = max_distance if max_group_distance is None else min(max_distance, max_group_distance)
+        index = HammingIndex(bits, radius)
+        for k, v in zip(keys, values):
+            index.add(k, v)
+
+        clusters = cluster_pairs(
+            len(keys),
+            index.pairs(radius),
+            max_group_distance=max_group_distance,
+            distance=lambda i, j: hamming_distance(values[i], values[j]),
+        )
+        return {keys[c[0]]: [keys[i] for i in c] for c in clusters}
+
+    def group_candidates(
+        self,
+        paths: Sequence[str],
+        candidates: Sequence[Tuple[int, int]],
+        max_distance: int,
+        max_group_distance: Optional[int] = None,
+        keys: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, List[str]]:
+        """Agrupa apenas pares candidatos (i, j) sobre `paths` (ex.: do bloqueio).
+
+        Só imagens que aparecem em algum candidato têm o hash calculado.
+        """
+        involved = sorted({i for pair in candidates for i in pair})
+        hashes = self.compute_hashes([Path(paths[i]) for i in involved], keys)
+        values = {i: hashes[str(paths[i])] for i in involved if str(paths[i]) in hashes}
+
+        confirmed = []
+        for i, j in candidates:
+            if i in values and j in values:
+                dist = hamming_distance(values[i], values[j])
+                if dist <= max_distance:
+                    confirmed.append((i, j, dist))
+
+        clusters = cluster_pairs(
+            len(paths),
+            confirmed,
+            max_group_distance=max_group_distance,
+            distance=lambda i, j: hamming_distance(values[i], values[j]),
+        )
+        return {str(paths[c[0]]): [str(paths[i]) for i in c] for c in clusters}
+
+    def _group_greedy(self, hashes: Dict[str, int], max_distance: int) -> Dict[str, List[str]]:
         visited = set()
         groups = {}
 
@@ -47,11 +236,7 @@ class SimilarDuplicateDetector:
                 p_j, h_j = items[j]
                 if p_j in visited:
                     continue
-                try:
-                    dist = h_i - h_j
-                except Exception:
-                    continue
-                if dist <= max_distance:
+                if hamming_distance(h_i, h_j) <= max_distance:
                     group.append(p_j)
                     visited.add(p_j)
 
@@ -59,3 +244,19 @@ class SimilarDuplicateDetector:
                 groups[p_i] = group
 
         return groups
+
+
+def build_similar_detector(cfg, feature_cache: Optional[FeatureCache] = None) -> SimilarDuplicateDetector:
+    """Detector configurado pelas seções `duplicates`/`performance` do config.
+
+    O `feature_cache` (ver `FeatureCache.from_config`) é aberto e fechado
+    por quem chama, para ser compartilhado entre os detectores de uma execução.
+    """
+    dup = cfg.duplicates
+    return SimilarDuplicateDetector(
+        workers=cfg.performance.max_threads,
+        batch_size=cfg.performance.batch_size,
+        preview_min_size=dup.preview_min_size if dup.use_embedded_previews else None,
+        orientation_invariant=dup.orientation_invariant,
+        feature_cache=feature_cache,
+    )
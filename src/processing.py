@@ -11,6 +11,7 @@ from src.utils.config import get_config
 from src.utils.logger import get_logger
 from src.core.file_scanner import FileScanner
 from src.core.metadata_reader import MetadataReader
+from src.core.metadata_cache import get_metadata_cache
 from src.core.hash_calculator import HashCalculator
 from src.organization.folder_organizer import FolderOrganizer
 from src.organization.file_mover import FileMover
@@ -63,30 +64,25 @@ def _process_photos(input_path, output_path, structure, operation,
         total_files = len(files)
         result["files_processed"] = total_files
         _update_progress(app_state, "metadata", 0, total_files, "Lendo metadados...")
-        reader = MetadataReader()
+        reader = MetadataReader(cache=get_metadata_cache())
         hash_calc = HashCalculator()
         photos_data = []
-        for i, file_path in enumerate(files):
-            metadata = reader.read_metadata(file_path)
-            md5_hash = hash_calc.calculate_md5(file_path)
-            photos_data.append({
-                "path": file_path,
-                "datetime": metadata.get("datetime"),
-                "md5": md5_hash,
-                "metadata": metadata,
-            })
+        records = reader.read_records(files, workers=config.performance.max_threads, ordered=True)
+        for i, record in enumerate(records):
+            record.md5 = hash_calc.calculate_md5(record.path)
+            photos_data.append(record)
             _update_progress(app_state, "metadata", i + 1, total_files,
-                           f"Processando {file_path.name}")
+                           f"Processando {record.path.name}")
         if detect_exact:
             _update_progress(app_state, "duplicates_exact", 0, 100,
                            "Detectando duplicatas exatas...")
             db_manager = DBManager()
             exact_detector = ExactDuplicateDetector(db_manager)
-            duplicates_exact = []
+            duplicates_exact = set()
             for photo in photos_data:
-                existing = db_manager.get_by_md5(photo["md5"])
+                existing = db_manager.get_by_md5(photo.md5)
                 if existing:
-                    duplicates_exact.append(photo["path"])
+                    duplicates_exact.add(photo.file_path)
             result["duplicates_exact"] = len(duplicates_exact)
         _update_progress(app_state, "organize", 0, total_files, "Organizando arquivos...")
         organizer = FolderOrganizer(config, base_output_path=output_path)
@@ -96,20 +92,20 @@ def _process_photos(input_path, output_path, structure, operation,
         organized_count = 0
         error_count = 0
         for i, photo in enumerate(photos_data):
-            if detect_exact and photo["path"] in duplicates_exact:
+            if detect_exact and photo.file_path in duplicates_exact:
                 continue
-            target_folder = organizer.get_target_folder(photo["datetime"])
+            target_folder = organizer.get_target_folder(photo.datetime)
             success, msg, new_path = mover.process_file(
-                photo["path"],
+                photo.path,
                 target_folder
             )
             if success:
                 organized_count += 1
             else:
                 error_count += 1
-                logger.error(f"Erro ao processar {photo['path'].name}: {msg}")
+                logger.error(f"Erro ao processar {photo.path.name}: {msg}")
             _update_progress(app_state, "organize", i + 1, total_files,
-                           f"Processando {photo['path'].name}")
+                           f"Processando {photo.path.name}")
         if detect_similar:
             _update_progress(app_state, "duplicates_similar", 0, 100,
                            "Detectando duplicatas similares...")
@@ -12,7 +12,12 @@ from src.utils.config import get_config
 from src.utils.logger import get_logger
 from src.core.file_scanner import FileScanner
 from src.core.metadata_reader import MetadataReader
+from src.core.metadata_cache import get_metadata_cache
 from src.organization.folder_organizer import FolderOrganizer
+from src.database.db_manager import DBManager
+from src.database.hash_store import HashStore
+from src.detection.pair_cache import PairDistanceCache
+from src.detection.similar_detector import build_similar_detector
 from src.processing import _process_photos
 
 
@@ -117,10 +122,12 @@ def register_api_routes(app):
                     "files_found": 0,
                     "message": "Nenhuma imagem encontrada na pasta",
                 })
-            reader = MetadataReader()
+            reader = MetadataReader(cache=get_metadata_cache())
             photos_with_dates = []
-            for file_path in files:
-                metadata = reader.read_metadata(file_path)
+            # só a data é necessária para o preview das pastas
+            for file_path, metadata in reader.read_many(
+                files, workers=config.performance.max_threads, fields={"datetime"}
+            ):
                 photo_date = metadata.get("datetime")
                 photos_with_dates.append((file_path, photo_date))
             preview = organizer.get_organization_preview(photos_with_dates)
@@ -167,6 +174,153 @@ def register_api_routes(app):
         except Exception as e:
             return jsonify({"success": False, "error": str(e)}), 500
 
+    @app.route("/api/images", methods=["GET"])
+    def list_images():
+        try:
+            args = request.args
+            duplicate = args.get("duplicate")
+            if duplicate is not None:
+                duplicate = duplicate.lower() in ("1", "true", "yes", "sim")
+            dbm = DBManager()
+            try:
+                dbm.init_tables()
+                images, next_cursor = dbm.query_images(
+                    limit=args.get("limit", 100, type=int),
+                    cursor=args.get("cursor"),
+                    sort=args.get("sort", "id"),
+                    descending=args.get("order", "asc").lower() == "desc",
+                    date_from=args.get("date_from"),
+                    date_to=args.get("date_to"),
+                    camera_make=args.get("camera_make"),
+                    camera_model=args.get("camera_model"),
+                    format=args.get("format"),
+                    folder=args.get("folder"),
+                    duplicate=duplicate,
+                    duplicate_kind=args.get("duplicate_kind"),
+                )
+            finally:
+                dbm.close()
+            return jsonify({
+                "success": True,
+                "count": len(images),
+                "images": images,
+                "next_cursor": next_cursor,
+            })
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+
+    @app.route("/api/similar/regroup", methods=["GET"])
+    def regroup_similar():
+        try:
+            config = get_config()
+            ceiling = config.duplicates.pair_cache_ceiling
+            if ceiling is None:
+                return jsonify({"success": False, "error": "Cache de pares desativado"}), 400
+            threshold = request.args.get("threshold", config.duplicates.similarity_threshold, type=int)
+            if threshold is None or threshold < 0 or threshold > ceiling:
+                return jsonify({
+                    "success": False,
+                    "error": f"Limiar deve estar entre 0 e {ceiling}",
+                }), 400
+            dbm = DBManager()
+            try:
+                dbm.init_tables()
+                cache = PairDistanceCache(dbm, ceiling)
+                groups = cache.regroup(threshold)
+                summary = PairDistanceCache.summary(groups, threshold, cache.histogram())
+            finally:
+                dbm.close()
+            return jsonify({"success": True, **summary, "group_members": list(groups.values())})
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+
+    @app.route("/api/similar/histogram", methods=["GET"])
+    def similar_histogram():
+        try:
+            dbm = DBManager()
+            try:
+                dbm.init_tables()
+                histogram = dbm.pair_histogram()
+            finally:
+                dbm.close()
+            return jsonify({"success": True, "histogram": histogram})
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+
+    @app.route("/api/similar/near", methods=["GET"])
+    def similar_near():
+        try:
+            md5 = (request.args.get("md5") or "").lower()
+            max_distance = request.args.get("max_distance", 10, type=int)
+            limit = request.args.get("limit", 50, type=int)
+            if len(md5) != 32 or max_distance is None or max_distance < 0:
+                return jsonify({
+                    "success": False,
+                    "error": "Parâmetros obrigatórios: md5 e max_distance >= 0",
+                }), 400
+            dbm = DBManager()
+            try:
+                dbm.init_tables()
+                # mesmo algoritmo e tamanho de hash que a etapa de similares grava
+                detector = build_similar_detector(get_config())
+                store = HashStore.for_db(dbm, detector.algorithm, detector.hash_size)
+                i = store.find(md5)
+                if i is None:
+                    return jsonify({"success": False, "error": "Hash não encontrado para este md5"}), 404
+                matches = store.nearest(store.value(i), max_distance, limit, exclude=md5)
+                paths = dbm.get_paths_by_md5(m for m, _ in matches)
+            finally:
+                dbm.close()
+            similar = [{"md5": m, "distance": d, "paths": paths.get(m, [])} for m, d in matches]
+            return jsonify({"success": True, "count": len(similar), "similar": similar})
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+
+    @app.route("/api/geo/bbox", methods=["GET"])
+    def images_in_bbox():
+        try:
+            args = request.args
+            bounds = [args.get(k, type=float) for k in ("min_lat", "min_lon", "max_lat", "max_lon")]
+            if any(v is None for v in bounds):
+                return jsonify({
+                    "success": False,
+                    "error": "Parâmetros obrigatórios: min_lat, min_lon, max_lat, max_lon",
+                }), 400
+            limit = args.get("limit", 1000, type=int)
+            dbm = DBManager()
+            try:
+                dbm.init_tables()
+                images = dbm.images_in_bbox(*bounds, limit=limit)
+            finally:
+                dbm.close()
+            return jsonify({"success": True, "count": len(images), "images": images})
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+
+    @app.route("/api/geo/near", methods=["GET"])
+    def images_near():
+        try:
+            args = request.args
+            lat, lon = args.get("lat", type=float), args.get("lon", type=float)
+            radius_km = args.get("radius_km", 1.0, type=float)
+            if lat is None or lon is None or radius_km is None or radius_km < 0:
+                return jsonify({
+                    "success": False,
+                    "error": "Parâmetros obrigatórios: lat, lon e radius_km >= 0",
+                }), 400
+            limit = args.get("limit", 1000, type=int)
+            dbm = DBManager()
+            try:
+                dbm.init_tables()
+                images = dbm.images_within_radius(lat, lon, radius_km, limit=limit)
+            finally:
+                dbm.close()
+            return jsonify({"success": True, "count": len(images), "images": images})
+        except Exception as e:
+            return jsonify({"success": False, "error": str(e)}), 500
+
     @app.route("/api/progress", methods=["GET"])
     def get_progress():
         from flask import current_app
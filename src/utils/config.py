@@ -114,7 +114,26 @@ class Config:
             detect_exact=dup_config.get("detect_exact", True),
             detect_similar=dup_config.get("detect_similar", False),
             similarity_threshold=dup_config.get("similarity_threshold", 10),
-            keep_policy=dup_config.get("keep_policy", "highest_resolution")
+            keep_policy=dup_config.get("keep_policy", "highest_resolution"),
+            clustering=dup_config.get("clustering", "union_find"),
+            incremental=dup_config.get("incremental", False),
+            pair_cache_ceiling=dup_config.get("pair_cache_ceiling", 20),
+            max_group_distance=dup_config.get("max_group_distance"),
+            cascade=dup_config.get("cascade", False),
+            prefilter_hash=dup_config.get("prefilter_hash", "dhash"),
+            prefilter_threshold=dup_config.get("prefilter_threshold", 12),
+            whash_threshold=dup_config.get("whash_threshold"),
+            orientation_invariant=dup_config.get("orientation_invariant", False),
+            feature_cache=dup_config.get("feature_cache", True),
+            use_embedded_previews=dup_config.get("use_embedded_previews", True),
+            preview_min_size=dup_config.get("preview_min_size", 160),
+            blocking=dup_config.get("blocking", False),
+            blocking_time_window=dup_config.get("blocking_time_window", 60),
+            blocking_aspect_tolerance=dup_config.get("blocking_aspect_tolerance", 0.02),
+            blocking_use_camera=dup_config.get("blocking_use_camera", True),
+            detect_bursts=dup_config.get("detect_bursts", False),
+            burst_max_gap=dup_config.get("burst_max_gap", 2.0),
+            burst_confirm_phash=dup_config.get("burst_confirm_phash", True)
         )
         
         # Segurança
@@ -131,7 +150,11 @@ class Config:
         self.performance = PerformanceConfig(
             max_threads=perf_config.get("max_threads", 0),
             cache_size_mb=perf_config.get("cache_size_mb", 500),
-            batch_size=perf_config.get("batch_size", 100)
+            batch_size=perf_config.get("batch_size", 100),
+            metadata_cache=perf_config.get("metadata_cache", True),
+            metadata_cache_lru=perf_config.get("metadata_cache_lru", 4096),
+            sqlite_cache_mb=perf_config.get("sqlite_cache_mb", 64),
+            sqlite_mmap_mb=perf_config.get("sqlite_mmap_mb", 256)
         )
         
         # Logging
@@ -223,6 +246,21 @@ class Config:
                 f"Opções válidas: {valid_policies}"
             )
         
+        # Validar método de agrupamento de similares
+        valid_clustering = ["greedy", "union_find"]
+        if self.duplicates.clustering not in valid_clustering:
+            errors.append(
+                f"Método de agrupamento inválido: '{self.duplicates.clustering}'. "
+                f"Opções válidas: {valid_clustering}"
+            )
+        
+        valid_prefilters = ["dhash", "ahash"]
+        if self.duplicates.prefilter_hash not in valid_prefilters:
+            errors.append(
+                f"Hash de pré-filtro inválido: '{self.duplicates.prefilter_hash}'. "
+                f"Opções válidas: {valid_prefilters}"
+            )
+        
         # Validar operação de arquivo
         valid_operations = ["copy", "move"]
         if self.safety.file_operation not in valid_operations:
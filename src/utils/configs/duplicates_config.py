@@ -4,6 +4,7 @@ Duplicates Configuration Module.
 Configurações relacionadas à detecção de duplicatas.
 """
 
+from typing import Optional
 from dataclasses import dataclass
 
 
@@ -13,4 +14,23 @@ class DuplicatesConfig:
     detect_exact: bool = True
     detect_similar: bool = False
     similarity_threshold: int = 10
-    keep_policy: str = "highest_resolution"
\ No newline at end of file
+    keep_policy: str = "highest_resolution"
+    clustering: str = "union_find"
+    incremental: bool = False
+    pair_cache_ceiling: Optional[int] = 20
+    max_group_distance: Optional[int] = None
+    cascade: bool = False
+    prefilter_hash: str = "dhash"
+    prefilter_threshold: int = 12
+    whash_threshold: Optional[int] = None
+    orientation_invariant: bool = False
+    feature_cache: bool = True
+    use_embedded_previews: bool = True
+    preview_min_size: int = 160
+    blocking: bool = False
+    blocking_time_window: int = 60
+    blocking_aspect_tolerance: float = 0.02
+    blocking_use_camera: bool = True
+    detect_bursts: bool = False
+    burst_max_gap: float = 2.0
+    burst_confirm_phash: bool = True
\ No newline at end of file
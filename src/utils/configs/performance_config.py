@@ -12,4 +12,8 @@ class PerformanceConfig:
     """Configurações de performance."""
     max_threads: int = 0
     cache_size_mb: int = 500
-    batch_size: int = 100
\ No newline at end of file
+    batch_size: int = 100
+    metadata_cache: bool = True
+    metadata_cache_lru: int = 4096
+    sqlite_cache_mb: int = 64
+    sqlite_mmap_mb: int = 256
\ No newline at end of file
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import time
+
+from src.database.db_manager import DBManager
+
+
+def make_db(tmp_path, rows=2000):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    dbm.conn.executemany(
+        "INSERT INTO images (file_path, md5_hash) VALUES (?, ?)",
+        [(f"/fotos/{i:05d}.jpg", "x" * 32) for i in range(rows)],
+    )
+    dbm.conn.commit()
+    return dbm
+
+
+def test_online_backup_keeps_connection_and_snapshot(tmp_path):
+    dbm = make_db(tmp_path)
+    writer = sqlite3.connect(str(dbm.db_path))
+    steps = []
+
+    def progress(copied, total, rate):
+        steps.append((copied, total))
+        # escrita concorrente durante a cópia não reinicia nem bloqueia o backup
+        writer.execute("INSERT INTO images (file_path) VALUES (?)", (f"/novas/{len(steps)}.jpg",))
+        writer.commit()
+
+    path = dbm.backup(str(tmp_path / "backups"), pages_per_step=10, progress=progress)
+
+    assert path.exists() and not list((tmp_path / "backups").glob("*.part"))
+    assert len(steps) > 1 and steps[-1][0] == steps[-1][1]
+    copy = sqlite3.connect(str(path))
+    assert copy.execute("SELECT COUNT(*) FROM images").fetchone()[0] == 2000
+    assert copy.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    copy.close()
+    # a conexão principal segue utilizável e vê as escritas concorrentes
+    assert dbm.count_images() == 2000 + len(steps)
+    writer.close()
+    dbm.close()
+
+
+def test_backup_prunes_old_backups(tmp_path):
+    dbm = make_db(tmp_path, rows=10)
+    dest = tmp_path / "backups"
+    dest.mkdir()
+    old = dest / "test_backup_20000101_000000.db"
+    recent = dest / "test_backup_20000102_000000.db"
+    other = dest / "outro_backup_20000101_000000.db"
+    for p in (old, recent, other):
+        p.write_bytes(b"")
+    ten_days_ago = time.time() - 10 * 86400
+    os.utime(old, (ten_days_ago, ten_days_ago))
+    os.utime(other, (ten_days_ago, ten_days_ago))
+
+    path = dbm.backup(str(dest), retention_days=7)
+
+    assert path.exists() and recent.exists() and other.exists()
+    assert not old.exists()
+    assert dbm.prune_backups(str(dest), retention_days=0) == []
+    dbm.close()
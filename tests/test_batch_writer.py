@@ -0,0 +1,45 @@
+import sqlite3
+
+from src.database.batch_writer import BatchWriter
+from src.database.db_manager import configure_connection
+
+
+def test_rows_are_written_per_batch(tmp_path):
+    conn = configure_connection(sqlite3.connect(str(tmp_path / "t.db")), cache_mb=8, mmap_mb=8)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.execute("CREATE TABLE t (k TEXT PRIMARY KEY, v INTEGER)")
+    other = sqlite3.connect(str(tmp_path / "t.db"))
+    count = lambda: other.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+    with BatchWriter(conn, batch_size=3) as writer:
+        writer.add("INSERT INTO t VALUES (?, ?)", ("a", 1), key="a", value="/a.jpg")
+        writer.add("INSERT INTO t VALUES (?, ?)", ("b", 2))
+        assert count() == 0 and writer.pending("a") == "/a.jpg" and len(writer) == 2
+        writer.add("UPDATE t SET v = ? WHERE k = ?", (10, "a"))  # fecha o lote, na ordem
+        assert count() == 2 and writer.pending("a") is None
+        writer.add("INSERT INTO t VALUES (?, ?)", ("c", 3))
+    assert count() == 3 and writer.rows_written == 4
+    assert other.execute("SELECT v FROM t WHERE k = 'a'").fetchone()[0] == 10
+    other.close()
+    conn.close()
+
+
+def test_failed_batch_drops_only_the_bad_rows(tmp_path):
+    conn = configure_connection(sqlite3.connect(str(tmp_path / "t.db")), cache_mb=8, mmap_mb=8)
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+    conn.execute("CREATE TABLE t (k TEXT PRIMARY KEY, v INTEGER)")
+    conn.execute("INSERT INTO t VALUES ('a', 0)")
+    conn.commit()
+
+    writer = BatchWriter(conn, batch_size=10)
+    writer.add("INSERT INTO t VALUES (?, ?)", ("a", 1), key="md5-a", value="/a.jpg")  # chave repetida
+    writer.add("INSERT INTO t VALUES (?, ?)", ("b", 2))
+    writer.add("INSERT INTO t VALUES (?, ?)", ("c", 3))
+    assert writer.flush() == 2
+    assert writer.rows_lost == 1 and len(writer) == 0 and writer.pending("md5-a") is None
+
+    # o lote seguinte não carrega a linha ruim
+    writer.add("INSERT INTO t VALUES (?, ?)", ("d", 4))
+    assert writer.flush() == 1 and writer.rows_written == 3
+    assert [r[0] for r in conn.execute("SELECT k FROM t ORDER BY k")] == ["a", "b", "c", "d"]
+    conn.close()
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from src.detection.blocking import CandidateBlocker
+
+
+def row(path, when, camera="EOS R6", size=(6000, 4000)):
+    return {"file_path": path, "width": size[0], "height": size[1], "datetime": when, "camera_model": camera}
+
+
+def test_blocking_keeps_bursts_and_prunes_the_rest():
+    t0 = datetime(2024, 5, 1, 10, 0, 0)
+    rows = [
+        row("burst1.jpg", t0),
+        row("burst2.jpg", t0 + timedelta(seconds=2)),
+        # do outro lado da fronteira da janela: precisa do bloco vizinho
+        row("burst3.jpg", t0 + timedelta(seconds=61)),
+        row("portrait.jpg", (t0 + timedelta(seconds=1)).isoformat(), size=(4000, 6000)),
+        row("other_camera.jpg", t0, camera="iPhone 13"),
+        row("square.jpg", t0, size=(3000, 3000)),
+        row("next_day.jpg", t0 + timedelta(days=1)),
+        row("no_date.jpg", None),
+    ]
+    blocker = CandidateBlocker(time_window=60, aspect_tolerance=0.02)
+    pairs = {(rows[i]["file_path"], rows[j]["file_path"]) for i, j in blocker.candidate_pairs(rows)}
+
+    assert ("burst1.jpg", "burst2.jpg") in pairs
+    assert ("burst2.jpg", "burst3.jpg") in pairs
+    # proporção independe da orientação
+    assert ("burst1.jpg", "portrait.jpg") in pairs
+    assert not any("other_camera.jpg" in p or "square.jpg" in p or "next_day.jpg" in p for p in pairs)
+    assert not any("no_date.jpg" in p for p in pairs)
+
+    stats = blocker.stats
+    assert stats["total_pairs"] == 28
+    assert stats["pruned_pairs"] == stats["total_pairs"] - stats["candidate_pairs"]
+    assert stats["candidate_pairs"] == len(pairs)
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from src.detection.burst_detector import BurstDetector
+from src.database.db_manager import DBManager
+
+
+def test_bursts_split_by_gap_and_camera():
+    t0 = datetime(2024, 7, 14, 18, 30, 0)
+    rows = [
+        {"file_path": "a3.jpg", "datetime": (t0 + timedelta(seconds=1.5)).isoformat(), "camera_model": "X-T4"},
+        {"file_path": "a1.jpg", "datetime": t0.isoformat(), "camera_model": "X-T4"},
+        {"file_path": "a2.jpg", "datetime": (t0 + timedelta(seconds=0.5)).isoformat(), "camera_model": "X-T4"},
+        {"file_path": "late.jpg", "datetime": (t0 + timedelta(seconds=30)).isoformat(), "camera_model": "X-T4"},
+        {"file_path": "phone.jpg", "datetime": (t0 + timedelta(seconds=1)).isoformat(), "camera_model": "Pixel 7"},
+        {"file_path": "nodate.jpg", "datetime": None, "camera_model": "X-T4"},
+    ]
+    sequences = BurstDetector(max_gap=2.0).detect(rows)
+    assert sequences == [["a1.jpg", "a2.jpg", "a3.jpg"]]
+
+    merged = BurstDetector(max_gap=2.0, per_camera=False).detect(rows)
+    assert merged == [["a1.jpg", "a2.jpg", "phone.jpg", "a3.jpg"]]
+
+
+def test_groups_are_persisted_for_keeper_selection(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    dbm.save_groups("burst", [["a1.jpg", "a2.jpg"], ["b1.jpg", "b2.jpg", "b3.jpg"]])
+    dbm.save_groups("similar", [["x.jpg", "y.jpg"]])
+    assert sorted(dbm.get_groups("burst").values()) == [["a1.jpg", "a2.jpg"], ["b1.jpg", "b2.jpg", "b3.jpg"]]
+
+    # substituir grupos do mesmo tipo não afeta os demais
+    dbm.save_groups("burst", [["c1.jpg", "c2.jpg"]])
+    assert list(dbm.get_groups("burst").values()) == [["c1.jpg", "c2.jpg"]]
+    assert len(dbm.get_groups()) == 2
+    dbm.close()
+
+
+def test_bursts_order_by_utc_when_offset_is_known():
+    # mesmo instante em dois fusos: 10:00 em UTC-3 e 13:00 em UTC
+    rows = [
+        {"file_path": "phone.jpg", "datetime": "2024-07-14T10:00:01", "utc_offset": -180, "camera_model": "P"},
+        {"file_path": "camera.jpg", "datetime": "2024-07-14T13:00:00", "utc_offset": 0, "camera_model": "C"},
+    ]
+    assert BurstDetector(max_gap=2.0, per_camera=False).detect(rows) == [["camera.jpg", "phone.jpg"]]
@@ -0,0 +1,50 @@
+import random
+from pathlib import Path
+from PIL import Image, ImageDraw, ImageEnhance
+from src.detection.cascade import CascadeSimilarityMatcher, group_pairs, precision_recall
+from src.detection.similar_detector import SimilarDuplicateDetector
+
+
+def make_scene(seed: int, size=(320, 240)) -> Image.Image:
+    rnd = random.Random(seed)
+    img = Image.new("RGB", size, tuple(rnd.randint(0, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rnd.randint(0, size[0] - 40), rnd.randint(0, size[1] - 40)
+        w, h = rnd.randint(20, 120), rnd.randint(20, 90)
+        draw.rectangle([x, y, x + w, y + h], fill=tuple(rnd.randint(0, 255) for _ in range(3)))
+    return img
+
+
+def build_fixture(folder: Path, scenes: int = 8):
+    """Cada cena gera 3 variantes (original, reduzida, mais clara) = gabarito."""
+    paths, truth = [], set()
+    for s in range(scenes):
+        base = make_scene(s)
+        variants = [base, base.resize((256, 192)), ImageEnhance.Brightness(base).enhance(1.1)]
+        family = []
+        for k, img in enumerate(variants):
+            p = folder / f"scene{s}_{k}.jpg"
+            img.save(p, quality=60 if k else 90)
+            family.append(str(p))
+        paths.extend(Path(p) for p in family)
+        truth |= group_pairs({family[0]: family})
+    return paths, truth
+
+
+def test_cascade_precision_recall_matches_full_phash(tmp_path):
+    paths, truth = build_fixture(tmp_path)
+
+    matcher = CascadeSimilarityMatcher(prefilter_threshold=12, confirm_threshold=8)
+    cascade_groups = matcher.group_similar(paths)
+    precision, recall = precision_recall(group_pairs(cascade_groups), truth)
+
+    full_groups = SimilarDuplicateDetector().group_similar(paths, 8, method="union_find")
+    _, full_recall = precision_recall(group_pairs(full_groups), truth)
+
+    assert precision == 1.0
+    assert recall >= 0.9
+    assert recall >= full_recall
+    # o pré-filtro deve descartar a grande maioria dos N*(N-1)/2 pares
+    total_pairs = len(paths) * (len(paths) - 1) // 2
+    assert matcher.stats["candidate_pairs"] < total_pairs // 5
@@ -0,0 +1,90 @@
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+
+import piexif
+from PIL import Image
+
+from src.core.metadata_reader import MetadataReader
+from src.core.parsers import DateTimeParser
+
+
+def test_fixed_layout_and_alternates():
+    parse = DateTimeParser._parse_exif_datetime
+    assert parse("2021:07:04 10:20:30") == datetime(2021, 7, 4, 10, 20, 30)
+    assert parse("2021:07:04 10:20:30", "045") == datetime(2021, 7, 4, 10, 20, 30, 45000)
+    assert parse("2021-07-04T10:20:30.5") == datetime(2021, 7, 4, 10, 20, 30, 500000)
+    assert parse("2021/07/04 10:20") == datetime(2021, 7, 4, 10, 20)
+    assert parse("2021-07-04") == datetime(2021, 7, 4)
+    for invalid in ("", "0000:00:00 00:00:00", "    :  :     :  :  ", "ontem"):
+        assert parse(invalid) is None
+
+
+def test_utc_offset():
+    assert DateTimeParser.parse_utc_offset("+02:00") == 120
+    assert DateTimeParser.parse_utc_offset("-0330") == -210
+    assert DateTimeParser.parse_utc_offset("   :  ") is None
+    local = datetime(2021, 7, 4, 10, 20, 30)
+    assert DateTimeParser.to_utc(local, -180) == datetime(2021, 7, 4, 13, 20, 30, tzinfo=timezone.utc)
+
+
+def test_reader_attaches_subsec_and_offset(tmp_path: Path):
+    exif = piexif.dump({"Exif": {
+        piexif.ExifIFD.DateTimeOriginal: b"2021:07:04 10:20:30",
+        piexif.ExifIFD.SubSecTimeOriginal: b"25",
+        piexif.ExifIFD.OffsetTimeOriginal: b"-03:00",
+    }})
+    path = tmp_path / "a.jpg"
+    Image.new("RGB", (16, 16)).save(path, exif=exif)
+
+    meta = MetadataReader().read_metadata(path)
+    assert meta["datetime"] == datetime(2021, 7, 4, 10, 20, 30, 250000)
+    assert meta["utc_offset"] == -180
+
+
+def _ifd(entries, next_offset=0):
+    """IFD little-endian com as entradas (tag, tipo, contagem, valor) na ordem dada."""
+    out = struct.pack("<H", len(entries))
+    for tag, kind, count, value in entries:
+        out += struct.pack("<HHII", tag, kind, count, value)
+    return out + struct.pack("<I", next_offset)
+
+
+def test_scan_finds_dates_in_unsorted_ifds():
+    date = b"2019:05:06 07:08:09\x00"
+    ifd0_at = 8
+    exif_at = ifd0_at + 2 + 2 * 12 + 4
+    date_at = exif_at + 2 + 2 * 12 + 4
+    # IFD0 e EXIF IFD com a tag de número maior antes da procurada
+    tiff = b"II*\x00" + struct.pack("<I", ifd0_at)
+    tiff += _ifd([(0x8825, 4, 1, 0), (0x8769, 4, 1, exif_at)])
+    tiff += _ifd([(0xA002, 4, 1, 640), (0x9003, 2, len(date), date_at)])
+    tiff += date
+    assert DateTimeParser.scan_exif_datetime(b"Exif\x00\x00" + tiff) == "2019:05:06 07:08:09"
+
+
+def test_offset_follows_the_field_used_for_the_date():
+    metadata = {
+        "datetime_original": "ontem",
+        "offset_time_original": "+09:00",
+        "datetime_digitized": "2021:07:04 10:20:30",
+        "offset_time_digitized": "-03:00",
+    }
+    assert DateTimeParser._get_datetime(metadata, Path("x.jpg")) == datetime(2021, 7, 4, 10, 20, 30)
+    assert DateTimeParser._get_utc_offset(metadata) == -180
+
+
+def test_projected_read_matches_full_read(tmp_path: Path):
+    exif = piexif.dump({"Exif": {
+        piexif.ExifIFD.DateTimeOriginal: b"2021:07:04 10:20:30",
+        piexif.ExifIFD.SubSecTimeOriginal: b"25",
+        piexif.ExifIFD.OffsetTimeOriginal: b"+01:00",
+    }})
+    path = tmp_path / "a.jpg"
+    Image.new("RGB", (16, 16)).save(path, exif=exif)
+
+    reader = MetadataReader()
+    full = reader.read_metadata(path)
+    projected = reader.read_metadata(path, fields={"datetime", "utc_offset"})
+    assert projected["datetime"] == full["datetime"] == datetime(2021, 7, 4, 10, 20, 30, 250000)
+    assert projected["utc_offset"] == full["utc_offset"] == 60
@@ -1,6 +1,6 @@
 import shutil
 from pathlib import Path
-from src.detection.exact_duplicates import ExactDuplicateDetector
+from src.detection.exact_duplicates import ExactDuplicateDetector, collapse_exact, expand_groups
 from PIL import Image
 
 
@@ -33,3 +33,21 @@ def test_group_by_md5(tmp_path):
             assert str(p1) in files and str(p2) in files
             found = True
     assert found, "Did not find group of exact duplicates"
+
+
+def test_collapse_and_expand_groups():
+    rows = [
+        {"file_path": "a.jpg", "md5_hash": "m1", "file_size": 10},
+        {"file_path": "b.jpg", "md5_hash": "m1", "file_size": 10},
+        {"file_path": "c.jpg", "md5_hash": "m2", "file_size": 20},
+        {"file_path": "d.jpg", "md5_hash": "m3", "file_size": 30},
+        {"file_path": "e.jpg", "md5_hash": "m3", "file_size": 30},
+        {"file_path": "f.jpg", "md5_hash": None, "file_size": 30},
+    ]
+    reps, members = collapse_exact(rows)
+    assert [r["file_path"] for r in reps] == ["a.jpg", "c.jpg", "d.jpg", "f.jpg"]
+    assert members["a.jpg"] == ["a.jpg", "b.jpg"]
+
+    # a.jpg ~ c.jpg visualmente; d/e são só cópias idênticas
+    groups = expand_groups({"a.jpg": ["a.jpg", "c.jpg"]}, members)
+    assert groups == {"a.jpg": ["a.jpg", "b.jpg", "c.jpg"], "d.jpg": ["d.jpg", "e.jpg"]}
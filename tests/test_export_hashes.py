@@ -0,0 +1,64 @@
+import hashlib
+
+from scripts.export_hashes import iter_entries, load_hashes
+from src.database.db_manager import DBManager
+from src.database.hash_store import HashStore
+
+
+def md5(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+class FixedDetector:
+    """Detector com hashes fixos por caminho; registra o que foi calculado."""
+
+    algorithm = "phash"
+    hash_size = 8
+
+    def __init__(self, values):
+        self.values = values
+        self.hashed = []
+
+    def compute_hashes(self, paths, keys=None):
+        self.hashed.extend(str(p) for p in paths)
+        return {str(p): self.values[str(p)] for p in paths if str(p) in self.values}
+
+
+def test_load_hashes_computes_only_missing(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    paths_by_md5 = {md5("a"): ["/a.jpg", "/a2.jpg"], md5("b"): ["/b.jpg"]}
+    values = {"/a.jpg": 0, "/b.jpg": 0b111}
+
+    first = FixedDetector(values)
+    store = load_hashes(dbm, first, paths_by_md5)
+    assert {store.md5(i): store.value(i) for i in range(len(store))} == {md5("a"): 0, md5("b"): 7}
+    assert sorted(first.hashed) == ["/a.jpg", "/b.jpg"]
+
+    # segunda exportação: tudo vem dos hashes gravados
+    paths_by_md5[md5("c")] = ["/c.jpg"]
+    values["/c.jpg"] = 2 ** 64 - 1
+    second = FixedDetector(values)
+    store = load_hashes(dbm, second, paths_by_md5)
+    assert store.value(store.find(md5("c"))) == 2 ** 64 - 1
+    assert second.hashed == ["/c.jpg"]
+    dbm.close()
+
+
+def test_neighbour_entries(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    dbm.save_hashes({md5("1"): "0" * 16, md5("2"): "0" * 15 + "7", md5("3"): "f" * 16, md5("4"): "0" * 16}, hash_size=8)
+    store = HashStore.for_db(dbm, hash_size=8)
+    # m4 não está mais em `images`: não entra na exportação nem como vizinho
+    paths_by_md5 = {md5("1"): ["/a.jpg", "/a2.jpg"], md5("2"): ["/b.jpg"], md5("3"): ["/c.jpg"]}
+    entries = {e["path"]: e for e in iter_entries(paths_by_md5, store, radius=5, k=2)}
+    dbm.close()
+
+    assert sorted(entries) == ["/a.jpg", "/a2.jpg", "/b.jpg", "/c.jpg"]
+    # cópias idênticas são vizinhas a distância 0
+    assert (entries["/a.jpg"]["closest_path"], entries["/a.jpg"]["closest_distance"]) == ("/a2.jpg", 0)
+    assert entries["/a.jpg"]["neighbors"] == [{"path": "/a2.jpg", "distance": 0}, {"path": "/b.jpg", "distance": 3}]
+    assert (entries["/b.jpg"]["closest_path"], entries["/b.jpg"]["closest_distance"]) == ("/a.jpg", 3)
+    assert entries["/c.jpg"]["closest_path"] is None and entries["/c.jpg"]["closest_distance"] == -1
+    assert entries["/b.jpg"]["phash"] == "0000000000000007"
@@ -0,0 +1,65 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.core.feature_cache import FeatureCache
+from src.core.perceptual_hash import phash_from_pixels
+from src.detection.similar_detector import SimilarDuplicateDetector
+
+
+def make_image(path, seed):
+    img = Image.new("RGB", (200, 150), (30 * seed % 255, 80, 140))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([10, 10 + 8 * seed, 90, 80], fill=(240, 230, 20))
+    draw.ellipse([100, 30, 190, 60 + 10 * seed], fill=(20, 40, 220))
+    img.save(path)
+
+
+def test_put_get_and_eviction(tmp_path):
+    cache = FeatureCache(tmp_path / "features.db", max_mb=3 * 64 * 64 / (1024 * 1024))
+    assert cache.max_entries == 3
+    for i in range(5):
+        cache.put(f"md5-{i}", np.full((64, 64), i, dtype=np.uint8))
+        cache.conn.execute("UPDATE rasters SET last_used = ? WHERE content_key = ?", (i, f"md5-{i}"))
+        cache.conn.commit()
+    assert len(cache) == 3
+    assert cache.get("md5-0") is None
+    assert int(cache.get("md5-4")[0, 0]) == 4
+    assert cache.hash("md5-4", "phash", 8) == phash_from_pixels(cache.get("md5-4"), 8)
+
+
+def test_detector_rehashes_from_cache_without_files(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"img{i}.png")
+        make_image(paths[-1], i)
+    keys = {str(p): f"md5-{i}" for i, p in enumerate(paths)}
+    cache = FeatureCache(tmp_path / "features.db")
+
+    first = SimilarDuplicateDetector(hash_size=16, feature_cache=cache).compute_hashes(paths, keys)
+    plain = SimilarDuplicateDetector(hash_size=16).compute_hashes(paths)
+    assert first == plain
+    assert len(cache) == 3
+
+    for p in paths:
+        p.unlink()
+    again = SimilarDuplicateDetector(hash_size=16, feature_cache=cache).compute_hashes(paths, keys)
+    assert again == first
+    smaller = SimilarDuplicateDetector(hash_size=8, feature_cache=cache).compute_hashes(paths, keys)
+    assert len(smaller) == 3 and all(v < 2 ** 64 for v in smaller.values())
+
+
+def test_preview_rasters_have_their_own_key(tmp_path):
+    cache = FeatureCache(tmp_path / "features.db")
+    assert FeatureCache.content_key("abc") == "abc"
+    assert FeatureCache.content_key("abc", 160) != FeatureCache.content_key("abc")
+
+    path = tmp_path / "img.png"
+    make_image(path, 1)
+    keys = {str(path): "md5-1"}
+    SimilarDuplicateDetector(hash_size=8, feature_cache=cache).compute_hashes([path], keys)
+    SimilarDuplicateDetector(hash_size=8, preview_min_size=160, feature_cache=cache).compute_hashes([path], keys)
+    assert len(cache) == 2 and cache.get("md5-1") is not None
+    # regravar uma chave existente não conta como entrada nova
+    cache.put("md5-1", np.zeros((64, 64), dtype=np.uint8))
+    assert cache._count == len(cache) == 2
+    cache.close()
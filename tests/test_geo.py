@@ -0,0 +1,71 @@
+import piexif
+from PIL import Image
+
+from src.core.parsers import EXIFParser, GPSParser
+from src.database.db_manager import DBManager
+
+
+def to_rational(value):
+    deg = int(value)
+    minutes = int((value - deg) * 60)
+    seconds = round(((value - deg) * 60 - minutes) * 60 * 100)
+    return ((deg, 1), (minutes, 1), (seconds, 100))
+
+
+def test_exif_with_gps_keeps_camera_and_date(tmp_path):
+    exif = piexif.dump({
+        "0th": {piexif.ImageIFD.Make: b"Canon"},
+        "Exif": {piexif.ExifIFD.DateTimeOriginal: b"2020:01:02 03:04:05"},
+        "GPS": {
+            piexif.GPSIFD.GPSLatitudeRef: b"S",
+            piexif.GPSIFD.GPSLatitude: to_rational(23.5505),
+            piexif.GPSIFD.GPSLongitudeRef: b"W",
+            piexif.GPSIFD.GPSLongitude: to_rational(46.6333),
+        },
+    })
+    path = tmp_path / "a.jpg"
+    Image.new("RGB", (32, 32)).save(path, exif=exif)
+    meta = EXIFParser.read_exif_data(path)
+    assert meta["camera_make"] == "Canon"
+    assert meta["datetime_original"] == "2020:01:02 03:04:05"
+    assert abs(meta["latitude"] + 23.5505) < 1e-3 and abs(meta["longitude"] + 46.6333) < 1e-3
+    assert meta["geohash"] == GPSParser.encode_geohash(meta["latitude"], meta["longitude"])
+
+
+def test_geohash_reference_value():
+    assert GPSParser.encode_geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+
+
+def insert(dbm, name, lat, lon):
+    dbm.conn.execute(
+        "INSERT INTO images (file_path, latitude, longitude) VALUES (?, ?, ?)", (name, lat, lon)
+    )
+
+
+def test_bbox_and_radius_queries(tmp_path):
+    dbm = DBManager(str(tmp_path / "geo.db"))
+    dbm.init_tables()
+    insert(dbm, "paulista.jpg", -23.5614, -46.6559)
+    insert(dbm, "se.jpg", -23.5503, -46.6339)       # ~2.5 km de paulista
+    insert(dbm, "rio.jpg", -22.9068, -43.1729)
+    insert(dbm, "fiji_east.jpg", -17.0, 179.9)
+    insert(dbm, "fiji_west.jpg", -17.0, -179.9)
+    insert(dbm, "sem_gps.jpg", None, None)
+    dbm.conn.commit()
+
+    near = dbm.images_within_radius(-23.5614, -46.6559, 3.0)
+    assert [r["file_path"] for r in near] == ["paulista.jpg", "se.jpg"]
+    assert near[0]["distance_km"] == 0 and 2 < near[1]["distance_km"] < 3
+    assert [r["file_path"] for r in dbm.images_within_radius(-23.5614, -46.6559, 1.0)] == ["paulista.jpg"]
+
+    box = dbm.images_in_bbox(-24, -47, -22, -43)
+    assert {r["file_path"] for r in box} == {"paulista.jpg", "se.jpg", "rio.jpg"}
+    # caixa e raio atravessando o antimeridiano
+    assert {r["file_path"] for r in dbm.images_in_bbox(-18, 179, -16, -179)} == {"fiji_east.jpg", "fiji_west.jpg"}
+    assert len(dbm.images_within_radius(-17.0, 180.0, 20)) == 2
+
+    # índice acompanha atualizações e remoções
+    dbm.conn.execute("UPDATE images SET latitude = 0, longitude = 0 WHERE file_path = 'rio.jpg'")
+    dbm.conn.execute("DELETE FROM images WHERE file_path = 'se.jpg'")
+    assert {r["file_path"] for r in dbm.images_in_bbox(-24, -47, -22, -43)} == {"paulista.jpg"}
+    dbm.close()
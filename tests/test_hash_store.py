@@ -0,0 +1,116 @@
+import hashlib
+
+import numpy as np
+
+from src.database.db_manager import DBManager
+from src.database.hash_store import HashStore
+
+
+def md5(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def test_store_is_mapped_and_refreshed_incrementally(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    dbm.conn.execute("INSERT INTO images (file_path, file_size, md5_hash) VALUES ('/a.jpg', 123, ?)", (md5("a"),))
+    dbm.conn.commit()
+    hashes = {md5("a"): "f" * 64, md5("b"): "0" * 63 + "7"}
+    dbm.save_hashes(hashes)
+
+    store = HashStore.for_db(dbm)
+    assert isinstance(store.hashes, np.memmap) and store.hashes.shape == (2, 4)
+    assert {store.md5(i): store.hex(i) for i in range(len(store))} == hashes
+    assert list(store.sizes) == [123, -1]
+    assert store.nearest(0, max_distance=3) == [(md5("b"), 3)]
+
+    # reabrir sem mudanças não relê nada; a linha nova é acrescentada ao fim dos arquivos
+    assert HashStore.for_db(dbm).refresh(dbm.conn) == 0
+    inode = (store.directory / "hashes.npy").stat().st_ino
+    dbm.save_hashes({md5("c"): "0" * 64})
+    store = HashStore.for_db(dbm)
+    assert len(store) == 3 and store.md5(2) == md5("c") and list(store.added) == [2]
+    assert (store.directory / "hashes.npy").stat().st_ino == inode
+
+    # valor alterado e linha apagada chegam pelo log de mudanças
+    dbm.save_hashes({md5("b"): "0" * 64})
+    dbm.conn.execute("DELETE FROM perceptual_hashes WHERE md5_hash = ?", (md5("a"),))
+    dbm.conn.commit()
+    store = HashStore.for_db(dbm)
+    assert sorted(store.md5(i) for i in range(len(store))) == sorted([md5("b"), md5("c")])
+    assert store.value(store.find(md5("b"))) == 0
+    assert store.find(md5("c")) is not None and store.find(md5("a")) is None
+    dbm.close()
+
+
+def test_digests_are_stored_as_raw_bytes(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    # md5 terminado em bytes zero: o S16 não pode perdê-los na volta para hex
+    zeros = "ab" * 14 + "0000"
+    dbm.save_hashes({zeros: "00", md5("b"): "03", "chave-que-nao-e-md5": "01"}, hash_size=2)
+    store = HashStore.for_db(dbm, hash_size=2)
+    assert store.digests.dtype.itemsize == 16
+    assert sorted(store.md5(i) for i in range(len(store))) == sorted([zeros, md5("b")])
+    assert store.find(zeros) == 0 and store.find("chave-que-nao-e-md5") is None
+    assert store.nearest(0, max_distance=2) == [(zeros, 0), (md5("b"), 2)]
+    dbm.close()
+
+
+def test_band_queries_match_brute_force(tmp_path):
+    rng = np.random.default_rng(7)
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    bits = 144  # 3 palavras, faixas atravessam a fronteira entre palavras
+    base = [int(rng.integers(0, 2 ** 62)) << 82 | int(rng.integers(0, 2 ** 62)) for _ in range(40)]
+    values = []
+    for value in base:
+        values.append(value)
+        for _ in range(3):
+            flips = rng.choice(bits, size=int(rng.integers(0, 8)), replace=False)
+            values.append(value ^ sum(1 << int(b) for b in flips))
+    hexes = {md5(f"k{i}"): format(v, "036x") for i, v in enumerate(values)}
+    dbm.save_hashes(dict(list(hexes.items())[:100]), hash_size=12)
+    store = HashStore.for_db(dbm, hash_size=12)
+    store.band_index(6)
+    # segundo lote: vira um run novo do índice persistido
+    dbm.save_hashes(dict(list(hexes.items())[100:]), hash_size=12)
+    store = HashStore.for_db(dbm, hash_size=12)
+
+    def brute(radius):
+        found = set()
+        for i in range(len(store)):
+            for j in range(i + 1, len(store)):
+                d = (store.value(i) ^ store.value(j)).bit_count()
+                if d <= radius:
+                    found.add((i, j, d))
+        return found
+
+    for radius in (0, 3, 6):
+        pairs = {(i, j, d) for chunk in store.pairs(radius, chunk=32) for i, j, d in zip(*map(list, chunk))}
+        assert pairs == brute(radius)
+    qi, pos, dist = store.query(store.pack_many([values[0]]), 6)
+    assert list(dist) == sorted(dist) and store.find(md5("k0")) in list(pos)
+    dbm.close()
+
+
+def test_band_runs_are_new_files_and_old_ones_are_removed(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+
+    def add(first, count):
+        dbm.save_hashes({md5(f"k{i}"): format(i * 7919, "016x") for i in range(first, first + count)}, hash_size=8)
+        store = HashStore.for_db(dbm, hash_size=8)
+        index = store.band_index(2)
+        return index, {p.name: p.stat().st_ino for p in index.directory.glob("*.npy")}
+
+    index, files = add(0, 100)
+    assert len(files) == 2
+    # run pequeno: os arquivos do primeiro run ficam como estão
+    index, more = add(100, 10)
+    assert len(more) == 4 and all(more[name] == ino for name, ino in files.items())
+    # run grande: os dois são fundidos num run novo e os arquivos antigos somem
+    index, merged = add(110, 100)
+    assert len(merged) == 2 and not set(merged) & set(more)
+    assert [(start, start + keys.shape[1]) for start, keys, _ in index.runs] == [(0, 210)]
+    dbm.close()
@@ -0,0 +1,55 @@
+import piexif
+from PIL import Image
+
+from src.core.metadata_reader import MetadataReader
+from src.core.parsers import HeaderParser
+
+
+def make_images(tmp_path):
+    img = Image.new("RGB", (321, 123), (10, 20, 30))
+    exif = piexif.dump({"0th": {piexif.ImageIFD.Make: b"Canon"}})
+    paths = {
+        "jpeg": tmp_path / "a.jpg",
+        "gray": tmp_path / "b.jpg",
+        "png": tmp_path / "c.png",
+        "tiff": tmp_path / "d.tif",
+        "webp": tmp_path / "e.webp",
+    }
+    img.save(paths["jpeg"], exif=exif)
+    img.convert("L").save(paths["gray"])
+    img.convert("RGBA").save(paths["png"])
+    img.convert("CMYK").save(paths["tiff"])
+    img.save(paths["webp"])
+    return paths
+
+
+def test_header_matches_pil(tmp_path):
+    for path in make_images(tmp_path).values():
+        header = HeaderParser.read_header(path)
+        assert header["stat"].st_size == path.stat().st_size
+        if path.suffix == ".webp":
+            assert "width" not in header
+            continue
+        with Image.open(path) as img:
+            assert (header["width"], header["height"], header["mode"], header["format"]) == (
+                img.width, img.height, img.mode, img.format
+            )
+
+
+def test_jpeg_exif_segment_only(tmp_path):
+    path = make_images(tmp_path)["jpeg"]
+    header = HeaderParser.read_header(path)
+    assert header["exif"].startswith(b"Exif\x00\x00")
+    assert len(header["exif"]) < path.stat().st_size
+    assert piexif.load(header["exif"])["0th"][piexif.ImageIFD.Make] == b"Canon"
+
+
+def test_read_metadata_uses_header_and_falls_back(tmp_path):
+    reader = MetadataReader()
+    paths = make_images(tmp_path)
+    for path in paths.values():
+        meta = reader.read_metadata(path)
+        assert (meta["width"], meta["height"]) == (321, 123)
+        assert meta["file_size"] == path.stat().st_size
+        assert meta["datetime"] is not None
+    assert reader.read_metadata(tmp_path / "missing.jpg") == {}
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from src.database.db_manager import DBManager
+
+
+def make_db(tmp_path):
+    dbm = DBManager(str(tmp_path / "q.db"))
+    dbm.init_tables()
+    folder = os.sep + "fotos"
+    rows = []
+    for i in range(25):
+        sub = "viagem" if i % 2 else "casa"
+        date = None if i % 5 == 0 else f"2021-0{1 + i % 3}-{10 + i:02d}T12:00:00"
+        rows.append((os.path.join(folder, sub, f"{i:02d}.jpg"), 1000 + i % 7, date,
+                     "EOS 5D" if i % 3 else "iPhone", "JPEG" if i % 4 else "PNG"))
+    dbm.conn.executemany(
+        "INSERT INTO images (file_path, file_size, datetime, camera_model, format) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    dbm.conn.commit()
+    dbm.save_groups("similar", [[rows[1][0], rows[3][0]]])
+    return dbm, rows
+
+
+def walk(dbm, **kwargs):
+    ids, cursor = [], None
+    while True:
+        page, cursor = dbm.query_images(limit=4, cursor=cursor, **kwargs)
+        ids += [r["id"] for r in page]
+        if cursor is None:
+            return ids
+
+
+def test_keyset_pages_match_full_ordering(tmp_path):
+    dbm, _ = make_db(tmp_path)
+    for sort, column in (("id", "id"), ("datetime", "datetime"), ("size", "file_size"), ("path", "file_path")):
+        for desc in (False, True):
+            order = "DESC" if desc else "ASC"
+            expected = [r[0] for r in dbm.conn.execute(f"SELECT id FROM images ORDER BY {column} {order}, id {order}")]
+            assert walk(dbm, sort=sort, descending=desc) == expected, (sort, desc)
+    dbm.close()
+
+
+def test_filters(tmp_path):
+    dbm, rows = make_db(tmp_path)
+    page, cursor = dbm.query_images(limit=100, camera_model="iPhone", format="PNG")
+    assert cursor is None
+    assert {r["file_path"] for r in page} == {r[0] for r in rows if r[3] == "iPhone" and r[4] == "PNG"}
+
+    page, _ = dbm.query_images(limit=100, date_from="2021-02-01", date_to="2021-02-28")
+    assert page and all(r["datetime"].startswith("2021-02") for r in page)
+
+    page, _ = dbm.query_images(limit=100, folder=os.path.join(os.sep + "fotos", "viagem"))
+    assert len(page) == 12 and all(os.sep + "viagem" + os.sep in r["file_path"] for r in page)
+
+    page, _ = dbm.query_images(limit=100, duplicate=True)
+    assert [r["file_path"] for r in page] == [rows[1][0], rows[3][0]]
+    assert len(dbm.query_images(limit=100, duplicate=False, duplicate_kind="similar")[0]) == 23
+
+    _, cursor = dbm.query_images(limit=2, sort="datetime")
+    with pytest.raises(ValueError):
+        dbm.query_images(limit=2, sort="size", cursor=cursor)
+    dbm.close()
@@ -0,0 +1,102 @@
+import hashlib
+import shutil
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from src.database.db_manager import DBManager
+from src.detection.incremental import IncrementalSimilarity
+from src.detection.similar_detector import SimilarDuplicateDetector
+
+
+class CountingDetector(SimilarDuplicateDetector):
+    def __init__(self):
+        super().__init__(hash_size=8)
+        self.hashed = []
+
+    def compute_hashes(self, paths, keys=None):
+        self.hashed.extend(str(p) for p in paths)
+        return super().compute_hashes(paths, keys)
+
+
+def md5(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def make_image(path: Path, seed: int, shift: int = 0):
+    img = Image.new("RGB", (160, 120), (20 * seed % 255, 90, 160))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([10 + shift, 10 + 7 * seed, 70 + shift, 60 + 5 * seed], fill=(250, 240, 10))
+    draw.ellipse([90, 20 + 9 * seed, 150, 90], fill=(10 * seed, 20, 200))
+    img.save(path, quality=90)
+
+
+def test_only_new_images_are_hashed_and_groups_merge(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    a, b, c = tmp_path / "a.jpg", tmp_path / "b.jpg", tmp_path / "c.jpg"
+    make_image(a, 1)
+    make_image(b, 5)
+    rows = [{"file_path": str(a), "md5_hash": md5("a")}, {"file_path": str(b), "md5_hash": md5("b")}]
+
+    first = CountingDetector()
+    changed = IncrementalSimilarity(dbm, first, max_distance=6).update(rows)
+    assert sorted(first.hashed) == [str(a), str(b)]
+    assert changed == [] and dbm.get_groups("similar") == {}
+
+    # novo arquivo: quase idêntico a `a`
+    make_image(c, 1, shift=1)
+    rows.append({"file_path": str(c), "md5_hash": md5("c")})
+    second = CountingDetector()
+    changed = IncrementalSimilarity(dbm, second, max_distance=6).update(rows)
+    assert second.hashed == [str(c)]
+    assert changed == [[str(a), str(c)]]
+
+    # cópia de `b` chega depois: grupo antigo é preservado e só o novo muda
+    d = tmp_path / "d.jpg"
+    shutil.copy(b, d)
+    rows.append({"file_path": str(d), "md5_hash": md5("d")})
+    third = CountingDetector()
+    changed = IncrementalSimilarity(dbm, third, max_distance=6).update(rows)
+    assert third.hashed == [str(d)]
+    assert changed == [[str(b), str(d)]]
+    assert sorted(dbm.get_groups("similar").values()) == [[str(a), str(c)], [str(b), str(d)]]
+    dbm.close()
+
+
+class FixedDetector(SimilarDuplicateDetector):
+    """Hashes fixos por caminho, sem abrir arquivos."""
+
+    def __init__(self, values):
+        super().__init__(hash_size=8)
+        self.values = values
+
+    def compute_hashes(self, paths, keys=None):
+        return {str(p): self.values[str(p)] for p in paths}
+
+
+def test_new_images_come_from_the_db_and_respect_the_group_cap(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+
+    def ingest(name):
+        dbm.conn.execute("INSERT INTO images (file_path, md5_hash) VALUES (?, ?)", (f"/{name}.jpg", md5(name)))
+        dbm.conn.commit()
+
+    # a-b e b-c a distância 4, mas a-c a 8: acima do teto de ligação completa
+    values = {"/a.jpg": 0, "/b.jpg": 0b1111, "/c.jpg": 0b11111111, "/d.jpg": 0b111}
+    ingest("a")
+    ingest("b")
+    similarity = IncrementalSimilarity(dbm, FixedDetector(values), max_distance=5, max_group_distance=5)
+    assert similarity.update() == [["/a.jpg", "/b.jpg"]]
+
+    ingest("c")
+    assert similarity.update() == []
+    assert similarity.stats["new_hashes"] == 1 and similarity.stats["new_pairs"] == 1
+
+    # d fica a <= 5 de a, b e c; entra no grupo existente, que é substituído
+    ingest("d")
+    assert similarity.update() == [["/a.jpg", "/b.jpg", "/d.jpg"]]
+    assert similarity.stats["replaced_groups"] == 1
+    assert list(dbm.get_groups("similar").values()) == [["/a.jpg", "/b.jpg", "/d.jpg"]]
+    dbm.close()
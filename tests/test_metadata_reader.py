@@ -0,0 +1,136 @@
+import time
+
+from PIL import Image
+
+from src.core.metadata_reader import MetadataReader
+
+
+class SlowReader(MetadataReader):
+    """Primeiro arquivo é o mais lento; o último falha."""
+
+    def read_metadata(self, file_path, fields=None):
+        if file_path.name == "bad.jpg":
+            raise OSError("falha simulada")
+        if file_path.name == "img0.jpg":
+            time.sleep(0.2)
+        return super().read_metadata(file_path, fields)
+
+
+def make_files(tmp_path, n=6):
+    paths = []
+    for i in range(n):
+        paths.append(tmp_path / f"img{i}.jpg")
+        Image.new("RGB", (40 + i, 30), (i * 20, 0, 0)).save(paths[-1])
+    paths.append(tmp_path / "bad.jpg")
+    return paths
+
+
+def test_read_many_ordered_and_per_item_errors(tmp_path):
+    paths = make_files(tmp_path)
+    results = list(SlowReader().read_many(paths, workers=3, ordered=True, queue_depth=2))
+    assert [p for p, _ in results] == paths
+    assert [m["width"] for _, m in results[:-1]] == [40 + i for i in range(6)]
+    assert "falha simulada" in results[-1][1]["error"]
+
+
+def test_read_many_unordered_streams_as_completed(tmp_path):
+    paths = make_files(tmp_path)
+    results = list(SlowReader().read_many(paths, workers=4))
+    assert sorted(p for p, _ in results) == sorted(paths)
+    # o arquivo lento não segura os demais
+    assert results[0][0].name != "img0.jpg"
+
+
+def test_datetime_projection(tmp_path):
+    import piexif
+    from datetime import datetime
+
+    exif = piexif.dump({
+        "0th": {piexif.ImageIFD.Make: b"Canon"},
+        "Exif": {piexif.ExifIFD.DateTimeOriginal: b"2020:01:02 03:04:05"},
+    })
+    img = Image.new("RGB", (64, 48))
+    img.save(tmp_path / "a.jpg", exif=exif)
+    img.save(tmp_path / "b.tif", exif=exif)
+    img.save(tmp_path / "c.webp")
+    reader = MetadataReader()
+
+    for name in ("a.jpg", "b.tif"):
+        meta = reader.read_metadata(tmp_path / name, fields={"datetime"})
+        assert meta == {"file_path": str(tmp_path / name), "datetime": datetime(2020, 1, 2, 3, 4, 5)}
+
+    # formato sem parser de cabeçalho: leitura completa, resultado projetado
+    meta = reader.read_metadata(tmp_path / "c.webp", fields={"datetime", "width"})
+    assert set(meta) == {"file_path", "datetime", "width"} and meta["width"] == 64
+
+
+def test_metadata_cache_hits_partial_entries_and_invalidation(tmp_path):
+    import os
+
+    from src.core.metadata_cache import MetadataCache
+
+    path = tmp_path / "a.jpg"
+    Image.new("RGB", (64, 48)).save(path)
+    cache = MetadataCache(tmp_path / "meta.db", lru_size=2)
+    reader = MetadataReader(cache=cache)
+
+    partial = reader.read_metadata(path, fields={"datetime"})
+    assert cache.misses == 1
+    assert reader.read_metadata(path, fields={"datetime"}) == partial
+    assert cache.hits == 1
+    # projeção parcial não atende leitura completa
+    full = reader.read_metadata(path)
+    assert full["width"] == 64 and cache.misses == 2
+
+    # nova conexão (sem LRU): entrada persistida após o flush; renomear mantém a entrada
+    cache.flush()
+    moved = path.rename(tmp_path / "b.jpg")
+    fresh = MetadataCache(tmp_path / "meta.db")
+    meta = MetadataReader(cache=fresh).read_metadata(moved)
+    assert fresh.hits == 1 and meta["file_name"] == "b.jpg"
+    assert meta["datetime"] == full["datetime"]
+
+    # alterar o arquivo muda a identidade
+    Image.new("RGB", (32, 32)).save(moved)
+    os.utime(moved, ns=(1, 1))
+    assert MetadataReader(cache=fresh).read_metadata(moved)["width"] == 32
+
+
+def test_metadata_cache_buffers_writes(tmp_path):
+    import sqlite3
+
+    from src.core.metadata_cache import MetadataCache
+
+    paths = make_files(tmp_path, n=5)
+    cache = MetadataCache(tmp_path / "meta.db", lru_size=0, batch_size=3)
+    reader = MetadataReader(cache=cache)
+
+    def stored():
+        with sqlite3.connect(tmp_path / "meta.db") as conn:
+            return conn.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+
+    for p in paths[:2]:
+        reader.read_metadata(p)
+    # ainda no buffer: não gravado, mas já atende leituras
+    assert stored() == 0
+    reader.read_metadata(paths[0])
+    assert cache.hits == 1
+    reader.read_metadata(paths[2])
+    assert stored() == 3
+
+    list(reader.read_many(paths, workers=2))
+    assert stored() == 5
+
+
+def test_small_keeper_groups_are_read_without_a_pool(tmp_path, monkeypatch):
+    from src.core import metadata_reader
+    from src.detection import keep_policy
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("pool criado para um grupo pequeno")
+
+    monkeypatch.setattr(keep_policy, "get_metadata_cache", lambda: None)
+    monkeypatch.setattr(metadata_reader, "ThreadPoolExecutor", no_pool)
+    paths = make_files(tmp_path, n=3)
+    # bad.jpg falha e é ignorado; fica o de maior resolução
+    assert keep_policy.choose_keeper_among(paths) == paths[2]
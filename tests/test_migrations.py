@@ -0,0 +1,54 @@
+import sqlite3
+
+from src.database.db_manager import DBManager
+from src.database.migrations import LATEST_VERSION, current_version, migrate
+
+
+def plan(conn, sql, params):
+    return " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def test_fresh_database_gets_every_migration_and_indexes(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "new.db"))
+    assert migrate(conn) == list(range(1, LATEST_VERSION + 1))
+    assert migrate(conn) == []
+    assert current_version(conn) == LATEST_VERSION
+    assert "idx_images_md5" in plan(conn, "SELECT file_path FROM images WHERE md5_hash = ?", ("x",))
+    assert "idx_images_datetime" in plan(conn, "SELECT id FROM images WHERE datetime > ?", ("2020",))
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0] == 1
+    conn.close()
+
+
+def test_unversioned_database_is_upgraded_in_place(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(str(path))
+    # esquema antigo: sem schema_version, sem colunas de localização
+    conn.execute("CREATE TABLE images (id INTEGER PRIMARY KEY AUTOINCREMENT, file_path TEXT UNIQUE, "
+                 "file_name TEXT, file_size INTEGER, format TEXT, width INTEGER, height INTEGER, "
+                 "megapixels REAL, datetime TEXT, camera_make TEXT, camera_model TEXT, md5_hash TEXT)")
+    conn.execute("INSERT INTO images (file_path, md5_hash) VALUES ('/a.jpg', 'abc')")
+    conn.commit()
+    conn.close()
+
+    dbm = DBManager(str(path))
+    dbm.init_tables()
+    assert current_version(dbm.conn) == LATEST_VERSION
+    assert dbm.get_by_md5("abc")["latitude"] is None
+    dbm.conn.execute("UPDATE images SET latitude = 1, longitude = 2 WHERE md5_hash = 'abc'")
+    assert [r["file_path"] for r in dbm.images_in_bbox(0, 0, 3, 3)] == ["/a.jpg"]
+    dbm.close()
+
+
+def test_capture_utc_offset_is_stored(tmp_path):
+    from datetime import datetime
+
+    from src.database.db_manager import IMAGE_INSERT_SQL, image_row
+
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    meta = {"file_path": "/a.jpg", "datetime": datetime(2021, 7, 4, 10, 20, 30), "utc_offset": -180}
+    dbm.conn.execute(IMAGE_INSERT_SQL, image_row(meta, "abc"))
+    assert dbm.get_by_md5("abc")["utc_offset"] == -180
+    dbm.update_image_by_md5("abc", {**meta, "utc_offset": 60})
+    assert dbm.get_by_md5("abc")["utc_offset"] == 60
+    dbm.close()
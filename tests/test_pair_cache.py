@@ -0,0 +1,45 @@
+import hashlib
+
+import pytest
+
+from src.database.db_manager import DBManager
+from src.detection.pair_cache import PairDistanceCache
+
+
+def md5(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def make_db(tmp_path):
+    dbm = DBManager(str(tmp_path / "test.db"))
+    dbm.init_tables()
+    for name in "abcde":
+        dbm.conn.execute(
+            "INSERT INTO images (file_path, md5_hash) VALUES (?, ?)", (f"/fotos/{name}.jpg", md5(name))
+        )
+    dbm.conn.commit()
+    return dbm
+
+
+def test_regroup_at_any_threshold_below_ceiling(tmp_path):
+    dbm = make_db(tmp_path)
+    dbm.save_pairs([(md5("b"), md5("a"), 2), (md5("b"), md5("c"), 7), (md5("d"), md5("e"), 15)])
+    cache = PairDistanceCache(dbm, ceiling=20)
+
+    assert list(cache.regroup(2).values()) == [["/fotos/a.jpg", "/fotos/b.jpg"]]
+    assert list(cache.regroup(8).values()) == [["/fotos/a.jpg", "/fotos/b.jpg", "/fotos/c.jpg"]]
+    assert len(cache.regroup(20)) == 2
+    assert cache.histogram() == {2: 1, 7: 1, 15: 1}
+    with pytest.raises(ValueError):
+        cache.regroup(21)
+    dbm.close()
+
+
+def test_rebuild_from_stored_hashes(tmp_path):
+    dbm = make_db(tmp_path)
+    dbm.save_hashes({md5("a"): "0000000000000000", md5("b"): "0000000000000007", md5("c"): "ffffffffffffffff"},
+                    hash_size=8)
+    cache = PairDistanceCache(dbm, ceiling=5)
+    assert cache.rebuild(hash_size=8) == 1
+    assert dbm.get_pairs(5) == [(*sorted([md5("a"), md5("b")]), 3)]
+    dbm.close()
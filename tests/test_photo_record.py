@@ -0,0 +1,46 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from src.core.metadata_reader import MetadataReader
+from src.core.photo_record import PhotoRecord
+
+
+def test_record_is_slotted_and_interned():
+    meta = {"datetime": datetime(2021, 7, 4), "width": 4000, "height": 3000,
+            "camera_make": "Canon", "camera_model": "".join(["EOS ", "5D"]), "format": "JPEG"}
+    a = PhotoRecord.from_metadata(Path("/fotos/a.jpg"), meta, md5="abc")
+    b = PhotoRecord.from_metadata(Path("/fotos/b.jpg"), dict(meta))
+
+    assert not hasattr(a, "__dict__")
+    assert a.camera_model is b.camera_model is sys.intern("EOS 5D")
+    assert a.path == Path("/fotos/a.jpg") and a.megapixels == 12.0
+    data = a.to_dict()
+    assert data["file_name"] == "a.jpg" and data["md5"] == "abc" and data["datetime"] == meta["datetime"]
+
+
+def test_read_records(tmp_path):
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"{i}.png"
+        Image.new("RGB", (10 + i, 10)).save(p)
+        paths.append(p)
+    paths.append(tmp_path / "missing.jpg")
+
+    records = list(MetadataReader().read_records(paths, workers=2, ordered=True))
+    assert [r.path for r in records] == paths
+    assert [r.width for r in records] == [10, 11, 12, None]
+    assert records[0].format == "PNG" and records[-1].datetime is None
+
+
+def test_record_keeps_geohash_offset_and_error():
+    meta = {"latitude": -23.5, "longitude": -46.6, "geohash": "6gyf4bf", "utc_offset": -180}
+    record = PhotoRecord.from_metadata(Path("/fotos/a.jpg"), meta)
+    data = record.to_dict()
+    assert data["geohash"] == "6gyf4bf" and data["utc_offset"] == -180
+    assert "error" not in data and record.error is None
+
+    failed = PhotoRecord.from_metadata(Path("/fotos/b.jpg"), {"error": "arquivo truncado"})
+    assert failed.error == "arquivo truncado" and failed.width is None
@@ -0,0 +1,61 @@
+import io
+from pathlib import Path
+
+import piexif
+from PIL import Image, ImageDraw
+
+from src.core.preview_extractor import PreviewExtractor
+from src.detection.similar_detector import SimilarDuplicateDetector
+
+
+def make_picture(size=(640, 480)) -> Image.Image:
+    img = Image.new("RGB", size, (30, 60, 90))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([40, 40, size[0] // 2, size[1] // 2], fill=(240, 200, 20))
+    draw.ellipse([size[0] // 2, size[1] // 3, size[0] - 30, size[1] - 30], fill=(200, 20, 60))
+    return img
+
+
+def jpeg_bytes(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def make_fake_raw(path: Path, preview: bytes):
+    """Contêiner TIFF mínimo cujo IFD0 aponta para um preview JPEG (como no CR2)."""
+    def tiff(offset):
+        ifd0 = {
+            piexif.ImageIFD.Compression: 6,
+            piexif.ImageIFD.StripOffsets: offset,
+            piexif.ImageIFD.StripByteCounts: len(preview),
+        }
+        return piexif.dump({"0th": ifd0})[6:]  # remove o prefixo "Exif\0\0"
+
+    header = tiff(0)
+    path.write_bytes(tiff(len(header)) + preview)
+
+
+def test_exif_thumbnail_respects_min_size(tmp_path):
+    thumb = jpeg_bytes(make_picture((200, 150)))
+    exif = piexif.dump({"0th": {}, "1st": {piexif.ImageIFD.Compression: 6}, "thumbnail": thumb})
+    p = tmp_path / "photo.jpg"
+    make_picture().save(p, exif=exif)
+
+    preview = PreviewExtractor.extract(p, min_size=120)
+    assert preview is not None and preview.size == (200, 150)
+    assert PreviewExtractor.extract(p, min_size=400) is None
+
+
+def test_raw_preview_gives_similarity_coverage(tmp_path):
+    picture = make_picture()
+    raw = tmp_path / "IMG_0001.cr2"
+    make_fake_raw(raw, jpeg_bytes(picture))
+    jpg = tmp_path / "IMG_0001.jpg"
+    picture.save(jpg, quality=85)
+
+    preview = PreviewExtractor.extract(raw)
+    assert preview is not None and preview.size == picture.size
+
+    detector = SimilarDuplicateDetector(hash_size=8, preview_min_size=160)
+    assert detector.compute_hash(raw) - detector.compute_hash(jpg) <= 4
@@ -53,3 +53,65 @@ def test_group_similar(tmp_path):
 
     # p1 should be more similar to p2 (small dot) than to p3 (different color)
     assert d12 < d13, f"Expected p1 closer to p2 (d12={d12}) than to p3 (d13={d13})"
+
+
+def test_union_find_is_transitive_and_order_independent():
+    detector = SimilarDuplicateDetector(hash_size=8)
+    # a-b e b-c a distância 2, a-c a distância 4: o guloso depende da ordem
+    hashes = {"a": 0b0000, "b": 0b0011, "c": 0b1111, "z": (1 << 63) | (1 << 50) | (1 << 40) | (1 << 20)}
+    groups = detector.cluster_hashes(hashes, max_distance=2)
+    assert groups == {"a": ["a", "b", "c"]}
+
+    reordered = dict(reversed(list(hashes.items())))
+    assert detector.cluster_hashes(reordered, max_distance=2) == groups
+
+
+def test_union_find_complete_linkage_cap():
+    detector = SimilarDuplicateDetector(hash_size=8)
+    hashes = {"a": 0b0000, "b": 0b0011, "c": 0b1111}
+    groups = detector.cluster_hashes(hashes, max_distance=2, max_group_distance=3)
+    # a-c (distância 4) excede o teto: c fica fora do grupo
+    assert groups == {"a": ["a", "b"]}
+
+
+def test_parallel_hashes_match_serial(tmp_path):
+    paths = []
+    for i, color in enumerate([(255, 0, 0), (0, 255, 0), (0, 0, 255)]):
+        p = tmp_path / f"img{i}.jpg"
+        img = Image.new("RGB", (120, 80), color)
+        ImageDraw.Draw(img).rectangle([10 * i, 10, 60, 50 + 5 * i], fill=(250, 250, 250))
+        img.save(p)
+        paths.append(p)
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+
+    serial = SimilarDuplicateDetector(hash_size=8).compute_hashes(paths + [broken])
+    parallel = SimilarDuplicateDetector(hash_size=8, workers=2, batch_size=2).compute_hashes(paths + [broken])
+    assert parallel == serial
+    assert str(broken) not in parallel
+
+
+def test_orientation_invariant_matches_rotated_copies(tmp_path):
+    base = Image.new("RGB", (240, 160), (30, 30, 30))
+    draw = ImageDraw.Draw(base)
+    draw.rectangle([10, 10, 120, 70], fill=(250, 220, 0))
+    draw.ellipse([140, 60, 230, 150], fill=(0, 120, 250))
+    paths = {}
+    for name, img in {
+        "base": base,
+        "rot90": base.transpose(Image.Transpose.ROTATE_90),
+        "mirror": base.transpose(Image.Transpose.FLIP_LEFT_RIGHT),
+    }.items():
+        paths[name] = tmp_path / f"{name}.png"
+        img.save(paths[name])
+
+    plain = SimilarDuplicateDetector(hash_size=8)
+    invariant = SimilarDuplicateDetector(hash_size=8, orientation_invariant=True)
+    assert plain.compute_hash(paths["base"]) - plain.compute_hash(paths["rot90"]) > 10
+    h_base = invariant.compute_hash(paths["base"])
+    assert h_base - invariant.compute_hash(paths["rot90"]) <= 2
+    assert h_base - invariant.compute_hash(paths["mirror"]) <= 2
+    assert invariant.algorithm == "phash_rot"
+    # hashes de previews são persistidos à parte
+    preview = SimilarDuplicateDetector(preview_min_size=512, orientation_invariant=True)
+    assert preview.algorithm == "phash_rot_preview512" and preview.hash_function == "phash_rot"
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import piexif
+
+from src.core.metadata_reader import MetadataReader
+from src.core.parsers import HeaderParser, TIFFParser
+
+
+def make_fake_cr2(path, preview=b"\xff\xd8" + b"\x00" * 64 + b"\xff\xd9"):
+    """Contêiner TIFF com IFD0 (preview JPEG), EXIF e GPS, como um RAW."""
+    def tiff(offset):
+        exif = {
+            "0th": {
+                piexif.ImageIFD.Make: b"Canon",
+                piexif.ImageIFD.Model: b"Canon EOS 5D",
+                piexif.ImageIFD.Orientation: 6,
+                piexif.ImageIFD.ImageWidth: 5472,
+                piexif.ImageIFD.ImageLength: 3648,
+                piexif.ImageIFD.Compression: 6,
+                piexif.ImageIFD.StripOffsets: offset,
+                piexif.ImageIFD.StripByteCounts: len(preview),
+            },
+            "Exif": {piexif.ExifIFD.DateTimeOriginal: b"2021:07:04 10:20:30"},
+            "GPS": {
+                piexif.GPSIFD.GPSLatitudeRef: b"S",
+                piexif.GPSIFD.GPSLatitude: ((23, 1), (33, 1), (0, 1)),
+                piexif.GPSIFD.GPSLongitudeRef: b"W",
+                piexif.GPSIFD.GPSLongitude: ((46, 1), (38, 1), (0, 1)),
+            },
+        }
+        return piexif.dump(exif)[6:]
+
+    header = tiff(0)
+    path.write_bytes(tiff(len(header)) + preview)
+    return len(header), len(preview)
+
+
+def test_tiff_parser_matches_piexif(tmp_path):
+    path = tmp_path / "IMG_0001.cr2"
+    preview = make_fake_cr2(path)
+    loaded = piexif.load(str(path))
+    with open(path, "rb") as f:
+        info = TIFFParser.read(f)
+
+    for ifd in ("0th", "Exif", "GPS"):
+        assert info[ifd] == loaded[ifd]
+    assert info["previews"] == [preview]
+    assert TIFFParser.dimensions(info) == (5472, 3648)
+
+
+def test_raw_metadata_without_pil(tmp_path):
+    path = tmp_path / "IMG_0001.cr2"
+    make_fake_cr2(path)
+
+    header = HeaderParser.read_header(path)
+    assert (header["format"], header["width"], header["height"]) == ("CR2", 5472, 3648)
+
+    meta = MetadataReader().read_metadata(path)
+    assert meta["camera_make"] == "Canon" and meta["orientation"] == 6
+    assert meta["datetime"] == datetime(2021, 7, 4, 10, 20, 30)
+    assert round(meta["latitude"], 2) == -23.55 and round(meta["longitude"], 2) == -46.63
+
+    projected = MetadataReader().read_metadata(path, fields={"datetime"})
+    assert projected["datetime"] == datetime(2021, 7, 4, 10, 20, 30)